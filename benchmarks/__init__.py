@@ -0,0 +1 @@
+"""Standalone performance and accuracy benchmarks, run with python -m benchmarks.<name>."""
@@ -0,0 +1,120 @@
+"""
+Parse cost of the observability DAG file (module import and DagBag load), checked against a budget.
+
+    python -m benchmarks.dag_parse --repeat 5 --import-budget-ms 200 --dagbag-budget-ms 1000
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DAG_FILE = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..', 'dags', 'observability_pipeline.py')
+)
+
+# Top-level packages the DAG file must not import while it is parsed
+HEAVY_MODULES = ('pandas', 'numpy', 'pyarrow', 'great_expectations', 'extract', 'quality', 'common')
+
+# Median parse cost allowed per measurement, in milliseconds
+DEFAULT_IMPORT_BUDGET_MS = 200
+DEFAULT_DAGBAG_BUDGET_MS = 1000
+
+# Runs in a fresh interpreter per measurement: python -c _MEASURE <mode> <dag_file>
+_MEASURE = r'''
+import importlib.util, json, sys, time
+mode, path = sys.argv[1], sys.argv[2]
+import airflow
+from airflow import DAG
+from airflow.models import DagBag
+from airflow.operators.python import PythonOperator
+before = set(sys.modules)
+started = time.perf_counter()
+if mode == 'import':
+    spec = importlib.util.spec_from_file_location('dag_parse_target', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    result = {'dags': sum(isinstance(value, DAG) for value in vars(module).values())}
+else:
+    dagbag = DagBag(dag_folder=path, include_examples=False)
+    result = {'dags': len(dagbag.dags), 'import_errors': {k: str(v) for k, v in dagbag.import_errors.items()}}
+result['seconds'] = time.perf_counter() - started
+result['new_modules'] = sorted(set(sys.modules) - before)
+print(json.dumps(result))
+'''
+
+
+def measure(mode: str, dag_file: str) -> Dict[str, Any]:
+    """One measurement in a fresh interpreter; the JSON result is its last line of output."""
+    completed = subprocess.run(
+        [sys.executable, '-c', _MEASURE, mode, dag_file], capture_output=True, text=True, check=False
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"{mode} measurement failed:\n{completed.stderr.strip()}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def heavy_modules(module_names: List[str]) -> List[str]:
+    return sorted({name.split('.')[0] for name in module_names} & set(HEAVY_MODULES))
+
+
+def run(dag_file: str, repeat: int, budgets: Dict[str, float]) -> Dict[str, Any]:
+    report = {'dag_file': dag_file, 'repeat': repeat, 'python': sys.version.split()[0], 'stages': {},
+              'violations': []}
+    for mode, budget_ms in budgets.items():
+        runs = [measure(mode, dag_file) for _ in range(repeat)]
+        median_ms = statistics.median(result['seconds'] for result in runs) * 1000
+        stage = {
+            'median_ms': round(median_ms, 1),
+            'min_ms': round(min(result['seconds'] for result in runs) * 1000, 1),
+            'budget_ms': budget_ms,
+            'dags': runs[0]['dags'],
+            'new_modules': len(runs[0]['new_modules']),
+        }
+        if median_ms > budget_ms:
+            report['violations'].append(f"{mode} took {median_ms:.1f} ms, budget {budget_ms} ms")
+        if mode == 'import':
+            stage['heavy_modules'] = heavy_modules(runs[0]['new_modules'])
+            if stage['heavy_modules']:
+                report['violations'].append(f"parsing imports {', '.join(stage['heavy_modules'])}")
+        else:
+            stage['import_errors'] = runs[0]['import_errors']
+            if stage['import_errors']:
+                report['violations'].append(f"DagBag import errors: {stage['import_errors']}")
+        if not stage['dags']:
+            report['violations'].append(f"{mode} found no DAG in {dag_file}")
+        report['stages'][mode] = stage
+        logger.info(f"{mode}: median {stage['median_ms']} ms over {repeat} runs (budget {budget_ms} ms)")
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='DAG file parse time against a budget')
+    parser.add_argument('--dag-file', default=DEFAULT_DAG_FILE)
+    parser.add_argument('--repeat', type=int, default=5, help='fresh-interpreter runs per measurement')
+    parser.add_argument('--import-budget-ms', type=float, default=DEFAULT_IMPORT_BUDGET_MS)
+    parser.add_argument('--dagbag-budget-ms', type=float, default=DEFAULT_DAGBAG_BUDGET_MS)
+    parser.add_argument('--output', default=None, help='also write the JSON report here')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    report = run(os.path.abspath(args.dag_file), args.repeat,
+                 {'import': args.import_budget_ms, 'dagbag': args.dagbag_budget_ms})
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+    print(json.dumps(report, indent=2))
+    if report['violations']:
+        for violation in report['violations']:
+            logger.error(f"Parse budget exceeded: {violation}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
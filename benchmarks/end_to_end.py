@@ -0,0 +1,273 @@
+"""
+End-to-end pipeline benchmark on synthetic Airflow metadata: rows/sec, wall time and peak RSS per stage.
+
+    python -m benchmarks.end_to_end --rows 1m \\
+        --airflow-db sqlite:////tmp/airflow_bench.db \\
+        --observability-url postgresql://postgres@localhost/observability_bench \\
+        --reset-observability --output bench-1m.json --compare bench-1m-main.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+from sqlalchemy import inspect, text
+
+logger = logging.getLogger(__name__)
+
+STAGES = ('generate', 'extract_and_load', 'quality_checks', 'expectations')
+
+# Observability tables dropped by --reset-observability
+OBSERVABILITY_TABLES = (
+    'dag_runs', 'task_instances', 'dag_runs_quarantine', 'task_instances_quarantine',
+    'dag_runs_rollup_hourly', 'dag_runs_rollup_daily',
+    'task_instances_rollup_hourly', 'task_instances_rollup_daily',
+    'duration_sketches', 'load_ledger', 'extraction_watermarks', 'pipeline_metrics',
+)
+
+
+class PeakRSS:
+    """Sample the resident set size of this process in the background and keep the peak."""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, name='peak-rss', daemon=True)
+        self._page_size = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+    def current_bytes(self) -> int:
+        try:
+            with open('/proc/self/statm') as statm:
+                return int(statm.read().split()[1]) * self._page_size
+        except OSError:
+            # No procfs: fall back to the lifetime peak (kilobytes on Linux, bytes on macOS)
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return peak if sys.platform == 'darwin' else peak * 1024
+
+    def _sample(self) -> None:
+        while not self._stop.is_set():
+            self.peak_bytes = max(self.peak_bytes, self.current_bytes())
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> 'PeakRSS':
+        self.start_bytes = self.current_bytes()
+        self.peak_bytes = self.start_bytes
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak_bytes = max(self.peak_bytes, self.current_bytes())
+
+
+@contextmanager
+def measure(results: Dict[str, Dict], stage: str) -> Iterator[Dict[str, Any]]:
+    """Time a stage; the body stores its row count under 'rows' in the yielded dict."""
+    stats: Dict[str, Any] = {'rows': 0}
+    started = time.perf_counter()
+    with PeakRSS() as rss:
+        try:
+            yield stats
+        except Exception as e:
+            logger.error(f"Benchmark stage {stage} failed: {str(e)}")
+            stats['error'] = f"{type(e).__name__}: {e}"
+    wall_seconds = time.perf_counter() - started
+    stats.update({
+        'wall_seconds': round(wall_seconds, 3),
+        'rows_per_sec': round(stats['rows'] / wall_seconds, 1) if wall_seconds and stats['rows'] else 0.0,
+        'peak_rss_mb': round(rss.peak_bytes / 2**20, 1),
+        'rss_growth_mb': round((rss.peak_bytes - rss.start_bytes) / 2**20, 1),
+    })
+    results[stage] = stats
+    logger.info(f"{stage}: {stats}")
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _reset_observability(engine) -> None:
+    cascade = ' CASCADE' if engine.dialect.name == 'postgresql' else ''
+    with engine.begin() as conn:
+        for table_name in OBSERVABILITY_TABLES:
+            conn.execute(text(f"DROP TABLE IF EXISTS {table_name}{cascade}"))
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Stages whose rows/sec dropped by more than tolerance against the baseline."""
+    regressions = []
+    for stage, stats in current['stages'].items():
+        before = baseline.get('stages', {}).get(stage)
+        if not before or not before.get('rows_per_sec') or 'error' in stats:
+            continue
+        ratio = stats['rows_per_sec'] / before['rows_per_sec']
+        stats['vs_baseline'] = round(ratio, 3)
+        if ratio < 1 - tolerance:
+            regressions.append(
+                f"{stage}: {stats['rows_per_sec']} rows/s vs {before['rows_per_sec']} "
+                f"in {baseline.get('commit') or 'baseline'} ({ratio:.0%})"
+            )
+    return regressions
+
+
+def run(args: argparse.Namespace) -> Dict:
+    # Point Airflow at the stand-in databases before anything imports it
+    if args.airflow_db:
+        os.environ['AIRFLOW__DATABASE__SQL_ALCHEMY_CONN'] = args.airflow_db
+        os.environ['AIRFLOW__CORE__SQL_ALCHEMY_CONN'] = args.airflow_db
+    if args.observability_url:
+        os.environ[f"AIRFLOW_CONN_{args.observability_conn_id.upper()}"] = args.observability_url
+
+    from airflow import settings
+    from common.engines import get_engine
+    from benchmarks.synthetic_airflow import SCALES, SyntheticAirflowMetadata, parse_state_mix, populate
+
+    rows = SCALES.get(args.rows.lower()) or int(args.rows)
+    stages = args.stages.split(',') if args.stages else list(STAGES)
+    report: Dict[str, Any] = {
+        'commit': _git_commit(),
+        'started_at': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'config': {key: value for key, value in vars(args).items()
+                   if key not in ('compare', 'output', 'observability_url')},
+        'stages': {},
+    }
+    results = report['stages']
+
+    engine = get_engine(args.observability_conn_id)
+    if args.reset_observability:
+        _reset_observability(engine)
+
+    if 'generate' in stages:
+        generator = SyntheticAirflowMetadata(
+            rows, state_mix=parse_state_mix(args.state_mix) if args.state_mix else None,
+            dags=args.dags, days=args.days, seed=args.seed,
+        )
+        with measure(results, 'generate') as stats:
+            generated = populate(settings.engine, generator)
+            stats['rows'] = generated['dag_runs'] + generated['task_instances']
+            stats['dag_runs'], stats['task_instances'] = generated['dag_runs'], generated['task_instances']
+            stats['dags'] = generated['dags']
+
+    if 'extract_and_load' in stages:
+        from extract.airflow_metadata import AirflowMetadataExtractor
+        extractor = AirflowMetadataExtractor(
+            observability_conn_id=args.observability_conn_id,
+            chunk_size=args.chunk_size,
+            preload_validation=args.preload_validation,
+            build_sketches=args.build_sketches,
+            compact_frames=args.compact_frames,
+        )
+        with measure(results, 'extract_and_load') as stats:
+            loaded = extractor.extract_and_load(
+                streaming=True, load_mode=args.load_mode, concurrent=not args.sequential,
+            )
+            stats['rows'] = loaded['dag_runs_count'] + loaded['task_instances_count']
+            stats['timings'] = loaded['timings']
+            stats['load_rows_per_sec'] = {
+                'dag_runs': loaded['dag_runs_load_rows_per_sec'],
+                'task_instances': loaded['task_instances_load_rows_per_sec'],
+            }
+
+    with engine.connect() as conn:
+        table_rows = {
+            table_name: conn.execute(text(f"SELECT COUNT(*) FROM {table_name}")).scalar()
+            for table_name in ('dag_runs', 'task_instances') if inspect(conn).has_table(table_name)
+        }
+    report['observability_rows'] = table_rows
+
+    if 'quality_checks' in stages:
+        from quality.data_quality_checks import DataQualityChecker
+        with measure(results, 'quality_checks') as stats:
+            checks = DataQualityChecker(observability_conn_id=args.observability_conn_id).run_all_checks()
+            stats['rows'] = sum(table_rows.values())
+            stats['passed'] = f"{checks['passed_count']}/{checks['total_count']}"
+
+    if 'expectations' in stages:
+        with measure(results, 'expectations') as stats:
+            from quality.expectations.run_expectations import (
+                run_dag_runs_expectations, run_task_instances_expectations,
+            )
+            suites = {
+                'dag_runs': run_dag_runs_expectations(
+                    observability_conn_id=args.observability_conn_id,
+                    ge_context_root_dir=args.ge_context_root_dir,
+                ),
+                'task_instances': run_task_instances_expectations(
+                    observability_conn_id=args.observability_conn_id,
+                    ge_context_root_dir=args.ge_context_root_dir,
+                ),
+            }
+            stats['rows'] = sum(table_rows.values())
+            stats['success'] = {name: result.get('success') for name, result in suites.items()}
+
+    report['finished_at'] = datetime.now(timezone.utc).isoformat()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='End-to-end pipeline benchmark on synthetic metadata')
+    parser.add_argument('--rows', default='10k', help="task_instance rows, a number or 10k, 1m, 10m")
+    parser.add_argument('--state-mix', default=None,
+                        help="run state probabilities, e.g. 'success=0.9,failed=0.06,running=0.04'")
+    parser.add_argument('--dags', type=int, default=None)
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--airflow-db', default=None,
+                        help='SQLAlchemy URL of the stand-in Airflow metadata database')
+    parser.add_argument('--observability-conn-id', default='observability_postgres')
+    parser.add_argument('--observability-url', default=None,
+                        help='URI for the observability connection (sets AIRFLOW_CONN_<ID>)')
+    parser.add_argument('--reset-observability', action='store_true',
+                        help='drop the pipeline tables in the observability database first')
+    parser.add_argument('--stages', default=None, help=f"comma-separated subset of {','.join(STAGES)}")
+    parser.add_argument('--chunk-size', type=int, default=50000)
+    parser.add_argument('--load-mode', default='upsert', choices=['append', 'upsert'])
+    parser.add_argument('--sequential', action='store_true', help='load the two tables one after another')
+    parser.add_argument('--preload-validation', default=None, choices=['validate', 'quarantine'])
+    parser.add_argument('--build-sketches', action='store_true')
+    parser.add_argument('--compact-frames', action='store_true')
+    parser.add_argument('--ge-context-root-dir', default=None,
+                        help='Great Expectations context root for the expectations stage')
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--compare', default=None, help='earlier results JSON to compare rows/sec against')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='allowed rows/sec drop against --compare before exiting non-zero')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    report = run(args)
+    regressions = []
+    if args.compare:
+        with open(args.compare) as baseline:
+            regressions = compare(report, json.load(baseline), args.tolerance)
+        report['regressions'] = regressions
+
+    with open(args.output, 'w') as output:
+        json.dump(report, output, indent=2, default=str)
+    print(json.dumps(report, indent=2, default=str))
+    if regressions:
+        for regression in regressions:
+            logger.error(f"Regression: {regression}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Construction time and memory of extracted DataFrames: dict records vs compact frames.
+
+    python -m benchmarks.frame_build --rows 500000
+"""
+
+import argparse
+import json
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+import numpy as np
+import pandas as pd
+from extract.airflow_metadata import AirflowMetadataExtractor
+from extract.frames import compact_frame
+
+TaskInstanceRow = namedtuple('TaskInstanceRow', [
+    'dag_id', 'task_id', 'execution_date', 'state', 'start_date', 'end_date', 'duration', 'try_number',
+])
+DagRunRow = namedtuple('DagRunRow', ['dag_id', 'execution_date', 'state', 'start_date', 'end_date'])
+
+
+def synthetic_rows(rows: int, dags: int, tasks: int, seed: int) -> Dict[str, List]:
+    rng = np.random.default_rng(seed)
+    states = ['success', 'failed', 'running', 'upstream_failed']
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    dag_ids = rng.integers(0, dags, rows)
+    task_ids = rng.integers(0, tasks, rows)
+    state_ids = rng.choice(len(states), rows, p=[0.9, 0.05, 0.03, 0.02])
+    offsets = rng.integers(0, 90 * 86400, rows)
+    durations = rng.lognormal(4.0, 1.0, rows)
+    task_instances = []
+    for i in range(rows):
+        execution_date = base + timedelta(seconds=int(offsets[i]))
+        start_date = execution_date + timedelta(seconds=30)
+        # Separate str objects per row, as the database driver returns them
+        task_instances.append(TaskInstanceRow(
+            ''.join(f"dag_{dag_ids[i]}"), ''.join(f"task_{task_ids[i]}"), execution_date,
+            ''.join(states[state_ids[i]]), start_date, start_date + timedelta(seconds=float(durations[i])),
+            float(durations[i]), int(rng.integers(1, 3)),
+        ))
+    dag_runs = [DagRunRow(ti.dag_id, ti.execution_date, ti.state, ti.start_date, ti.end_date)
+                for ti in task_instances[: max(1, rows // tasks)]]
+    return {'task_instances': task_instances, 'dag_runs': dag_runs}
+
+
+def measure(build, rows: List) -> Dict:
+    started = time.perf_counter()
+    df = build(rows)
+    seconds = time.perf_counter() - started
+    return {
+        'seconds': round(seconds, 3),
+        'memory_mb': round(df.memory_usage(index=True, deep=True).sum() / 2**20, 2),
+        'dtypes': {column: str(dtype) for column, dtype in df.dtypes.items()},
+    }
+
+
+def run(rows: int, dags: int, tasks: int, seed: int) -> Dict:
+    source = synthetic_rows(rows, dags, tasks, seed)
+    builders = {
+        'task_instances': lambda batch: pd.DataFrame(AirflowMetadataExtractor._task_instance_records(batch)),
+        'dag_runs': lambda batch: pd.DataFrame(AirflowMetadataExtractor._dag_run_records(batch)),
+    }
+    report = {'rows': rows, 'tables': {}}
+    for table_name, batch in source.items():
+        records = measure(builders[table_name], batch)
+        compact = measure(lambda rows_: compact_frame(rows_, table_name), batch)
+        report['tables'][table_name] = {
+            'rows': len(batch),
+            'records': records,
+            'compact': compact,
+            'speedup': round(records['seconds'] / compact['seconds'], 2) if compact['seconds'] else None,
+            'memory_ratio': round(records['memory_mb'] / compact['memory_mb'], 2) if compact['memory_mb'] else None,
+        }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--dags', type=int, default=200)
+    parser.add_argument('--tasks', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+    print(json.dumps(run(args.rows, args.dags, args.tasks, args.seed), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""
+Accuracy of merged weekly/monthly duration sketches against exact percentiles.
+
+    python -m benchmarks.sketch_accuracy --dags 20 --tasks 10 --days 60
+"""
+
+import argparse
+import json
+import time
+from typing import Dict, List
+import numpy as np
+import pandas as pd
+from extract.sketches import DEFAULT_RELATIVE_ACCURACY, DDSketch, build_sketches
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Synthetic durations come from one cluster, so the daily sketches are keyed without cluster_id
+DAILY_KEY = ['dag_id', 'task_id', 'day']
+
+
+def synthetic_durations(dags: int, tasks: int, days: int, runs_per_day: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    groups = dags * tasks * days
+    # Each task gets its own typical duration, with a heavy right tail
+    medians = rng.lognormal(mean=4.0, sigma=1.5, size=dags * tasks)
+    keys = pd.MultiIndex.from_product(
+        [[f'dag_{d}' for d in range(dags)], [f'task_{t}' for t in range(tasks)],
+         pd.date_range('2024-01-01', periods=days, freq='D').date],
+        names=DAILY_KEY,
+    ).to_frame(index=False)
+    keys = keys.loc[keys.index.repeat(runs_per_day)].reset_index(drop=True)
+    scale = np.repeat(np.repeat(medians, days), runs_per_day)
+    keys['duration'] = scale * rng.lognormal(mean=0.0, sigma=0.8, size=groups * runs_per_day)
+    return keys
+
+
+def relative_errors(estimates: Dict, exact: pd.DataFrame, q: float) -> np.ndarray:
+    expected = exact[q].to_numpy()
+    actual = np.array([estimates[key].quantile(q) for key in exact.index])
+    return np.abs(actual - expected) / expected
+
+
+def merge_by_period(daily: Dict, period: str) -> Dict:
+    merged = {}
+    for (dag_id, task_id, day), sketch in daily.items():
+        start = pd.Timestamp(day).to_period(period).start_time.date()
+        key = (dag_id, task_id, start)
+        if key in merged:
+            merged[key].merge(sketch)
+        else:
+            merged[key] = DDSketch(sketch.relative_accuracy).merge(sketch)
+    return merged
+
+
+def run(dags: int, tasks: int, days: int, runs_per_day: int, relative_accuracy: float,
+        chunk_size: int, seed: int) -> Dict:
+    df = synthetic_durations(dags, tasks, days, runs_per_day, seed)
+
+    started = time.perf_counter()
+    daily: Dict = {}
+    for offset in range(0, len(df), chunk_size):
+        for key, sketch in build_sketches(df.iloc[offset:offset + chunk_size], DAILY_KEY,
+                                          relative_accuracy=relative_accuracy).items():
+            if key in daily:
+                daily[key].merge(sketch)
+            else:
+                daily[key] = sketch
+    build_seconds = time.perf_counter() - started
+    sketch_bytes = sum(len(sketch.to_bytes()) for sketch in daily.values())
+
+    report = {
+        'rows': len(df),
+        'daily_sketches': len(daily),
+        'relative_accuracy': relative_accuracy,
+        'build_seconds': round(build_seconds, 3),
+        'build_rows_per_sec': round(len(df) / build_seconds) if build_seconds else None,
+        'sketch_bytes': sketch_bytes,
+        'raw_bytes': int(df['duration'].to_numpy().nbytes),
+        'ranges': {},
+    }
+
+    for name, period in (('day', None), ('week', 'W'), ('month', 'M')):
+        if period is None:
+            sketches, frame = daily, df.assign(period_start=df['day'])
+        else:
+            started = time.perf_counter()
+            sketches = merge_by_period(daily, period)
+            merge_seconds = time.perf_counter() - started
+            frame = df.assign(period_start=pd.to_datetime(df['day']).dt.to_period(period).dt.start_time.dt.date)
+        keys = ['dag_id', 'task_id', 'period_start']
+        started = time.perf_counter()
+        grouped = frame.groupby(keys)['duration']
+        exact = {
+            'interpolated': grouped.quantile(list(QUANTILES)).unstack(),
+            'rank': grouped.quantile(list(QUANTILES), interpolation='lower').unstack(),
+        }
+        exact_seconds = time.perf_counter() - started
+
+        stats: Dict[str, object] = {'groups': len(sketches), 'exact_seconds': round(exact_seconds, 3)}
+        if period is not None:
+            stats['merge_seconds'] = round(merge_seconds, 3)
+        for q in QUANTILES:
+            stats[f'p{round(q * 100):g}'] = {}
+            for definition, values in exact.items():
+                values.index = values.index.to_flat_index()
+                errors: List[float] = relative_errors(sketches, values, q)
+                stats[f'p{round(q * 100):g}'][definition] = {
+                    'median_relative_error': round(float(np.nanmedian(errors)), 5),
+                    'p99_relative_error': round(float(np.nanpercentile(errors, 99)), 5),
+                    'max_relative_error': round(float(np.nanmax(errors)), 5),
+                }
+        report['ranges'][name] = stats
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--dags', type=int, default=20)
+    parser.add_argument('--tasks', type=int, default=10)
+    parser.add_argument('--days', type=int, default=60)
+    parser.add_argument('--runs-per-day', type=int, default=24)
+    parser.add_argument('--relative-accuracy', type=float, default=DEFAULT_RELATIVE_ACCURACY)
+    parser.add_argument('--chunk-size', type=int, default=50000)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+    report = run(args.dags, args.tasks, args.days, args.runs_per_day, args.relative_accuracy,
+                 args.chunk_size, args.seed)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
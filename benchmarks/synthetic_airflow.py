@@ -0,0 +1,232 @@
+"""
+Synthetic Airflow metadata for benchmarks, written to the database Airflow is configured with.
+
+    AIRFLOW__DATABASE__SQL_ALCHEMY_CONN=sqlite:////tmp/airflow_bench.db \\
+        python -m benchmarks.synthetic_airflow --rows 1000000
+"""
+
+import argparse
+import json
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Named sizes of the task_instance table
+SCALES = {
+    '10k': 10_000,
+    '1m': 1_000_000,
+    '10m': 10_000_000,
+}
+
+DEFAULT_STATE_MIX = {
+    'success': 0.90,
+    'failed': 0.06,
+    'running': 0.03,
+    'queued': 0.01,
+}
+
+# Values for NOT NULL columns of the real Airflow schema the generator does not model
+_COLUMN_DEFAULTS = {
+    'dag_run': {
+        'run_type': 'scheduled',
+        'external_trigger': False,
+        'clear_number': 0,
+    },
+    'task_instance': {
+        'map_index': -1,
+        'max_tries': 2,
+        'pool': 'default_pool',
+        'pool_slots': 1,
+        'queue': 'default',
+        'priority_weight': 1,
+        'operator': 'PythonOperator',
+        'hostname': 'bench-worker',
+        'unixname': 'airflow',
+    },
+}
+
+
+def parse_state_mix(value: str) -> Dict[str, float]:
+    """Parse 'success=0.9,failed=0.1' into normalized run state probabilities."""
+    mix = {}
+    for part in value.split(','):
+        state, _, weight = part.partition('=')
+        mix[state.strip()] = float(weight)
+    unknown = set(mix) - set(DEFAULT_STATE_MIX)
+    if unknown:
+        raise ValueError(f"Unsupported run states {sorted(unknown)}, expected {sorted(DEFAULT_STATE_MIX)}")
+    total = sum(mix.values())
+    return {state: weight / total for state, weight in mix.items()}
+
+
+class SyntheticAirflowMetadata:
+    """Generator of dag_run/task_instance DataFrames totalling about `rows` task instances, Zipf-skewed per DAG."""
+
+    def __init__(self, rows: int, state_mix: Optional[Dict[str, float]] = None,
+                 dags: Optional[int] = None, days: int = 90, retry_rate: float = 0.05,
+                 max_tasks: int = 200, zipf_a: float = 1.6, seed: int = 42,
+                 end: Optional[datetime] = None):
+        self.rows = rows
+        self.state_mix = state_mix or DEFAULT_STATE_MIX
+        self.dags = dags or max(5, min(2000, rows // 2000))
+        self.days = days
+        self.retry_rate = retry_rate
+        self.seed = seed
+        self.end = end or datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        rng = np.random.default_rng(seed)
+
+        self.tasks_per_dag = np.clip(rng.zipf(zipf_a, self.dags), 1, max_tasks)
+        run_weight = rng.zipf(zipf_a, self.dags).astype(float)
+        scale = rows / float((run_weight * self.tasks_per_dag).sum())
+        self.runs_per_dag = np.maximum(1, np.round(run_weight * scale)).astype(int)
+        self.dag_median_seconds = rng.lognormal(mean=5.0, sigma=1.0, size=self.dags)
+
+    @property
+    def dag_run_count(self) -> int:
+        return int(self.runs_per_dag.sum())
+
+    @property
+    def task_instance_count(self) -> int:
+        return int((self.runs_per_dag * self.tasks_per_dag).sum())
+
+    def chunks(self, chunk_rows: int = 200_000) -> Iterator[Tuple[pd.DataFrame, pd.DataFrame]]:
+        """Yield (dag_runs, task_instances) frames, each holding roughly chunk_rows task instances."""
+        rng = np.random.default_rng(self.seed + 1)
+        states = np.array(list(self.state_mix))
+        probabilities = np.array([self.state_mix[state] for state in states])
+        # Naive UTC datetime64 throughout, localized once when the frames are built
+        start = np.datetime64(self.end.astimezone(timezone.utc).replace(tzinfo=None), 'ns') \
+            - np.timedelta64(self.days, 'D')
+        never = np.datetime64('NaT', 'ns')
+
+        for dag_index in range(self.dags):
+            dag_id = f"bench_dag_{dag_index:05d}"
+            runs, tasks = int(self.runs_per_dag[dag_index]), int(self.tasks_per_dag[dag_index])
+            runs_per_chunk = max(1, chunk_rows // tasks)
+            interval = np.timedelta64(self.days * 86400 * 10**9 // runs, 'ns')
+            task_medians = self.dag_median_seconds[dag_index] * rng.lognormal(0.0, 0.5, size=tasks) / tasks
+            grid = np.arange(tasks)[None, :]
+
+            for first_run in range(0, runs, runs_per_chunk):
+                count = min(runs_per_chunk, runs - first_run)
+                execution_dates = start + interval * np.arange(first_run, first_run + count)
+                run_states = rng.choice(states, size=count, p=probabilities)
+                run_start = execution_dates + rng.integers(1, 120, size=count).astype('timedelta64[s]')
+
+                # Task grid: one row per (run, task), tasks executed one after another
+                durations = rng.lognormal(np.log(task_medians), 0.6, size=(count, tasks))
+                offsets = np.cumsum(durations, axis=1) - durations
+                task_states = np.full((count, tasks), 'success', dtype=object)
+                for state in ('running', 'queued'):
+                    in_state = run_states == state
+                    if in_state.any():
+                        # The head of the run has finished, the tail has not been scheduled yet
+                        cut = rng.integers(0, tasks, size=in_state.sum())[:, None]
+                        task_states[in_state] = np.where(grid < cut, 'success', np.where(grid == cut, state, None))
+                failed = run_states == 'failed'
+                if failed.any():
+                    cut = rng.integers(0, tasks, size=failed.sum())[:, None]
+                    task_states[failed] = np.where(grid < cut, 'success',
+                                                   np.where(grid == cut, 'failed', 'upstream_failed'))
+                finished = np.isin(task_states, ['success', 'failed'])
+                started = finished | (task_states == 'running')
+                try_numbers = np.where(rng.random((count, tasks)) < self.retry_rate, 2, 1)
+                try_numbers[task_states == 'failed'] = 3
+
+                ti_start = run_start[:, None] + (offsets * 1e9).astype('timedelta64[ns]')
+                ti_end = ti_start + (durations * 1e9).astype('timedelta64[ns]')
+                ti_start = np.where(started, ti_start, never)
+                ti_end = np.where(finished, ti_end, never)
+                ti_updated = np.where(finished, ti_end, np.where(started, ti_start, run_start[:, None]))
+
+                run_done = np.isin(run_states, ['success', 'failed'])
+                last_end = np.where(finished, ti_end, run_start[:, None]).max(axis=1)
+                run_end = np.where(run_done, last_end, never)
+
+                run_ids = np.array([f"scheduled__{date}" for date in np.datetime_as_string(execution_dates, 'us')])
+                task_instances = pd.DataFrame({
+                    'dag_id': dag_id,
+                    'task_id': np.tile([f"task_{t:03d}" for t in range(tasks)], count),
+                    'run_id': np.repeat(run_ids, tasks),
+                    'execution_date': pd.to_datetime(np.repeat(execution_dates, tasks), utc=True),
+                    'state': task_states.ravel(),
+                    'start_date': pd.to_datetime(ti_start.ravel(), utc=True),
+                    'end_date': pd.to_datetime(ti_end.ravel(), utc=True),
+                    'duration': np.where(finished, durations, np.nan).ravel(),
+                    'try_number': try_numbers.ravel(),
+                    'updated_at': pd.to_datetime(ti_updated.ravel(), utc=True),
+                })
+                dag_runs = pd.DataFrame({
+                    'dag_id': dag_id,
+                    'run_id': run_ids,
+                    'execution_date': pd.to_datetime(execution_dates, utc=True),
+                    'state': run_states,
+                    'start_date': pd.to_datetime(run_start, utc=True),
+                    'end_date': pd.to_datetime(run_end, utc=True),
+                    'updated_at': pd.to_datetime(np.where(run_done, run_end, run_start), utc=True),
+                })
+                yield dag_runs, task_instances
+
+
+def _insert(conn, table, df: pd.DataFrame) -> None:
+    columns = {column.name for column in table.columns}
+    df = df[[column for column in df.columns if column in columns]]
+    for column, value in _COLUMN_DEFAULTS.get(table.name, {}).items():
+        if column in columns and column not in df:
+            df = df.assign(**{column: value})
+    records = df.astype(object).where(df.notna(), None).to_dict('records')
+    conn.execute(table.insert(), records)
+
+
+def populate(engine, generator: SyntheticAirflowMetadata, chunk_rows: int = 200_000) -> Dict:
+    """Create the Airflow tables if needed and insert the generated rows."""
+    from airflow.models import DagRun, TaskInstance
+
+    DagRun.metadata.create_all(engine)
+    started = time.perf_counter()
+    dag_runs = task_instances = 0
+    for dag_run_df, task_instance_df in generator.chunks(chunk_rows):
+        with engine.begin() as conn:
+            _insert(conn, DagRun.__table__, dag_run_df)
+            _insert(conn, TaskInstance.__table__, task_instance_df)
+        dag_runs += len(dag_run_df)
+        task_instances += len(task_instance_df)
+        logger.info(f"Generated {task_instances}/{generator.task_instance_count} task instances")
+    wall_seconds = time.perf_counter() - started
+    return {
+        'dag_runs': dag_runs,
+        'task_instances': task_instances,
+        'dags': generator.dags,
+        'wall_seconds': round(wall_seconds, 3),
+        'rows_per_sec': round((dag_runs + task_instances) / wall_seconds, 1) if wall_seconds else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Fill the configured Airflow database with synthetic metadata')
+    parser.add_argument('--rows', default='10k',
+                        help=f"task_instance rows, a number or one of {sorted(SCALES)}")
+    parser.add_argument('--state-mix', default=None,
+                        help="run state probabilities, e.g. 'success=0.9,failed=0.06,running=0.04'")
+    parser.add_argument('--dags', type=int, default=None)
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    from airflow import settings
+
+    rows = SCALES.get(args.rows.lower()) or int(args.rows)
+    state_mix = parse_state_mix(args.state_mix) if args.state_mix else None
+    generator = SyntheticAirflowMetadata(rows, state_mix=state_mix, dags=args.dags, days=args.days,
+                                         seed=args.seed)
+    print(json.dumps(populate(settings.engine, generator), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1 @@
+"""Shared infrastructure used by the extract and quality modules."""
@@ -0,0 +1,149 @@
+"""Process-wide SQLAlchemy engine registry keyed by Airflow connection id."""
+
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import URL, Engine, make_url
+from airflow.hooks.base import BaseHook
+
+logger = logging.getLogger(__name__)
+
+# Defaults for every engine; override per connection through the Airflow
+# connection extra ({"engine_options": {...}}) or configure_engine()
+DEFAULT_ENGINE_OPTIONS: Dict[str, Any] = {
+    'pool_size': 5,
+    'max_overflow': 10,
+    'pool_timeout': 30,
+    'pool_recycle': 1800,
+    'pool_pre_ping': True,
+    # Server-side statement_timeout in milliseconds, None for the server default
+    'statement_timeout_ms': None,
+    # TCP keepalives so idle pooled connections are not silently dropped by firewalls
+    'keepalives_idle': 30,
+    'keepalives_interval': 10,
+    'keepalives_count': 5,
+    # Use server-side cursors for every query on this engine
+    'stream_results': False,
+}
+
+_POSTGRES_CONN_TYPES = ('postgres', 'postgresql')
+
+_engines: Dict[str, Engine] = {}
+_engine_options: Dict[str, Dict[str, Any]] = {}
+_lock = threading.Lock()
+
+
+def configure_engine(conn_id: str, **options) -> None:
+    """Override engine options for conn_id; an existing engine is disposed so they apply on the next request."""
+    unknown = set(options) - set(DEFAULT_ENGINE_OPTIONS)
+    if unknown:
+        raise ValueError(f"Unknown engine options: {sorted(unknown)}")
+    with _lock:
+        _engine_options.setdefault(conn_id, {}).update(options)
+        engine = _engines.pop(conn_id, None)
+    if engine is not None:
+        engine.dispose()
+
+
+def get_engine_options(conn_id: str) -> Dict[str, Any]:
+    """Effective options for conn_id: defaults, then connection extras, then configure_engine()."""
+    conn = BaseHook.get_connection(conn_id)
+    options = dict(DEFAULT_ENGINE_OPTIONS)
+    options.update(conn.extra_dejson.get('engine_options', {}))
+    options.update(_engine_options.get(conn_id, {}))
+    return options
+
+
+def get_connection_url(conn_id: str) -> URL:
+    conn = BaseHook.get_connection(conn_id)
+    if conn.conn_type in _POSTGRES_CONN_TYPES:
+        # URL.create escapes credentials that would break an f-string DSN
+        return URL.create(
+            drivername='postgresql+psycopg2',
+            username=conn.login,
+            password=conn.password,
+            host=conn.host,
+            port=conn.port,
+            database=conn.schema,
+        )
+    return make_url(conn.get_uri())
+
+
+def get_engine_kwargs(conn_id: str) -> Dict[str, Any]:
+    """create_engine() keyword arguments for conn_id, also used to configure Great Expectations."""
+    options = get_engine_options(conn_id)
+    url = get_connection_url(conn_id)
+    kwargs: Dict[str, Any] = {'pool_pre_ping': options['pool_pre_ping']}
+
+    if url.get_backend_name() == 'sqlite':
+        return kwargs
+
+    kwargs.update({
+        'pool_size': options['pool_size'],
+        'max_overflow': options['max_overflow'],
+        'pool_timeout': options['pool_timeout'],
+        'pool_recycle': options['pool_recycle'],
+    })
+    if url.get_backend_name() == 'postgresql':
+        connect_args: Dict[str, Any] = {
+            'keepalives': 1,
+            'keepalives_idle': options['keepalives_idle'],
+            'keepalives_interval': options['keepalives_interval'],
+            'keepalives_count': options['keepalives_count'],
+            'application_name': f"observability:{conn_id}",
+        }
+        if options['statement_timeout_ms']:
+            connect_args['options'] = f"-c statement_timeout={int(options['statement_timeout_ms'])}"
+        kwargs['connect_args'] = connect_args
+    return kwargs
+
+
+def get_engine(conn_id: str) -> Engine:
+    """Return the process-wide shared engine for conn_id, creating it on first use."""
+    with _lock:
+        engine = _engines.get(conn_id)
+        if engine is None:
+            options = get_engine_options(conn_id)
+            engine = create_engine(get_connection_url(conn_id), **get_engine_kwargs(conn_id))
+            if options['stream_results']:
+                engine = engine.execution_options(stream_results=True)
+            _engines[conn_id] = engine
+            logger.info(f"Created pooled engine for connection {conn_id}")
+        return engine
+
+
+def dispose_engines() -> None:
+    """Close every pooled connection and forget the engines."""
+    with _lock:
+        engines = list(_engines.values())
+        _engines.clear()
+    for engine in engines:
+        engine.dispose()
+
+
+def _reset_after_fork() -> None:
+    # Pooled connections belong to the parent process; the child must open its own
+    for engine in _engines.values():
+        engine.dispose(close=False)
+    _engines.clear()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+@contextmanager
+def statement_timeout(conn, timeout_ms: Optional[int]):
+    """SET LOCAL statement_timeout for the current transaction of conn; a no-op for None or non-PostgreSQL engines."""
+    if timeout_ms and conn.dialect.name == 'postgresql':
+        conn.execute(text(f"SET LOCAL statement_timeout = {int(timeout_ms)}"))
+    yield conn
+
+
+def is_statement_timeout(error: BaseException) -> bool:
+    """Whether error is PostgreSQL cancelling a statement that ran past its statement_timeout."""
+    # SQLAlchemy wraps the driver error; 57014 is query_canceled
+    return getattr(getattr(error, 'orig', None), 'pgcode', None) == '57014'
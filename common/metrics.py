@@ -0,0 +1,135 @@
+"""Self-instrumentation: per-stage timings of the pipeline itself, stored in pipeline_metrics."""
+
+import logging
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+import pandas as pd
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# Observability table the stage metrics of every run are appended to
+PIPELINE_METRICS_TABLE = 'pipeline_metrics'
+
+# ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+_MAXRSS_UNIT = 1 if sys.platform == 'darwin' else 1024
+
+
+def peak_rss_bytes() -> int:
+    """High-water mark of this process's resident memory so far."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _MAXRSS_UNIT
+
+
+def frame_bytes(df: pd.DataFrame) -> int:
+    """Shallow in-memory size of a DataFrame (object columns count their pointers only)."""
+    return int(df.memory_usage(index=False).sum())
+
+
+def ensure_metrics_table(engine) -> None:
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {PIPELINE_METRICS_TABLE} ("
+            f"component VARCHAR(32) NOT NULL, "
+            f"stage VARCHAR(64) NOT NULL, "
+            f"table_name VARCHAR(64), "
+            f"batch_id VARCHAR(32), "
+            f"calls INTEGER NOT NULL, "
+            f"seconds DOUBLE PRECISION NOT NULL, "
+            f"row_count BIGINT NOT NULL, "
+            f"byte_count BIGINT NOT NULL, "
+            f"peak_rss_bytes BIGINT, "
+            f"started_at TIMESTAMP WITH TIME ZONE NOT NULL, "
+            f"finished_at TIMESTAMP WITH TIME ZONE NOT NULL)"
+        ))
+        conn.execute(text(
+            f"CREATE INDEX IF NOT EXISTS {PIPELINE_METRICS_TABLE}_started_at_idx "
+            f"ON {PIPELINE_METRICS_TABLE} (started_at)"
+        ))
+
+
+class PipelineMetrics:
+    """Stage timings, row/byte counts and peak memory of one pipeline run, accumulated per (stage, table_name)."""
+
+    def __init__(self, component: str, batch_id: Optional[str] = None):
+        self.component = component
+        self.batch_id = batch_id
+        self._entries: Dict[tuple, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, table_name: Optional[str], seconds: float,
+               rows: int = 0, nbytes: int = 0, started_at: Optional[datetime] = None) -> None:
+        finished_at = datetime.now(timezone.utc)
+        started_at = started_at or finished_at
+        peak = peak_rss_bytes()
+        with self._lock:
+            entry = self._entries.get((stage, table_name))
+            if entry is None:
+                self._entries[(stage, table_name)] = {
+                    'component': self.component,
+                    'stage': stage,
+                    'table_name': table_name,
+                    'batch_id': self.batch_id,
+                    'calls': 1,
+                    'seconds': seconds,
+                    'row_count': rows,
+                    'byte_count': nbytes,
+                    'peak_rss_bytes': peak,
+                    'started_at': started_at,
+                    'finished_at': finished_at,
+                }
+                return
+            entry['calls'] += 1
+            entry['seconds'] += seconds
+            entry['row_count'] += rows
+            entry['byte_count'] += nbytes
+            entry['peak_rss_bytes'] = max(entry['peak_rss_bytes'], peak)
+            entry['finished_at'] = finished_at
+
+    @contextmanager
+    def stage(self, stage: str, table_name: Optional[str] = None) -> Iterator[Dict[str, int]]:
+        """Time the block as one call of stage; set 'rows' and 'bytes' on the yielded dict."""
+        counts = {'rows': 0, 'bytes': 0}
+        started_at = datetime.now(timezone.utc)
+        started = time.perf_counter()
+        try:
+            yield counts
+        finally:
+            self.record(stage, table_name, time.perf_counter() - started,
+                        rows=counts['rows'], nbytes=counts['bytes'], started_at=started_at)
+
+    def as_records(self) -> List[Dict[str, Any]]:
+        """JSON-serializable stage entries, e.g. for XCom."""
+        with self._lock:
+            entries = [dict(entry) for entry in self._entries.values()]
+        for entry in entries:
+            entry['seconds'] = round(entry['seconds'], 4)
+            entry['started_at'] = entry['started_at'].isoformat()
+            entry['finished_at'] = entry['finished_at'].isoformat()
+        return entries
+
+    def save(self, engine) -> int:
+        """Append the stage entries to pipeline_metrics; failures are logged, never raised. Returns the rows written."""
+        with self._lock:
+            entries = [dict(entry) for entry in self._entries.values()]
+        if not entries:
+            return 0
+        try:
+            ensure_metrics_table(engine)
+            columns = list(entries[0])
+            with engine.begin() as conn:
+                conn.execute(
+                    text(
+                        f"INSERT INTO {PIPELINE_METRICS_TABLE} ({', '.join(columns)}) "
+                        f"VALUES ({', '.join(f':{column}' for column in columns)})"
+                    ),
+                    entries
+                )
+            return len(entries)
+        except Exception as e:
+            logger.warning(f"Could not write {self.component} metrics to {PIPELINE_METRICS_TABLE}: {str(e)}")
+            return 0
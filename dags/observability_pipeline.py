@@ -7,8 +7,9 @@ import os
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from extract.airflow_metadata import AirflowMetadataExtractor
-from quality.data_quality_checks import DataQualityChecker
+# The scheduler re-parses this file every parse interval. The extract and quality packages pull in
+# pandas, pyarrow and Great Expectations, so they are imported inside the task callables only;
+# benchmarks/dag_parse.py fails when one of them leaks back into the parse path.
 
 default_args = {
     'owner': 'data-engineering',
@@ -31,34 +32,99 @@ dag = DAG(
     start_date=days_ago(1),
     catchup=False,
     tags=['observability', 'metadata', 'data-quality'],
+    params={
+        # Re-read window before each table's watermark, merged by the upsert load
+        'watermark_overlap_minutes': 5,
+        # Quality checks validate only the latest load batch, except on this weekday (0=Monday)
+        # when they re-validate the full tables
+        'deep_check_weekday': 6,
+        # Directory of the Parquet archive (table=/date= partitions); None disables archiving
+        'archive_path': None,
+        # Local directory extracted chunks are spooled to (Arrow IPC) so load retries replay them
+        # instead of re-querying the metadata DB; None loads straight from the source
+        'spool_dir': os.path.join(os.path.expanduser(os.environ.get('AIRFLOW_HOME', '~/airflow')),
+                                  'observability_spool'),
+        # Extraction runs as one mapped task per dag_id hash shard (x time slice); raise with the worker pool
+        'dag_shards': 4,
+        # Time slices of each shard's change window; above 1 the DAG stops building duration sketches,
+        # since concurrent slices of the same DAG cannot merge into one sketch safely
+        'time_slices': 1,
+        # Quality checks run concurrently, each cancelled (and reported as timed out) after this long
+        'check_timeout_seconds': 300,
+    },
     doc_md="""
     ## Tasks
     
-    1. **extract_airflow_metadata**: Extracts dag_run and task_instance metadata
-    2. **run_data_quality_checks**: Runs data quality checks on loaded data
+    1. **plan_extraction**: Pins the incremental window and splits it into shards
+    2. **extract_airflow_metadata**: Extracts dag_run and task_instance metadata, one mapped task per shard
+    3. **merge_extraction_results**: Sums the shard counts and advances the watermarks
+    4. **run_data_quality_checks**: Runs data quality checks on the batches of every shard
+
+    Every extract_airflow_metadata shard and run_data_quality_checks record
+    per-stage timings, rows, bytes and peak memory in the `pipeline_metrics`
+    table and push them to XCom under `pipeline_metrics`.
     
     """,
 )
 
 
-def extract_metadata_task(**context):
+def _extractor(params, dag_ids=None):
+    from extract.airflow_metadata import AirflowMetadataExtractor
+
+    return AirflowMetadataExtractor(
+        observability_conn_id='observability_postgres',
+        watermark_overlap=timedelta(minutes=params.get('watermark_overlap_minutes', 5)),
+        preload_validation='quarantine',
+        build_sketches=params.get('time_slices', 1) == 1,
+        compact_frames=True,
+        archive_path=params.get('archive_path'),
+        spool_dir=params.get('spool_dir'),
+        dag_ids=dag_ids,
+    )
+
+
+def plan_extraction_task(**context):
     import logging
-    from datetime import datetime, timedelta
+    from extract.sharding import plan_shards
     
     logger = logging.getLogger(__name__)
-    logger.info("Starting metadata extraction task")
+    logger.info("Planning metadata extraction shards")
     
     try:
+        params = context.get('params') or {}
+        plan = plan_shards(_extractor(params), dag_shards=params.get('dag_shards', 4),
+                           time_slices=params.get('time_slices', 1))
+        # The full windows are committed as watermarks by the reduce task once every shard loaded
+        context['ti'].xcom_push(key='changed_windows', value=plan['changed_windows'])
+        
+        logger.info(f"Planned {len(plan['shards'])} shards, windows: {plan['changed_windows']}")
+
+        # One op_kwargs dict per mapped extract_airflow_metadata task
+        return [{'shard': shard} for shard in plan['shards']]
         
-        execution_date = context['execution_date']
-        start_date = execution_date - timedelta(days=1)
-        end_date = execution_date
+    except Exception as e:
+        logger.error(f"Error planning metadata extraction: {str(e)}", exc_info=True)
+        raise
+
+
+def extract_metadata_task(shard, **context):
+    import logging
+    from extract.sharding import extract_shard
+    
+    logger = logging.getLogger(__name__)
+    logger.info(f"Starting metadata extraction task for shard {shard['index']}")
+    
+    try:
         
-        logger.info(f"Extracting metadata from {start_date} to {end_date}")
+        params = context.get('params') or {}
+        extractor = _extractor(params, dag_ids=shard['dag_ids'])
         
-        extractor = AirflowMetadataExtractor(observability_conn_id='observability_postgres')
+        logger.info(f"Extracting shard {shard['index']}: windows {shard['changed_windows']}")
         
-        results = extractor.extract_and_load(start_date=start_date, end_date=end_date)
+        # Keyed by run_id and shard so a retry of this task on the same worker replays the spool
+        results = extract_shard(extractor, shard, spool_id=f"{context['run_id']}-shard{shard['index']}")
+        # Stage metrics go to their own XCom key (they are also in the pipeline_metrics table)
+        context['ti'].xcom_push(key='pipeline_metrics', value=results.pop('metrics', []))
         
         logger.info(f"Metadata extraction completed successfully: {results}")
 
@@ -69,27 +135,65 @@ def extract_metadata_task(**context):
         raise
 
 
+def merge_extraction_results_task(**context):
+    import logging
+    from extract.sharding import commit_watermarks, merge_shard_results
+    
+    logger = logging.getLogger(__name__)
+    logger.info("Merging metadata extraction shard results")
+    
+    try:
+        ti = context['ti']
+        params = context.get('params') or {}
+        # Pulling a mapped task returns the results of every map index
+        shard_results = list(ti.xcom_pull(task_ids='extract_airflow_metadata') or [])
+        changed_windows = ti.xcom_pull(task_ids='plan_extraction', key='changed_windows')
+
+        results = merge_shard_results(shard_results)
+        results.update(commit_watermarks(_extractor(params), changed_windows))
+        
+        logger.info(f"Merged {results['shards']} shards: {results}")
+
+        return results
+        
+    except Exception as e:
+        logger.error(f"Error merging extraction results: {str(e)}", exc_info=True)
+        raise
+
+
 def run_quality_checks_task(**context):
     import logging
+    from quality.data_quality_checks import DataQualityChecker
     
     logger = logging.getLogger(__name__)
     logger.info("Starting data quality checks task")
     
     try:
         ti = context['ti']
-        extraction_results = ti.xcom_pull(task_ids='extract_airflow_metadata')
+        extraction_results = ti.xcom_pull(task_ids='merge_extraction_results')
         
         if extraction_results:
             logger.info(f"Previous extraction results: {extraction_results}")
 
+        params = context.get('params') or {}
+        deep_check = context['execution_date'].weekday() == params.get('deep_check_weekday', 6)
+        batch_id = None
+        if extraction_results and not deep_check:
+            batch_id = extraction_results.get('batch_ids')
+
         checker = DataQualityChecker(observability_conn_id='observability_postgres')
 
-        check_results = checker.run_all_checks()
+        check_timeout_seconds = params.get('check_timeout_seconds', 300)
+        check_results = checker.run_all_checks(
+            batch_id=batch_id, parallel=True,
+            check_timeout_ms=int(check_timeout_seconds * 1000) if check_timeout_seconds else None,
+        )
+        ti.xcom_push(key='pipeline_metrics', value=check_results.pop('metrics', []))
         
         logger.info(f"Data quality checks completed: {check_results['passed_count']}/{check_results['total_count']} passed")
         
         for check in check_results['checks']:
-            status = "PASSED" if check.get('passed', False) else "FAILED"
+            status = check.get('status', 'failed').upper()
             logger.info(f"  {check.get('check_name', 'unknown')}: {status} - {check.get('message', '')}")
 
         if not check_results['all_passed']:
@@ -106,14 +210,41 @@ def run_quality_checks_task(**context):
 
 
 # Task definitions
-extract_metadata = PythonOperator(
+plan_extraction = PythonOperator(
+    task_id='plan_extraction',
+    python_callable=plan_extraction_task,
+    provide_context=True,
+    dag=dag,
+    doc_md="""
+    Pins the incremental window of each table and splits the extraction into
+    `dag_shards` dag_id hash shards times `time_slices` slices of that window.
+    """,
+)
+
+extract_metadata = PythonOperator.partial(
     task_id='extract_airflow_metadata',
     python_callable=extract_metadata_task,
+    dag=dag,
+    doc_md="""
+    Extracts one shard of dag_run and task_instance metadata from Airflow's
+    metadata database and loads it into the observability PostgreSQL database.
+    Mapped over the shards of `plan_extraction`, so extraction spreads across
+    the worker pool.
+
+    Chunks are spooled under the `spool_dir` param first; a retry after a failed
+    load on the same worker replays the spool rather than querying the metadata
+    database again. The spool is removed once the load succeeds.
+    """,
+).expand(op_kwargs=plan_extraction.output)
+
+merge_extraction_results = PythonOperator(
+    task_id='merge_extraction_results',
+    python_callable=merge_extraction_results_task,
     provide_context=True,
     dag=dag,
     doc_md="""
-    Extracts dag_run and task_instance metadata from Airflow's metadata database
-    and loads it into the observability PostgreSQL database.
+    Sums the per-shard counts and, only after every shard succeeded, advances
+    the watermarks to the planned windows.
     """,
 )
 
@@ -127,8 +258,12 @@ run_quality_checks = PythonOperator(
     - Row count validation
     - Null value checks for critical columns
     - Data freshness validation
+
+    Every check runs as its own query on a thread pool, with a
+    `check_timeout_seconds` statement timeout; a check that runs past it is
+    reported as timed out rather than failing the task.
     """,
 )
 
-extract_metadata >> run_quality_checks
+plan_extraction >> extract_metadata >> merge_extraction_results >> run_quality_checks
 
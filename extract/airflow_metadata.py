@@ -1,67 +1,332 @@
+import io
 import logging
-from datetime import datetime
-from typing import Dict, List, Optional
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from itertools import chain, islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 import pandas as pd
-from sqlalchemy import create_engine, text
-from airflow.hooks.base import BaseHook
+from sqlalchemy import and_, func, inspect, select, text
+from sqlalchemy.exc import IntegrityError
 from airflow.models import DagRun, TaskInstance
 from airflow import settings
+from common.engines import get_engine
+from common.metrics import PipelineMetrics, frame_bytes
+from extract import frames, rollups, schema
+from extract.archive import ParquetArchive
+from extract.schema import DEFAULT_CLUSTER_ID, NATURAL_KEYS
+from extract.sketches import DEFAULT_RELATIVE_ACCURACY, DurationSketchBuilder, ensure_sketch_table
+from extract.spool import DEFAULT_SPOOL_RETENTION, ChunkSpool, collect_garbage
+from quality.dataframe_validation import DataFrameValidator, merge_validation_summaries
 
 logger = logging.getLogger(__name__)
+
+# Rows fetched per round-trip from the server-side cursor and per DataFrame chunk
+DEFAULT_CHUNK_SIZE = 50000
+
+# Observability table holding the per-source high-water mark used by incremental extraction
+WATERMARK_TABLE = 'extraction_watermarks'
+
+# Re-read this much before the stored watermark to catch rows committed out of order
+DEFAULT_WATERMARK_OVERLAP = timedelta(minutes=5)
+
+# Extracted chunks allowed to wait for the loader per stream in concurrent mode
+DEFAULT_QUEUE_SIZE = 4
+
+_END_OF_STREAM = object()
+
+# Observability table recording every load batch, referenced by batch-scoped quality checks
+LOAD_LEDGER_TABLE = 'load_ledger'
+
+SOURCE_MODELS = {
+    'dag_runs': DagRun,
+    'task_instances': TaskInstance,
+}
+
+# Source columns read for each raw table, in the order of its query rows. task_instance has
+# no execution_date column since Airflow 2.2, so task instances read their dag_run's.
+QUERY_COLUMNS = {
+    'dag_runs': [
+        DagRun.dag_id,
+        DagRun.execution_date,
+        DagRun.state,
+        DagRun.start_date,
+        DagRun.end_date,
+    ],
+    'task_instances': [
+        TaskInstance.dag_id,
+        TaskInstance.task_id,
+        DagRun.execution_date,
+        TaskInstance.map_index,
+        TaskInstance.state,
+        TaskInstance.start_date,
+        TaskInstance.end_date,
+        TaskInstance.duration,
+        TaskInstance.try_number,
+    ],
+}
+
+
+# Join of task_instance to its dag_run on Airflow's (dag_id, run_id) foreign key
+TASK_INSTANCE_DAG_RUN = and_(TaskInstance.dag_id == DagRun.dag_id, TaskInstance.run_id == DagRun.run_id)
+
+
+def join_source_tables(query, table_name: str):
+    """Join the source tables QUERY_COLUMNS[table_name] reads onto an ORM query or Core select of them."""
+    if table_name == 'task_instances':
+        return query.join(DagRun, TASK_INSTANCE_DAG_RUN)
+    return query
+
+
+def _watermark_column(model):
+    """Column that advances whenever a source row changes (updated_at on Airflow >= 2.x)."""
+    if hasattr(model, 'updated_at'):
+        return model.updated_at
+    return func.coalesce(model.end_date, model.start_date)
+
+
+def apply_window_filters(query, table_name: str, start_date: Optional[datetime] = None,
+                         end_date: Optional[datetime] = None,
+                         changed_window: Optional[Tuple[Optional[datetime], datetime]] = None,
+                         dag_ids: Optional[Sequence[str]] = None):
+    """Restrict an ORM query or Core select on table_name's source model to the extraction window."""
+    model = SOURCE_MODELS[table_name]
+    if dag_ids is not None:
+        query = query.filter(model.dag_id.in_(dag_ids))
+    # Task instances are joined to their dag_run (join_source_tables) for its execution_date
+    if start_date:
+        query = query.filter(DagRun.execution_date >= start_date)
+    if end_date:
+        query = query.filter(DagRun.execution_date <= end_date)
+    if changed_window:
+        changed_after, changed_until = changed_window
+        if changed_after:
+            query = query.filter(_watermark_column(model) >= changed_after)
+        query = query.filter(_watermark_column(model) <= changed_until)
+    return query
+
+
+def earliest_change_select(table_name: str):
+    """SELECT of the oldest change to table_name's source rows."""
+    return select(func.min(_watermark_column(SOURCE_MODELS[table_name])))
+
+
+def latest_change_select(table_name: str, watermark: Optional[datetime] = None):
+    """SELECT of the newest change to table_name's source rows, only counting changes after watermark."""
+    column = _watermark_column(SOURCE_MODELS[table_name])
+    query = select(func.max(column))
+    if watermark:
+        query = query.where(column > watermark)
+    return query
+
+
+def watermark_key(table_name: str, cluster_id: str = DEFAULT_CLUSTER_ID) -> str:
+    """extraction_watermarks key of table_name in cluster_id (the bare table name for the default cluster)."""
+    return table_name if cluster_id == DEFAULT_CLUSTER_ID else f"{cluster_id}:{table_name}"
+
+
+def _is_unique_violation(error: Optional[BaseException]) -> bool:
+    """Whether error is (or was raised from) a duplicate key, from SQLAlchemy, pandas or psycopg2's COPY."""
+    while error is not None:
+        if isinstance(error, IntegrityError) or getattr(error, 'pgcode', None) == '23505':
+            return True
+        error = error.__cause__
+    return False
+
+
+def _as_utc(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = pd.Timestamp(value).to_pydatetime()
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
 class AirflowMetadataExtractor:
-    def __init__(self, observability_conn_id: str = 'observability_postgres'):
+    def __init__(self, observability_conn_id: str = 'observability_postgres',
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, use_copy: bool = True,
+                 watermark_overlap: timedelta = DEFAULT_WATERMARK_OVERLAP,
+                 preload_validation: Optional[str] = None,
+                 partition_interval: Optional[str] = None, partitions_ahead: int = 3,
+                 build_sketches: bool = False,
+                 sketch_accuracy: float = DEFAULT_RELATIVE_ACCURACY,
+                 maintain_rollups: bool = True,
+                 archive_path: Optional[str] = None,
+                 compact_frames: bool = False,
+                 max_source_rows_per_sec: Optional[float] = None,
+                 cluster_id: str = DEFAULT_CLUSTER_ID,
+                 spool_dir: Optional[str] = None,
+                 spool_retention: timedelta = DEFAULT_SPOOL_RETENTION,
+                 dag_ids: Optional[Sequence[str]] = None):
         self.observability_conn_id = observability_conn_id
         self.observability_engine = None
+        self.chunk_size = chunk_size
+        self.use_copy = use_copy
+        self.watermark_overlap = watermark_overlap
+        # None, 'validate' (report only) or 'quarantine' (divert failing rows to <table>_quarantine)
+        if preload_validation not in (None, 'validate', 'quarantine'):
+            raise ValueError(f"Unknown preload_validation mode: {preload_validation}")
+        self.preload_validation = preload_validation
+        self._validators: Dict[str, DataFrameValidator] = {}
+        # Range-partition new raw tables by execution_date ('day' or 'month'), PostgreSQL only
+        if partition_interval not in (None,) + schema.PARTITION_INTERVALS:
+            raise ValueError(f"Unknown partition_interval: {partition_interval}")
+        self.partition_interval = partition_interval
+        self.partitions_ahead = partitions_ahead
+        # Merge per-(cluster_id, dag_id, task_id, day) duration sketches into duration_sketches while loading
+        self.build_sketches = build_sketches
+        self.sketch_accuracy = sketch_accuracy
+        # Keep <table>_rollup_hourly/_daily current in the same transaction as every raw load
+        self.maintain_rollups = maintain_rollups
+        self._rollup_tables = set()
+        # Also write every loaded chunk to a Parquet archive (table=/date= partitions) under archive_path
+        self.archive = ParquetArchive(archive_path) if archive_path else None
+        # Build extracted frames column-wise with categorical/int16/float32 dtypes (see extract.frames)
+        self.compact_frames = compact_frames
+        # Pace streamed reads from the Airflow metadata DB to at most this many rows per second
+        self.max_source_rows_per_sec = max_source_rows_per_sec
+        self._next_read_at = 0.0
+        self._throttle_lock = threading.Lock()
+        # Airflow deployment the rows come from; part of the natural key of the raw tables
+        self.cluster_id = cluster_id
+        # Spool extracted chunks as Arrow IPC files under spool_dir and load from them (see extract.spool)
+        self.spool_dir = spool_dir
+        self.spool_retention = spool_retention
+        # Only extract rows of these DAGs (one dag_id shard of a mapped extraction, see extract.sharding)
+        self.dag_ids = list(dag_ids) if dag_ids is not None else None
+        self._known_tables = set()
+        self._partitioned_tables = set()
+        self._partitions = set()
+        # Per-table load throughput: {table_name: {'method', 'rows', 'seconds'}}
+        self.load_stats: Dict[str, Dict] = {}
+        # Query/fetch/build/load timings of the current run, written to pipeline_metrics
+        self.metrics = PipelineMetrics('extract')
+        self._natural_key_tables = set()
+        self._watermark_table_ready = False
+        self._ledger_ready = False
+        self._batch_column_tables = set()
         
     def _get_observability_connection(self):
         """Get connection to observability PostgreSQL database."""
         if self.observability_engine is None:
-            conn = BaseHook.get_connection(self.observability_conn_id)
-            connection_string = (
-                f"postgresql://{conn.login}:{conn.password}@{conn.host}:{conn.port}/{conn.schema}"
-            )
-            self.observability_engine = create_engine(connection_string)
+            self.observability_engine = get_engine(self.observability_conn_id)
         return self.observability_engine
     
+    def _dag_runs_query(self, session, start_date: Optional[datetime] = None,
+                        end_date: Optional[datetime] = None,
+                        changed_window: Optional[Tuple[Optional[datetime], datetime]] = None):
+        query = join_source_tables(session.query(*QUERY_COLUMNS['dag_runs']), 'dag_runs')
+        return apply_window_filters(query, 'dag_runs', start_date, end_date, changed_window, self.dag_ids)
+
+    def _task_instances_query(self, session, start_date: Optional[datetime] = None,
+                              end_date: Optional[datetime] = None,
+                              changed_window: Optional[Tuple[Optional[datetime], datetime]] = None):
+        query = join_source_tables(session.query(*QUERY_COLUMNS['task_instances']), 'task_instances')
+        return apply_window_filters(query, 'task_instances', start_date, end_date, changed_window, self.dag_ids)
+
+    @staticmethod
+    def _dag_run_records(dag_runs) -> List[Dict]:
+        dag_run_data = []
+        for dr in dag_runs:
+            # Calculate duration in seconds
+            duration = None
+            if dr.start_date and dr.end_date:
+                duration = (dr.end_date - dr.start_date).total_seconds()
+
+            dag_run_data.append({
+                'dag_id': dr.dag_id,
+                'execution_date': dr.execution_date,
+                'state': dr.state,
+                'start_date': dr.start_date,
+                'end_date': dr.end_date,
+                'duration': duration,
+                'extracted_at': datetime.now(timezone.utc)
+            })
+        return dag_run_data
+
+    @staticmethod
+    def _task_instance_records(task_instances) -> List[Dict]:
+        task_instance_data = []
+        for ti in task_instances:
+            task_instance_data.append({
+                'dag_id': ti.dag_id,
+                'task_id': ti.task_id,
+                'execution_date': ti.execution_date,
+                'map_index': ti.map_index,
+                'state': ti.state,
+                'start_date': ti.start_date,
+                'end_date': ti.end_date,
+                'duration': ti.duration,
+                'try_number': ti.try_number,
+                'extracted_at': datetime.now(timezone.utc)
+            })
+        return task_instance_data
+
+    def _dag_run_frame(self, dag_runs) -> pd.DataFrame:
+        if self.compact_frames:
+            return frames.compact_frame(dag_runs, 'dag_runs')
+        return pd.DataFrame(self._dag_run_records(dag_runs))
+
+    def _task_instance_frame(self, task_instances) -> pd.DataFrame:
+        if self.compact_frames:
+            return frames.compact_frame(task_instances, 'task_instances')
+        return pd.DataFrame(self._task_instance_records(task_instances))
+
+    def _throttle(self, rows: int) -> None:
+        """Sleep so reads from the source stay under max_source_rows_per_sec (shared by both streams)."""
+        if not self.max_source_rows_per_sec:
+            return
+        with self._throttle_lock:
+            # Each chunk books rows / rate seconds of read time after the previous booking
+            now = time.monotonic()
+            start = max(self._next_read_at, now)
+            self._next_read_at = start + rows / self.max_source_rows_per_sec
+            delay = start - now
+        if delay > 0:
+            with self.metrics.stage('throttle'):
+                time.sleep(delay)
+
+    def _iter_query_chunks(self, query, to_frame, chunk_size: int,
+                           table_name: Optional[str] = None) -> Iterator[pd.DataFrame]:
+        """Stream a query through a server-side cursor as DataFrames of at most chunk_size rows."""
+        with self.metrics.stage('query', table_name):
+            # yield_per() is lazy, the statement only executes on the first fetch
+            rows = iter(query.yield_per(chunk_size))
+            first = next(rows, None)
+        if first is None:
+            return
+        rows = chain([first], rows)
+        while True:
+            with self.metrics.stage('fetch', table_name) as fetched:
+                batch = list(islice(rows, chunk_size))
+                fetched['rows'] = len(batch)
+            if not batch:
+                return
+            self._throttle(len(batch))
+            with self.metrics.stage('build', table_name) as built:
+                df = to_frame(batch)
+                built['rows'], built['bytes'] = len(df), frame_bytes(df)
+            yield df
+
     def extract_dag_runs(self, start_date: Optional[datetime] = None, 
-                        end_date: Optional[datetime] = None) -> pd.DataFrame:
+                        end_date: Optional[datetime] = None,
+                        changed_window: Optional[Tuple[Optional[datetime], datetime]] = None) -> pd.DataFrame:
         logger.info("Extracting dag_run metadata from Airflow database")
         
         session = settings.Session()
         try:
-            query = session.query(
-                DagRun.dag_id,
-                DagRun.execution_date,
-                DagRun.state,
-                DagRun.start_date,
-                DagRun.end_date
-            )
-            
-            if start_date:
-                query = query.filter(DagRun.execution_date >= start_date)
-            if end_date:
-                query = query.filter(DagRun.execution_date <= end_date)
-            
-            dag_runs = query.all()
-            
-            dag_run_data = []
-            for dr in dag_runs:
-                # Calculate duration in seconds
-                duration = None
-                if dr.start_date and dr.end_date:
-                    duration = (dr.end_date - dr.start_date).total_seconds()
-                
-                dag_run_data.append({
-                    'dag_id': dr.dag_id,
-                    'execution_date': dr.execution_date,
-                    'state': dr.state,
-                    'start_date': dr.start_date,
-                    'end_date': dr.end_date,
-                    'duration': duration,
-                    'extracted_at': datetime.utcnow()
-                })
-            
-            df = pd.DataFrame(dag_run_data)
+            with self.metrics.stage('query', 'dag_runs') as fetched:
+                dag_runs = self._dag_runs_query(session, start_date, end_date, changed_window).all()
+                fetched['rows'] = len(dag_runs)
+
+            with self.metrics.stage('build', 'dag_runs') as built:
+                df = self._dag_run_frame(dag_runs)
+                built['rows'], built['bytes'] = len(df), frame_bytes(df)
             logger.info(f"Extracted {len(df)} dag_run records")
             return df
             
@@ -72,44 +337,19 @@ class AirflowMetadataExtractor:
             session.close()
     
     def extract_task_instances(self, start_date: Optional[datetime] = None,
-                              end_date: Optional[datetime] = None) -> pd.DataFrame:
+                              end_date: Optional[datetime] = None,
+                              changed_window: Optional[Tuple[Optional[datetime], datetime]] = None) -> pd.DataFrame:
         logger.info("Extracting task_instance metadata from Airflow database")
         
         session = settings.Session()
         try:
-            query = session.query(
-                TaskInstance.dag_id,
-                TaskInstance.task_id,
-                TaskInstance.execution_date,
-                TaskInstance.state,
-                TaskInstance.start_date,
-                TaskInstance.end_date,
-                TaskInstance.duration,
-                TaskInstance.try_number
-            )
-            
-            if start_date:
-                query = query.filter(TaskInstance.execution_date >= start_date)
-            if end_date:
-                query = query.filter(TaskInstance.execution_date <= end_date)
-            
-            task_instances = query.all()
-            
-            task_instance_data = []
-            for ti in task_instances:
-                task_instance_data.append({
-                    'dag_id': ti.dag_id,
-                    'task_id': ti.task_id,
-                    'execution_date': ti.execution_date,
-                    'state': ti.state,
-                    'start_date': ti.start_date,
-                    'end_date': ti.end_date,
-                    'duration': ti.duration,
-                    'try_number': ti.try_number,
-                    'extracted_at': datetime.utcnow()
-                })
-            
-            df = pd.DataFrame(task_instance_data)
+            with self.metrics.stage('query', 'task_instances') as fetched:
+                task_instances = self._task_instances_query(session, start_date, end_date, changed_window).all()
+                fetched['rows'] = len(task_instances)
+
+            with self.metrics.stage('build', 'task_instances') as built:
+                df = self._task_instance_frame(task_instances)
+                built['rows'], built['bytes'] = len(df), frame_bytes(df)
             logger.info(f"Extracted {len(df)} task_instance records")
             return df
             
@@ -118,9 +358,58 @@ class AirflowMetadataExtractor:
             raise
         finally:
             session.close()
+
+    def iter_dag_runs(self, start_date: Optional[datetime] = None,
+                      end_date: Optional[datetime] = None,
+                      chunk_size: Optional[int] = None,
+                      changed_window: Optional[Tuple[Optional[datetime], datetime]] = None) -> Iterator[pd.DataFrame]:
+        """Stream dag_run metadata through a server-side cursor as DataFrames of at most chunk_size rows."""
+        chunk_size = chunk_size or self.chunk_size
+        logger.info(f"Streaming dag_run metadata from Airflow database (chunk_size={chunk_size})")
+
+        session = settings.Session()
+        try:
+            query = self._dag_runs_query(session, start_date, end_date, changed_window)
+            total = 0
+            for df in self._iter_query_chunks(query, self._dag_run_frame, chunk_size, 'dag_runs'):
+                total += len(df)
+                yield df
+            logger.info(f"Extracted {total} dag_run records")
+
+        except Exception as e:
+            logger.error(f"Error extracting dag_run metadata: {str(e)}")
+            raise
+        finally:
+            session.close()
+
+    def iter_task_instances(self, start_date: Optional[datetime] = None,
+                            end_date: Optional[datetime] = None,
+                            chunk_size: Optional[int] = None,
+                            changed_window: Optional[Tuple[Optional[datetime], datetime]] = None) -> Iterator[pd.DataFrame]:
+        """Stream task_instance metadata through a server-side cursor as DataFrames of at most chunk_size rows."""
+        chunk_size = chunk_size or self.chunk_size
+        logger.info(f"Streaming task_instance metadata from Airflow database (chunk_size={chunk_size})")
+
+        session = settings.Session()
+        try:
+            query = self._task_instances_query(session, start_date, end_date, changed_window)
+            total = 0
+            for df in self._iter_query_chunks(query, self._task_instance_frame, chunk_size, 'task_instances'):
+                total += len(df)
+                yield df
+            logger.info(f"Extracted {total} task_instance records")
+
+        except Exception as e:
+            logger.error(f"Error extracting task_instance metadata: {str(e)}")
+            raise
+        finally:
+            session.close()
     
     def load_to_observability_db(self, df: pd.DataFrame, table_name: str, 
-                                 if_exists: str = 'append') -> None:
+                                 if_exists: Optional[str] = None) -> None:
+        """Load a DataFrame into table_name; if_exists defaults to 'upsert' for keyed tables, else 'append'."""
+        if if_exists is None:
+            if_exists = 'upsert' if table_name in NATURAL_KEYS else 'append'
         if df.empty:
             logger.warning(f"DataFrame is empty, skipping load to {table_name}")
             return
@@ -128,60 +417,823 @@ class AirflowMetadataExtractor:
         logger.info(f"Loading {len(df)} records to {table_name} table")
         
         engine = self._get_observability_connection()
+        if table_name in schema.TABLE_COLUMNS and 'cluster_id' not in df:
+            df = df.assign(cluster_id=self.cluster_id)
+        if table_name in schema.TABLE_COLUMNS:
+            df = df.assign(loaded_at=datetime.now(timezone.utc))
         
         try:
             # Ensure table exists with proper schema
             self._create_table_if_not_exists(table_name, df, engine)
+            self._ensure_partitions_for(df, table_name)
+            self._ensure_rollup_tables(table_name, engine)
             
-            # Load data
-            df.to_sql(
-                name=table_name,
-                con=engine,
-                if_exists=if_exists,
-                index=False,
-                method='multi',
-                chunksize=1000
-            )
+            started = time.perf_counter()
+            if if_exists == 'upsert':
+                method = 'upsert'
+                self._upsert_to_observability_db(df, table_name, engine)
+            elif if_exists == 'append' and self._supports_copy(engine):
+                method = 'copy'
+                self._copy_to_observability_db(df, table_name, engine)
+            else:
+                method = 'to_sql'
+                with engine.begin() as conn:
+                    df.to_sql(
+                        name=table_name,
+                        con=conn,
+                        if_exists=if_exists,
+                        index=False,
+                        method='multi',
+                        chunksize=1000
+                    )
+                    if self._maintains_rollups(table_name):
+                        if if_exists == 'replace':
+                            for grain in rollups.ROLLUP_GRAINS:
+                                conn.execute(text(f"DELETE FROM {rollups.rollup_table_name(table_name, grain)}"))
+                        rollups.apply_rollup_deltas(conn, table_name, df)
+            elapsed = time.perf_counter() - started
+            self._record_load_stats(table_name, method, len(df), elapsed)
+            self.metrics.record('load', table_name, elapsed, rows=len(df), nbytes=frame_bytes(df))
             
-            logger.info(f"Successfully loaded {len(df)} records to {table_name}")
+            logger.info(
+                f"Successfully loaded {len(df)} records to {table_name} via {method} "
+                f"in {elapsed:.2f}s ({len(df) / elapsed if elapsed > 0 else 0:.0f} rows/s)"
+            )
             
         except Exception as e:
+            if if_exists == 'append' and table_name in NATURAL_KEYS and _is_unique_violation(e):
+                message = (
+                    f"Appending to {table_name} hit rows already loaded on its natural key "
+                    f"({', '.join(NATURAL_KEYS[table_name])}); load overlapping windows with load_mode='upsert'"
+                )
+                logger.error(message)
+                raise ValueError(message) from e
             logger.error(f"Error loading data to {table_name}: {str(e)}")
             raise
+
+    def _supports_copy(self, engine) -> bool:
+        """COPY FROM STDIN is only available on PostgreSQL through psycopg2."""
+        return (
+            self.use_copy
+            and engine.dialect.name == 'postgresql'
+            and engine.dialect.driver == 'psycopg2'
+        )
+
+    @staticmethod
+    def _copy_from_dataframe(cursor, df: pd.DataFrame, table_name: str) -> None:
+        """Stream a DataFrame into table_name with COPY ... FROM STDIN using an in-memory CSV buffer."""
+        buffer = io.StringIO()
+        df.to_csv(buffer, index=False, header=False, na_rep='\\N', date_format='%Y-%m-%d %H:%M:%S.%f%z')
+        buffer.seek(0)
+
+        columns = ', '.join(f'"{column}"' for column in df.columns)
+        copy_sql = f"COPY {table_name} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+        cursor.copy_expert(copy_sql, buffer)
+
+    def _copy_to_observability_db(self, df: pd.DataFrame, table_name: str, engine) -> None:
+        with engine.begin() as conn:
+            with conn.connection.cursor() as cursor:
+                self._copy_from_dataframe(cursor, df, table_name)
+            if self._maintains_rollups(table_name):
+                rollups.apply_rollup_deltas(conn, table_name, df)
+
+    def _maintains_rollups(self, table_name: str) -> bool:
+        return self.maintain_rollups and table_name in rollups.ROLLUP_KEYS
+
+    def _ensure_rollup_tables(self, table_name: str, engine) -> None:
+        if not self._maintains_rollups(table_name) or table_name in self._rollup_tables:
+            return
+        rollups.ensure_rollup_tables(engine, table_name)
+        self._rollup_tables.add(table_name)
+
+    def _upsert_to_observability_db(self, df: pd.DataFrame, table_name: str, engine) -> None:
+        """Merge a DataFrame into table_name on its natural key through a staging table, adjusting the rollups."""
+        if table_name not in NATURAL_KEYS:
+            raise ValueError(f"No natural key defined for {table_name}, cannot upsert")
+        key_columns = NATURAL_KEYS[table_name]
+        self._ensure_natural_key(table_name, key_columns, engine)
+
+        # ON CONFLICT cannot touch the same target row twice in one statement
+        df = df.drop_duplicates(subset=key_columns, keep='last')
+
+        staging_table = f"{table_name}_staging"
+        columns = ', '.join(f'"{column}"' for column in df.columns)
+        conflict_columns = ', '.join(f'"{column}"' for column in key_columns)
+        update_columns = ', '.join(
+            f'"{column}" = EXCLUDED."{column}"' for column in df.columns if column not in key_columns
+        )
+
+        with engine.begin() as conn:
+            conn.execute(text(
+                f"CREATE TEMPORARY TABLE {staging_table} AS "
+                f"SELECT {columns} FROM {table_name} WHERE 1 = 0"
+            ))
+            if self._supports_copy(engine):
+                with conn.connection.cursor() as cursor:
+                    self._copy_from_dataframe(cursor, df, staging_table)
+            else:
+                df.to_sql(name=staging_table, con=conn, if_exists='append', index=False,
+                          method='multi', chunksize=1000)
+
+            replaced = None
+            if self._maintains_rollups(table_name):
+                # Previous versions are subtracted from the rollups so re-loaded rows count once
+                replaced = rollups.read_replaced_rows(conn, table_name, staging_table, key_columns)
+
+            # WHERE true keeps SQLite from parsing ON CONFLICT as part of the SELECT
+            conn.execute(text(
+                f"INSERT INTO {table_name} ({columns}) "
+                f"SELECT {columns} FROM {staging_table} WHERE true "
+                f"ON CONFLICT ({conflict_columns}) DO UPDATE SET {update_columns}"
+            ))
+            conn.execute(text(f"DROP TABLE {staging_table}"))
+            if replaced is not None:
+                rollups.apply_rollup_deltas(conn, table_name, df, replaced)
+
+    def _ensure_natural_key(self, table_name: str, key_columns: List[str], engine) -> None:
+        """Create the unique index ON CONFLICT needs, collapsing duplicates left by earlier appends."""
+        if table_name in self._natural_key_tables:
+            return
+
+        index_name = f"{table_name}_natural_key"
+        quoted_keys = ', '.join(f'"{column}"' for column in key_columns)
+        inspector = inspect(engine)
+        primary_key = inspector.get_pk_constraint(table_name).get('constrained_columns') or []
+        existing = {index['name'] for index in inspector.get_indexes(table_name)}
+        if primary_key != key_columns and index_name not in existing:
+            logger.info(f"Creating unique index {index_name} on {table_name} ({', '.join(key_columns)})")
+            with engine.begin() as conn:
+                if engine.dialect.name == 'postgresql':
+                    match = ' AND '.join(f'a."{column}" = b."{column}"' for column in key_columns)
+                    deleted = conn.execute(text(
+                        f"DELETE FROM {table_name} a USING {table_name} b "
+                        f"WHERE a.ctid < b.ctid AND {match}"
+                    ))
+                else:
+                    deleted = conn.execute(text(
+                        f"DELETE FROM {table_name} WHERE rowid NOT IN "
+                        f"(SELECT MAX(rowid) FROM {table_name} GROUP BY {quoted_keys})"
+                    ))
+                if deleted.rowcount:
+                    logger.warning(f"Removed {deleted.rowcount} duplicate rows from {table_name}")
+                conn.execute(text(
+                    f"CREATE UNIQUE INDEX IF NOT EXISTS {index_name} "
+                    f"ON {table_name} ({quoted_keys})"
+                ))
+        self._natural_key_tables.add(table_name)
+
+    def _record_load_stats(self, table_name: str, method: str, rows: int, seconds: float) -> None:
+        stats = self.load_stats.setdefault(table_name, {'method': method, 'rows': 0, 'seconds': 0.0})
+        stats['method'] = method
+        stats['rows'] += rows
+        stats['seconds'] += seconds
+
+    def _load_rows_per_sec(self, table_name: str) -> float:
+        stats = self.load_stats.get(table_name)
+        if not stats or stats['seconds'] <= 0:
+            return 0.0
+        return round(stats['rows'] / stats['seconds'], 1)
+
+    def load_chunks_to_observability_db(self, chunks: Iterable[pd.DataFrame], table_name: str,
+                                        if_exists: Optional[str] = None) -> int:
+        """
+        Load an iterable of DataFrame chunks, one chunk at a time.
+
+        Returns:
+            Total number of rows loaded
+        """
+        total = 0
+        for df in chunks:
+            if df.empty:
+                continue
+            self.load_to_observability_db(df, table_name, if_exists=if_exists)
+            if if_exists == 'replace':
+                if_exists = 'append'
+            total += len(df)
+
+        if total == 0:
+            logger.warning(f"No records streamed, nothing loaded to {table_name}")
+        else:
+            logger.info(f"Successfully loaded {total} records to {table_name} in chunks")
+        return total
     
     def _create_table_if_not_exists(self, table_name: str, df: pd.DataFrame, engine) -> None:
-       
+        """Create table_name on first use, with the typed DDL of extract.schema for the raw and quarantine tables."""
+        if table_name in self._known_tables:
+            return
         try:
-          
-            with engine.connect() as conn:
-                result = conn.execute(text(
-                    f"SELECT EXISTS (SELECT FROM information_schema.tables "
-                    f"WHERE table_name = '{table_name}')"
-                ))
-                table_exists = result.scalar()
-                
-                if not table_exists:
-                    logger.info(f"Creating table {table_name}")
-                   
+            if not inspect(engine).has_table(table_name):
+                logger.info(f"Creating table {table_name}")
+                if table_name in schema.TABLE_COLUMNS:
+                    with engine.begin() as conn:
+                        schema.create_table(conn, table_name, engine.dialect.name,
+                                            partition_interval=self.partition_interval)
+                else:
                     df.head(0).to_sql(name=table_name, con=engine, if_exists='fail', index=False)
-                    logger.info(f"Table {table_name} created successfully")
+                logger.info(f"Table {table_name} created successfully")
+            elif table_name in schema.TABLE_COLUMNS:
+                self._ensure_key_columns(table_name, engine)
+                self._ensure_loaded_at_column(table_name, engine)
+
+            if engine.dialect.name == 'postgresql' and table_name in schema.TABLE_COLUMNS:
+                with engine.connect() as conn:
+                    if schema.is_partitioned(conn, table_name):
+                        self._partitioned_tables.add(table_name)
+                if table_name in self._partitioned_tables and self.partition_interval:
+                    # Keep partitions_ahead periods ready so loads never wait on DDL
+                    now = datetime.now(timezone.utc)
+                    ahead = now
+                    for _ in range(self.partitions_ahead):
+                        ahead = schema.next_partition_start(
+                            schema.partition_start(ahead, self.partition_interval), self.partition_interval
+                        )
+                    self.ensure_partitions(table_name, now, ahead)
+            self._known_tables.add(table_name)
         except Exception as e:
             logger.warning(f"Could not create table {table_name}: {str(e)}")
-           
-    def extract_and_load(self, start_date: Optional[datetime] = None,
-                        end_date: Optional[datetime] = None) -> Dict[str, int]:
+
+    def _ensure_key_columns(self, table_name: str, engine) -> None:
+        """Add natural key columns (cluster_id, map_index) missing from tables created before them."""
+        inspector = inspect(engine)
+        existing = {column['name'] for column in inspector.get_columns(table_name)}
+        column_types = dict(schema.TABLE_COLUMNS[table_name])
+        missing = [column for column in NATURAL_KEYS[table_name] if column not in existing]
+        if not missing:
+            return
+        logger.info(f"Adding {', '.join(missing)} to {table_name}")
+        key_columns = ', '.join(f'"{column}"' for column in NATURAL_KEYS[table_name])
+        primary_key = inspector.get_pk_constraint(table_name)
+        with engine.begin() as conn:
+            for column in missing:
+                conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {column} {column_types[column]}"))
+            # A unique index on the old natural key would still reject the rows the new columns tell apart
+            conn.execute(text(f"DROP INDEX IF EXISTS {table_name}_natural_key"))
+            if primary_key.get('constrained_columns'):
+                if engine.dialect.name == 'postgresql':
+                    conn.execute(text(
+                        f"ALTER TABLE {table_name} DROP CONSTRAINT {primary_key['name']}, "
+                        f"ADD PRIMARY KEY ({key_columns})"
+                    ))
+                else:
+                    logger.warning(
+                        f"{table_name} keeps its primary key ({', '.join(primary_key['constrained_columns'])}); "
+                        f"recreate it to load rows differing only in {', '.join(missing)}"
+                    )
+
+    def _ensure_loaded_at_column(self, table_name: str, engine) -> None:
+        """Add loaded_at (and its index) to raw tables created before loads were stamped."""
+        if 'loaded_at' in {column['name'] for column in inspect(engine).get_columns(table_name)}:
+            return
+        logger.info(f"Adding loaded_at column to {table_name}")
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN loaded_at TIMESTAMP WITH TIME ZONE"))
+            if engine.dialect.name == 'postgresql':
+                schema.create_loaded_at_index(conn, table_name)
+
+    def ensure_partitions(self, table_name: str, first: datetime, last: datetime) -> List[str]:
+        """
+        Create the execution_date partitions of table_name covering [first, last].
+
+        Returns:
+            Names of the partitions that were created or already existed
+        """
+        interval = self.partition_interval
+        if interval is None:
+            raise ValueError("ensure_partitions requires partition_interval to be set")
+        engine = self._get_observability_connection()
+        names = []
+        for start, end in schema.partition_periods(first, last, interval):
+            name = schema.partition_name(table_name, start, interval)
+            if name not in self._partitions:
+                with engine.begin() as conn:
+                    schema.create_partition(conn, table_name, start, end, interval)
+                logger.info(f"Ensured partition {name} for {start.date()} - {end.date()}")
+                self._partitions.add(name)
+            names.append(name)
+        return names
+
+    def _ensure_partitions_for(self, df: pd.DataFrame, table_name: str) -> None:
+        if table_name not in self._partitioned_tables or not self.partition_interval:
+            return
+        execution_dates = pd.to_datetime(df['execution_date'], utc=True)
+        self.ensure_partitions(table_name, execution_dates.min().to_pydatetime(),
+                               execution_dates.max().to_pydatetime())
+
+    def _ensure_watermark_table(self, engine) -> None:
+        if self._watermark_table_ready:
+            return
+        with engine.begin() as conn:
+            conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {WATERMARK_TABLE} ("
+                f"source_table VARCHAR(64) PRIMARY KEY, "
+                f"watermark TIMESTAMP WITH TIME ZONE NOT NULL, "
+                f"updated_at TIMESTAMP WITH TIME ZONE NOT NULL)"
+            ))
+        self._watermark_table_ready = True
+
+    def get_watermark(self, table_name: str, cluster_id: Optional[str] = None) -> Optional[datetime]:
+        """Return the high-water mark already loaded for table_name, or None before the first run."""
+        engine = self._get_observability_connection()
+        self._ensure_watermark_table(engine)
+        with engine.connect() as conn:
+            result = conn.execute(
+                text(f"SELECT watermark FROM {WATERMARK_TABLE} WHERE source_table = :source_table"),
+                {'source_table': watermark_key(table_name, cluster_id or self.cluster_id)}
+            )
+            return _as_utc(result.scalar())
+
+    def commit_watermark(self, table_name: str, watermark: datetime, cluster_id: Optional[str] = None) -> None:
+        """Store watermark as table_name's high-water mark, once every row changed up to it is loaded."""
+        engine = self._get_observability_connection()
+        self._ensure_watermark_table(engine)
+        with engine.begin() as conn:
+            conn.execute(
+                text(
+                    f"INSERT INTO {WATERMARK_TABLE} (source_table, watermark, updated_at) "
+                    f"VALUES (:source_table, :watermark, :updated_at) "
+                    f"ON CONFLICT (source_table) DO UPDATE SET "
+                    f"watermark = EXCLUDED.watermark, updated_at = EXCLUDED.updated_at"
+                ),
+                {
+                    'source_table': watermark_key(table_name, cluster_id or self.cluster_id),
+                    'watermark': watermark,
+                    'updated_at': datetime.now(timezone.utc),
+                }
+            )
+        logger.info(f"Advanced {watermark_key(table_name, cluster_id or self.cluster_id)} watermark to {watermark}")
+
+    def earliest_change(self, table_name: str) -> Optional[datetime]:
+        """Return the oldest change timestamp of table_name in the Airflow metadata database."""
+        session = settings.Session()
+        try:
+            return _as_utc(session.execute(earliest_change_select(table_name)).scalar())
+        finally:
+            session.close()
+
+    def pin_window(self, table_name: str) -> Optional[Tuple[Optional[datetime], datetime]]:
+        """Next incremental (changed_after, changed_until) window, or None; the watermark is not moved."""
+        watermark = self.get_watermark(table_name)
+        changed_after = watermark - self.watermark_overlap if watermark else None
+
+        session = settings.Session()
+        try:
+            changed_until = _as_utc(session.execute(latest_change_select(table_name, watermark)).scalar())
+        finally:
+            session.close()
+
+        if changed_until is None:
+            logger.info(f"No changes to {table_name} since watermark {watermark}")
+            return None
+        logger.info(f"Incremental window for {table_name}: {changed_after} -> {changed_until}")
+        return changed_after, changed_until
+
+    def _changed_window(self, table_name: str, incremental: bool,
+                        changed_windows: Optional[Dict[str, Any]]) -> Optional[Tuple[Optional[datetime], datetime]]:
+        """The fixed window of table_name from changed_windows if given, else the watermark-derived one."""
+        if changed_windows is not None:
+            return changed_windows.get(table_name)
+        return self.pin_window(table_name) if incremental else None
+
+    @staticmethod
+    def _timed_chunks(chunks: Iterable[pd.DataFrame], timing: Dict[str, float]) -> Iterator[pd.DataFrame]:
+        """Yield chunks unchanged while accumulating the time spent producing them."""
+        chunks = iter(chunks)
+        while True:
+            started = time.perf_counter()
+            try:
+                df = next(chunks)
+            except StopIteration:
+                return
+            finally:
+                timing['extract_seconds'] += time.perf_counter() - started
+            yield df
+
+    def load_chunks_pipelined(self, chunks: Iterator[pd.DataFrame], table_name: str,
+                              if_exists: Optional[str] = None, queue_size: int = DEFAULT_QUEUE_SIZE,
+                              timing: Optional[Dict[str, float]] = None) -> int:
+        """
+        Load chunks while a producer thread extracts the next ones into a bounded queue.
+
+        Returns:
+            Total number of rows loaded
+        """
+        timing = timing if timing is not None else {'extract_seconds': 0.0, 'load_seconds': 0.0}
+        chunk_queue = queue.Queue(maxsize=queue_size)
+        stop = threading.Event()
+
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    chunk_queue.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce():
+            try:
+                for df in self._timed_chunks(chunks, timing):
+                    if not put(df):
+                        break
+            except BaseException as e:
+                put(e)
+            finally:
+                if hasattr(chunks, 'close'):
+                    chunks.close()
+                put(_END_OF_STREAM)
+
+        producer = threading.Thread(target=produce, name=f"extract-{table_name}", daemon=True)
+        producer.start()
+
+        total = 0
+        try:
+            while True:
+                item = chunk_queue.get()
+                if item is _END_OF_STREAM:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                if item.empty:
+                    continue
+                started = time.perf_counter()
+                self.load_to_observability_db(item, table_name, if_exists=if_exists)
+                timing['load_seconds'] += time.perf_counter() - started
+                if if_exists == 'replace':
+                    if_exists = 'append'
+                total += len(item)
+        finally:
+            stop.set()
+            producer.join()
+
+        logger.info(f"Successfully loaded {total} records to {table_name} (pipelined)")
+        return total
+
+    @staticmethod
+    def _tag_batch(chunks: Iterable[pd.DataFrame], batch_id: str,
+                   cluster_id: str = DEFAULT_CLUSTER_ID) -> Iterator[pd.DataFrame]:
+        for df in chunks:
+            if not df.empty:
+                df['cluster_id'] = cluster_id
+                df['batch_id'] = batch_id
+            yield df
+
+    def _validate_chunk(self, df: pd.DataFrame, table_name: str, summary: Dict) -> pd.DataFrame:
+        """Run pre-load validation on a chunk, diverting failing rows in quarantine mode."""
+        if df.empty:
+            return df
+        validator = self._validators[table_name]
+        with self.metrics.stage('validate', table_name) as validated:
+            validated['rows'] = len(df)
+            if self.preload_validation == 'quarantine':
+                df, quarantined, validation = validator.split(df)
+            else:
+                validation, quarantined = validator.validate(df), None
+        if quarantined is not None and not quarantined.empty:
+            self.load_to_observability_db(quarantined, schema.quarantine_table_name(table_name))
+            summary['quarantined_count'] = summary.get('quarantined_count', 0) + len(quarantined)
+        summary['validation'] = merge_validation_summaries(summary.get('validation'), validation)
+        return df
+
+    def _validated_chunks(self, chunks: Iterable[pd.DataFrame], table_name: str,
+                          summary: Dict) -> Iterator[pd.DataFrame]:
+        for df in chunks:
+            yield self._validate_chunk(df, table_name, summary)
+
+    def _ensure_load_ledger(self, engine) -> None:
+        with engine.begin() as conn:
+            conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {LOAD_LEDGER_TABLE} ("
+                f"batch_id VARCHAR(32) NOT NULL, "
+                f"table_name VARCHAR(64) NOT NULL, "
+                f"row_count BIGINT NOT NULL, "
+                f"load_mode VARCHAR(16) NOT NULL, "
+                f"started_at TIMESTAMP WITH TIME ZONE NOT NULL, "
+                f"finished_at TIMESTAMP WITH TIME ZONE NOT NULL, "
+                f"PRIMARY KEY (batch_id, table_name))"
+            ))
+
+    def _ensure_batch_column(self, table_name: str, engine) -> None:
+        """Add batch_id (and its index) to raw tables created before loads were batch-tagged."""
+        if not inspect(engine).has_table(table_name):
+            return
+        columns = {column['name'] for column in inspect(engine).get_columns(table_name)}
+        with engine.begin() as conn:
+            if 'batch_id' not in columns:
+                logger.info(f"Adding batch_id column to {table_name}")
+                conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN batch_id VARCHAR(32)"))
+            # Batch-scoped quality checks look rows up by batch_id
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS {table_name}_batch_id_idx ON {table_name} (batch_id)"
+            ))
+
+    def _record_batch(self, batch_id: str, table_name: str, row_count: int, load_mode: str,
+                      started_at: datetime) -> None:
+        engine = self._get_observability_connection()
+        with engine.begin() as conn:
+            conn.execute(
+                text(
+                    f"INSERT INTO {LOAD_LEDGER_TABLE} "
+                    f"(batch_id, table_name, row_count, load_mode, started_at, finished_at) "
+                    f"VALUES (:batch_id, :table_name, :row_count, :load_mode, :started_at, :finished_at)"
+                ),
+                {
+                    'batch_id': batch_id,
+                    'table_name': table_name,
+                    'row_count': row_count,
+                    'load_mode': load_mode,
+                    'started_at': started_at,
+                    'finished_at': datetime.now(timezone.utc),
+                }
+            )
+
+    def _extract_and_load_table(self, table_name: str, start_date: Optional[datetime],
+                                end_date: Optional[datetime], streaming: bool, load_mode: str,
+                                incremental: bool, pipelined: bool, queue_size: int,
+                                batch_id: str, spool: Optional[ChunkSpool] = None,
+                                changed_windows: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        extract, iter_chunks = {
+            'dag_runs': (self.extract_dag_runs, self.iter_dag_runs),
+            'task_instances': (self.extract_task_instances, self.iter_task_instances),
+        }[table_name]
         results = {}
+        timing = {'extract_seconds': 0.0, 'load_seconds': 0.0}
+        started = time.perf_counter()
+        started_at = datetime.now(timezone.utc)
+
+        changed_window = None
+        if spool is not None:
+            # The window the spooled chunks were read with, so the watermark matches what is loaded
+            changed_window = spool.changed_window(table_name)
+        else:
+            changed_window = self._changed_window(table_name, incremental, changed_windows)
+
+        validation_summary = {}
+        archive_summary = {}
+        sketch_builder = None
+        if self.build_sketches:
+            sketch_builder = DurationSketchBuilder(
+                self._get_observability_connection(), table_name, relative_accuracy=self.sketch_accuracy
+            )
+        if incremental and changed_window is None:
+            count = 0
+        elif streaming or pipelined or spool is not None:
+            if spool is not None:
+                source_chunks = self._replayed_chunks(spool, table_name)
+            else:
+                source_chunks = iter_chunks(start_date, end_date, changed_window=changed_window)
+            chunks = self._tag_batch(source_chunks, batch_id, self.cluster_id)
+            if self.preload_validation:
+                chunks = self._validated_chunks(chunks, table_name, validation_summary)
+            if sketch_builder:
+                chunks = sketch_builder.wrap(chunks)
+            if self.archive:
+                chunks = self.archive.wrap(chunks, table_name, batch_id, archive_summary)
+            if pipelined:
+                count = self.load_chunks_pipelined(
+                    chunks, table_name, if_exists=load_mode, queue_size=queue_size, timing=timing
+                )
+            else:
+                count = self.load_chunks_to_observability_db(
+                    self._timed_chunks(chunks, timing), table_name, if_exists=load_mode
+                )
+        else:
+            df = extract(start_date, end_date, changed_window=changed_window)
+            timing['extract_seconds'] = time.perf_counter() - started
+            if not df.empty:
+                df['cluster_id'] = self.cluster_id
+                df['batch_id'] = batch_id
+            if self.preload_validation:
+                df = self._validate_chunk(df, table_name, validation_summary)
+            if sketch_builder:
+                sketch_builder.add(df)
+            if self.archive:
+                archive_summary['files'] = len(self.archive.write(df, table_name, batch_id))
+            self.load_to_observability_db(df, table_name, if_exists=load_mode)
+            count = len(df)
+        results[f'{table_name}_count'] = count
+        if self.preload_validation:
+            results[f'{table_name}_validation'] = validation_summary.get('validation')
+            results[f'{table_name}_quarantined_count'] = validation_summary.get('quarantined_count', 0)
+        if sketch_builder:
+            results[f'{table_name}_sketch_count'] = sketch_builder.flush()
+        if self.archive:
+            results[f'{table_name}_archived_files'] = archive_summary.get('files', 0)
+
+        if changed_window is not None and changed_windows is None:
+            # Fixed windows belong to a sharded run, whose watermarks are saved once every shard is in
+            self.commit_watermark(table_name, changed_window[1])
+            results[f'{table_name}_watermark'] = changed_window[1].isoformat()
+        self._record_batch(batch_id, table_name, count, load_mode, started_at)
+
+        wall_seconds = time.perf_counter() - started
+        if not pipelined:
+            timing['load_seconds'] = wall_seconds - timing['extract_seconds']
+        results['timings'] = {
+            'extract_seconds': round(timing['extract_seconds'], 3),
+            'load_seconds': round(timing['load_seconds'], 3),
+            'wall_seconds': round(wall_seconds, 3),
+        }
+        return results
+
+    def _spool_table(self, spool: ChunkSpool, table_name: str, start_date: Optional[datetime],
+                     end_date: Optional[datetime], incremental: bool,
+                     changed_windows: Optional[Dict[str, Any]] = None) -> int:
+        """Stream table_name from the Airflow database into spool; returns the rows spooled."""
+        iter_chunks = {'dag_runs': self.iter_dag_runs, 'task_instances': self.iter_task_instances}[table_name]
+        changed_window = self._changed_window(table_name, incremental, changed_windows)
+        spool.set_changed_window(table_name, changed_window)
+        if incremental and changed_window is None:
+            return 0
+        count = 0
+        for df in iter_chunks(start_date, end_date, changed_window=changed_window):
+            with self.metrics.stage('spool', table_name) as spooled:
+                spooled['rows'], spooled['bytes'] = len(df), spool.write(table_name, df)
+            count += len(df)
+        logger.info(f"Spooled {count} {table_name} records to {spool.path}")
+        return count
+
+    def _replayed_chunks(self, spool: ChunkSpool, table_name: str) -> Iterator[pd.DataFrame]:
+        """Yield the spooled chunks of table_name, timed as the replay stage."""
+        chunks = spool.iter_chunks(table_name)
+        while True:
+            with self.metrics.stage('replay', table_name) as replayed:
+                df = next(chunks, None)
+                if df is not None:
+                    replayed['rows'] = len(df)
+            if df is None:
+                return
+            yield df
+
+    def _fill_spool(self, spool: ChunkSpool, table_names: List[str], start_date: Optional[datetime],
+                    end_date: Optional[datetime], incremental: bool, concurrent: bool, batch_id: str,
+                    changed_windows: Optional[Dict[str, Any]] = None) -> None:
+        """Extract every table into spool and commit it, so a retried load can replay it."""
+        spool.begin(batch_id, table_names, start_date, end_date)
+
+        def run(table_name: str) -> int:
+            return self._spool_table(spool, table_name, start_date, end_date, incremental, changed_windows)
+
+        if concurrent:
+            with ThreadPoolExecutor(max_workers=len(table_names), thread_name_prefix='extract-spool') as executor:
+                list(executor.map(run, table_names))
+        else:
+            for table_name in table_names:
+                run(table_name)
+        spool.commit()
+
+    def extract_and_load(self, start_date: Optional[datetime] = None,
+                        end_date: Optional[datetime] = None,
+                        streaming: bool = True,
+                        load_mode: str = 'upsert',
+                        incremental: bool = False,
+                        concurrent: bool = False,
+                        queue_size: int = DEFAULT_QUEUE_SIZE,
+                        spool_id: Optional[str] = None,
+                        changed_windows: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Extract dag_run and task_instance metadata and load it into the observability database.
+
+        Args:
+            start_date, end_date: Optional execution_date window
+            streaming: Stream chunks of chunk_size through a server-side cursor (default)
+            load_mode: 'upsert' merges on the natural keys; 'append' (COPY) raises ValueError on loaded rows
+            incremental: Only read rows changed since each table's watermark, advanced after the load
+            concurrent: Extract and load both tables at the same time, through a bounded chunk queue
+            queue_size: Chunks the concurrent queue holds
+            spool_id: Spool to extract to and load from (with spool_dir); a retry with the same id replays it
+            changed_windows: Fixed per-table windows of a shard; implies incremental, watermarks are left alone
+
+        Returns:
+            Dictionary with the batch_id, per-table counts and watermarks, 'timings' and 'metrics'
+        """
+        incremental = incremental or changed_windows is not None
+        batch_id = uuid.uuid4().hex
+        results = {'batch_id': batch_id, 'timings': {}}
+        table_names = ['dag_runs', 'task_instances']
+        started = time.perf_counter()
+        started_at = datetime.now(timezone.utc)
+        self.metrics = PipelineMetrics('extract', batch_id)
         
         try:
-            dag_runs_df = self.extract_dag_runs(start_date, end_date)
-            self.load_to_observability_db(dag_runs_df, 'dag_runs')
-            results['dag_runs_count'] = len(dag_runs_df)
-            task_instances_df = self.extract_task_instances(start_date, end_date)
-            self.load_to_observability_db(task_instances_df, 'task_instances')
-            results['task_instances_count'] = len(task_instances_df)
+            # Build shared state up front so worker threads do not race to create it
+            engine = self._get_observability_connection()
+            self.prepare_tables(table_names, load_mode=load_mode)
+            if incremental:
+                self._ensure_watermark_table(engine)
+            if self.preload_validation:
+                for table_name in table_names:
+                    if table_name not in self._validators:
+                        self._validators[table_name] = DataFrameValidator.for_table(table_name)
+
+            spool = None
+            if self.spool_dir:
+                spool = ChunkSpool(self.spool_dir, spool_id or batch_id)
+                collect_garbage(self.spool_dir, self.spool_retention, keep=spool.path)
+                replayed = spool.is_complete()
+                if replayed:
+                    spool.open()
+                    logger.info(f"Replaying spool {spool.path} without querying the Airflow database")
+                else:
+                    self._fill_spool(spool, table_names, start_date, end_date, incremental, concurrent, batch_id,
+                                     changed_windows)
+                results['spool'] = dict(spool.stats(), path=spool.path, replayed=replayed)
+
+            def run(table_name: str) -> Dict[str, Any]:
+                return self._extract_and_load_table(
+                    table_name, start_date, end_date, streaming, load_mode,
+                    incremental, pipelined=concurrent, queue_size=queue_size, batch_id=batch_id, spool=spool,
+                    changed_windows=changed_windows
+                )
+
+            if concurrent:
+                with ThreadPoolExecutor(max_workers=len(table_names),
+                                        thread_name_prefix='extract-load') as executor:
+                    table_results = dict(zip(table_names, executor.map(run, table_names)))
+            else:
+                table_results = {table_name: run(table_name) for table_name in table_names}
+
+            for table_name, table_result in table_results.items():
+                results['timings'][table_name] = table_result.pop('timings')
+                results.update(table_result)
+
+            results['timings']['total_wall_seconds'] = round(time.perf_counter() - started, 3)
+            results['dag_runs_load_rows_per_sec'] = self._load_rows_per_sec('dag_runs')
+            results['task_instances_load_rows_per_sec'] = self._load_rows_per_sec('task_instances')
+            self.metrics.record(
+                'total', None, time.perf_counter() - started,
+                rows=sum(results[f'{table_name}_count'] for table_name in table_names), started_at=started_at
+            )
+            results['metrics'] = self.metrics.as_records()
+            if spool is not None:
+                spool.remove()
             logger.info(f"Extraction and load completed: {results}")
             return results
         except Exception as e:
             logger.error(f"Error in extract_and_load: {str(e)}")
             raise
+        finally:
+            if self.observability_engine is not None:
+                self.metrics.save(self.observability_engine)
+
+    def prepare_tables(self, table_names: Iterable[str] = ('dag_runs', 'task_instances'),
+                       load_mode: str = 'upsert') -> None:
+        """Create the raw tables, indexes and rollups before concurrent loads so they never race to."""
+        engine = self._get_observability_connection()
+        self._ensure_load_ledger(engine)
+        for table_name in table_names:
+            self._create_table_if_not_exists(table_name, pd.DataFrame(), engine)
+            self._ensure_batch_column(table_name, engine)
+            if load_mode == 'upsert':
+                self._ensure_natural_key(table_name, NATURAL_KEYS[table_name], engine)
+            self._ensure_rollup_tables(table_name, engine)
+        if self.build_sketches:
+            ensure_sketch_table(engine)
 
+    def load_frames(self, frames: Dict[str, pd.DataFrame], load_mode: str = 'upsert',
+                    batch_id: Optional[str] = None) -> Dict[str, Any]:
+        """Load dag_runs/task_instances frames captured by the caller (e.g. extract.listener) as one batch."""
+        batch_id = batch_id or uuid.uuid4().hex
+        results = {'batch_id': batch_id}
+        engine = self._get_observability_connection()
+        try:
+            if not self._ledger_ready:
+                self._ensure_load_ledger(engine)
+                self._ledger_ready = True
+            for table_name, df in frames.items():
+                started_at = datetime.now(timezone.utc)
+                if table_name not in self._batch_column_tables:
+                    self._ensure_batch_column(table_name, engine)
+                    self._batch_column_tables.add(table_name)
+                if not df.empty:
+                    self.load_to_observability_db(df.assign(batch_id=batch_id), table_name, if_exists=load_mode)
+                self._record_batch(batch_id, table_name, len(df), load_mode, started_at)
+                results[f'{table_name}_count'] = len(df)
+            return results
+        except Exception as e:
+            logger.error(f"Error loading frames for batch {batch_id}: {str(e)}")
+            raise
+
+    def extract_and_archive(self, start_date: Optional[datetime] = None,
+                            end_date: Optional[datetime] = None,
+                            archive_path: Optional[str] = None) -> Dict[str, Any]:
+        """Stream dag_run and task_instance metadata into the Parquet archive only, not the observability database."""
+        archive = ParquetArchive(archive_path) if archive_path else self.archive
+        if archive is None:
+            raise ValueError("No archive configured, pass archive_path")
+        batch_id = uuid.uuid4().hex
+        results = {'batch_id': batch_id, 'archive_path': archive.root}
+
+        try:
+            for table_name, iter_chunks in (('dag_runs', self.iter_dag_runs),
+                                            ('task_instances', self.iter_task_instances)):
+                count, files = 0, 0
+                for df in self._tag_batch(iter_chunks(start_date, end_date), batch_id, self.cluster_id):
+                    files += len(archive.write(df, table_name, batch_id))
+                    count += len(df)
+                results[f'{table_name}_count'] = count
+                results[f'{table_name}_archived_files'] = files
+            logger.info(f"Archive export completed: {results}")
+            return results
+        except Exception as e:
+            logger.error(f"Error in extract_and_archive: {str(e)}")
+            raise
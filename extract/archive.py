@@ -0,0 +1,192 @@
+"""Hive-partitioned Parquet archive of extracted metadata."""
+
+import logging
+import os
+from datetime import date, datetime
+from typing import Iterator, List, Optional, Sequence
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+from extract.schema import DEFAULT_CLUSTER_ID, NATURAL_KEYS
+
+logger = logging.getLogger(__name__)
+
+# Partition directories: <root>/table=<table_name>/date=<execution day, UTC>/
+PARTITIONING = ds.partitioning(
+    pa.schema([('table', pa.string()), ('date', pa.date32())]),
+    flavor='hive',
+)
+_DATE_PARTITIONING = ds.partitioning(pa.schema([('date', pa.date32())]), flavor='hive')
+
+# Low-cardinality strings stored as Arrow dictionaries and Parquet dictionary pages
+DICTIONARY_COLUMNS = ('dag_id', 'task_id', 'state', 'cluster_id')
+
+_TIMESTAMP = pa.timestamp('us', tz='UTC')
+_DICTIONARY = pa.dictionary(pa.int32(), pa.string())
+
+ARCHIVE_SCHEMAS = {
+    'dag_runs': pa.schema([
+        ('dag_id', _DICTIONARY),
+        ('execution_date', _TIMESTAMP),
+        ('state', _DICTIONARY),
+        ('start_date', _TIMESTAMP),
+        ('end_date', _TIMESTAMP),
+        ('duration', pa.float64()),
+        ('extracted_at', _TIMESTAMP),
+        ('cluster_id', _DICTIONARY),
+        ('batch_id', pa.string()),
+    ]),
+    'task_instances': pa.schema([
+        ('dag_id', _DICTIONARY),
+        ('task_id', _DICTIONARY),
+        ('execution_date', _TIMESTAMP),
+        ('map_index', pa.int32()),
+        ('state', _DICTIONARY),
+        ('start_date', _TIMESTAMP),
+        ('end_date', _TIMESTAMP),
+        ('duration', pa.float64()),
+        ('try_number', pa.int32()),
+        ('extracted_at', _TIMESTAMP),
+        ('cluster_id', _DICTIONARY),
+        ('batch_id', pa.string()),
+    ]),
+}
+
+
+def _to_arrow(df: pd.DataFrame, table_name: str) -> pa.Table:
+    schema = ARCHIVE_SCHEMAS[table_name]
+    columns = {}
+    for field in schema:
+        if field.name not in df:
+            columns[field.name] = pa.nulls(len(df), field.type)
+            continue
+        values = df[field.name]
+        if pa.types.is_timestamp(field.type):
+            values = pd.to_datetime(values, utc=True)
+        columns[field.name] = pa.array(values, type=field.type, from_pandas=True)
+    table = pa.Table.from_pydict(columns, schema=schema)
+    execution_day = pc.cast(pc.floor_temporal(table['execution_date'], unit='day'), pa.date32())
+    return (
+        table
+        .append_column('table', pa.array([table_name] * len(df), pa.string()))
+        .append_column('date', execution_day)
+    )
+
+
+class ParquetArchive:
+    """Append-only Parquet archive partitioned by table and execution day, one file per load batch and day."""
+
+    def __init__(self, root: str, compression: str = 'zstd'):
+        self.root = root
+        self.compression = compression
+        self._file_options = {
+            table_name: ds.ParquetFileFormat().make_write_options(
+                compression=compression,
+                use_dictionary=[column for column in DICTIONARY_COLUMNS if column in schema.names],
+            )
+            for table_name, schema in ARCHIVE_SCHEMAS.items()
+        }
+        self._chunk_counters = {}
+
+    def write(self, df: pd.DataFrame, table_name: str, batch_id: str) -> List[str]:
+        """Write a chunk of table_name rows and return the files created."""
+        if df.empty:
+            return []
+        table = _to_arrow(df, table_name)
+        chunk = self._chunk_counters.get((table_name, batch_id), 0)
+        self._chunk_counters[(table_name, batch_id)] = chunk + 1
+
+        written = []
+        ds.write_dataset(
+            table,
+            self.root,
+            format='parquet',
+            partitioning=PARTITIONING,
+            basename_template=f"{batch_id}-{chunk:05d}-{{i}}.parquet",
+            existing_data_behavior='overwrite_or_ignore',
+            file_options=self._file_options[table_name],
+            file_visitor=lambda written_file: written.append(written_file.path),
+        )
+        logger.info(f"Archived {len(df)} {table_name} rows to {len(written)} Parquet file(s) under {self.root}")
+        return written
+
+    def wrap(self, chunks: Iterator[pd.DataFrame], table_name: str, batch_id: str,
+             summary: dict) -> Iterator[pd.DataFrame]:
+        for df in chunks:
+            summary['files'] = summary.get('files', 0) + len(self.write(df, table_name, batch_id))
+            yield df
+
+    def dataset(self, table_name: str) -> ds.Dataset:
+        """Dataset over the table=<table_name> directory with the table's explicit schema."""
+        return ds.dataset(
+            os.path.join(self.root, f"table={table_name}"),
+            schema=ARCHIVE_SCHEMAS[table_name].append(pa.field('date', pa.date32())),
+            format='parquet',
+            partitioning=_DATE_PARTITIONING,
+        )
+
+    def _filter(self, start_date: Optional[date], end_date: Optional[date],
+                dag_ids: Optional[Sequence[str]]):
+        expression = ds.scalar(True)
+        if start_date is not None:
+            expression &= ds.field('date') >= _as_date(start_date)
+        if end_date is not None:
+            expression &= ds.field('date') <= _as_date(end_date)
+        if dag_ids is not None:
+            expression &= ds.field('dag_id').isin(list(dag_ids))
+        return expression
+
+    def scanner(self, table_name: str, start_date: Optional[date] = None, end_date: Optional[date] = None,
+                columns: Optional[Sequence[str]] = None, dag_ids: Optional[Sequence[str]] = None,
+                batch_size: int = 131072) -> ds.Scanner:
+        """Scanner over the archived rows of table_name, opening only the date partitions and columns asked for."""
+        if not os.path.isdir(os.path.join(self.root, f"table={table_name}")):
+            raise FileNotFoundError(f"No {table_name} rows archived under {self.root}")
+        return self.dataset(table_name).scanner(
+            columns=list(columns) if columns is not None else None,
+            filter=self._filter(start_date, end_date, dag_ids),
+            batch_size=batch_size,
+        )
+
+    def read(self, table_name: str, start_date: Optional[date] = None, end_date: Optional[date] = None,
+             columns: Optional[Sequence[str]] = None, dag_ids: Optional[Sequence[str]] = None,
+             deduplicate: bool = False) -> pd.DataFrame:
+        """Read archived rows of table_name; deduplicate=True keeps the latest version of each natural key."""
+        read_columns = list(columns) if columns is not None else None
+        if deduplicate and read_columns is not None:
+            read_columns += [
+                column for column in NATURAL_KEYS[table_name] + ['extracted_at'] if column not in read_columns
+            ]
+        df = self.scanner(table_name, start_date, end_date, read_columns, dag_ids).to_table().to_pandas()
+        if 'cluster_id' in df and df['cluster_id'].hasnans:
+            # Files archived before rows were tagged with a cluster hold default-cluster rows
+            df['cluster_id'] = df['cluster_id'].astype(object).fillna(DEFAULT_CLUSTER_ID).astype('category')
+        if 'map_index' in df and df['map_index'].hasnans:
+            # Files archived before map_index was extracted hold unmapped task instances
+            df['map_index'] = df['map_index'].fillna(-1).astype('int32')
+        if deduplicate and not df.empty:
+            df = (
+                df.sort_values('extracted_at', kind='stable')
+                .drop_duplicates(subset=NATURAL_KEYS[table_name], keep='last')
+                .sort_index()
+            )
+            if columns is not None:
+                df = df[list(columns)]
+        return df.reset_index(drop=True)
+
+    def iter_batches(self, table_name: str, start_date: Optional[date] = None,
+                     end_date: Optional[date] = None, columns: Optional[Sequence[str]] = None,
+                     dag_ids: Optional[Sequence[str]] = None) -> Iterator[pd.DataFrame]:
+        """Stream archived rows as DataFrames without materializing the whole range."""
+        for batch in self.scanner(table_name, start_date, end_date, columns, dag_ids).to_batches():
+            if batch.num_rows:
+                yield batch.to_pandas()
+
+
+def _as_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value
@@ -0,0 +1,254 @@
+"""
+Parallel, resumable backfill of historical Airflow metadata, one checkpointed slice per worker.
+
+    python -m extract.backfill --start 2025-01-01 --end 2026-01-01 \\
+        --slice-hours 24 --parallelism 4 --max-rows-per-sec 20000
+"""
+
+import argparse
+import json
+import logging
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+from sqlalchemy import text
+from common.engines import get_engine
+
+logger = logging.getLogger(__name__)
+
+# Observability table recording the state of every slice of every backfill
+CHECKPOINT_TABLE = 'backfill_checkpoints'
+
+DEFAULT_SLICE_SIZE = timedelta(days=1)
+DEFAULT_PARALLELISM = 4
+
+# The extractor's end_date is inclusive; slices end just before the next one starts
+_SLICE_END_EPSILON = timedelta(microseconds=1)
+
+
+def _as_utc(value) -> datetime:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def plan_slices(start: datetime, end: datetime, slice_size: timedelta) -> List[Tuple[datetime, datetime]]:
+    """Half-open [slice_start, slice_end) periods covering [start, end)."""
+    if slice_size <= timedelta(0):
+        raise ValueError("slice_size must be positive")
+    start, end = _as_utc(start), _as_utc(end)
+    slices = []
+    slice_start = start
+    while slice_start < end:
+        slice_end = min(slice_start + slice_size, end)
+        slices.append((slice_start, slice_end))
+        slice_start = slice_end
+    return slices
+
+
+def default_backfill_id(start: datetime, end: datetime, slice_size: timedelta) -> str:
+    """Stable id for a (range, slice size), so re-running the same command resumes it."""
+    return f"{_as_utc(start):%Y%m%dT%H%M}-{_as_utc(end):%Y%m%dT%H%M}-{int(slice_size.total_seconds())}s"
+
+
+def ensure_checkpoint_table(engine) -> None:
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} ("
+            f"backfill_id VARCHAR(64) NOT NULL, "
+            f"slice_start TIMESTAMP WITH TIME ZONE NOT NULL, "
+            f"slice_end TIMESTAMP WITH TIME ZONE NOT NULL, "
+            f"status VARCHAR(16) NOT NULL, "
+            f"batch_id VARCHAR(32), "
+            f"dag_runs_count BIGINT, "
+            f"task_instances_count BIGINT, "
+            f"error TEXT, "
+            f"started_at TIMESTAMP WITH TIME ZONE NOT NULL, "
+            f"finished_at TIMESTAMP WITH TIME ZONE NOT NULL, "
+            f"PRIMARY KEY (backfill_id, slice_start))"
+        ))
+
+
+def completed_slices(engine, backfill_id: str) -> Set[Tuple[datetime, datetime]]:
+    with engine.connect() as conn:
+        rows = conn.execute(
+            text(f"SELECT slice_start, slice_end FROM {CHECKPOINT_TABLE} "
+                 f"WHERE backfill_id = :backfill_id AND status = 'done'"),
+            {'backfill_id': backfill_id}
+        ).fetchall()
+    return {(_as_utc(slice_start), _as_utc(slice_end)) for slice_start, slice_end in rows}
+
+
+def record_slice(engine, backfill_id: str, slice_start: datetime, slice_end: datetime, status: str,
+                 started_at: datetime, results: Optional[Dict] = None, error: Optional[str] = None) -> None:
+    results = results or {}
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                f"INSERT INTO {CHECKPOINT_TABLE} "
+                f"(backfill_id, slice_start, slice_end, status, batch_id, dag_runs_count, "
+                f"task_instances_count, error, started_at, finished_at) "
+                f"VALUES (:backfill_id, :slice_start, :slice_end, :status, :batch_id, :dag_runs_count, "
+                f":task_instances_count, :error, :started_at, :finished_at) "
+                f"ON CONFLICT (backfill_id, slice_start) DO UPDATE SET "
+                f"slice_end = EXCLUDED.slice_end, status = EXCLUDED.status, batch_id = EXCLUDED.batch_id, "
+                f"dag_runs_count = EXCLUDED.dag_runs_count, task_instances_count = EXCLUDED.task_instances_count, "
+                f"error = EXCLUDED.error, started_at = EXCLUDED.started_at, finished_at = EXCLUDED.finished_at"
+            ),
+            {
+                'backfill_id': backfill_id,
+                'slice_start': slice_start,
+                'slice_end': slice_end,
+                'status': status,
+                'batch_id': results.get('batch_id'),
+                'dag_runs_count': results.get('dag_runs_count'),
+                'task_instances_count': results.get('task_instances_count'),
+                'error': error,
+                'started_at': started_at,
+                'finished_at': datetime.now(timezone.utc),
+            }
+        )
+
+
+# Extractor of a worker process, reused for every slice so its read pacing spans them all
+_worker_extractor = None
+
+
+def _init_worker(extractor_options: Dict[str, Any]) -> None:
+    global _worker_extractor
+    from airflow import settings
+    from extract.airflow_metadata import AirflowMetadataExtractor
+
+    # Pooled Airflow connections inherited from the parent must not be shared with it
+    if getattr(settings, 'engine', None) is not None:
+        settings.engine.dispose(close=False)
+    _worker_extractor = AirflowMetadataExtractor(**extractor_options)
+
+
+def _run_slice(backfill_id: str, slice_start: datetime, slice_end: datetime) -> Dict[str, Any]:
+    """Load one slice in a worker process and checkpoint it."""
+    extractor = _worker_extractor
+    engine = extractor._get_observability_connection()
+    started_at = datetime.now(timezone.utc)
+    try:
+        results = extractor.extract_and_load(
+            start_date=slice_start, end_date=slice_end - _SLICE_END_EPSILON,
+            streaming=True, load_mode='upsert',
+        )
+    except Exception as e:
+        record_slice(engine, backfill_id, slice_start, slice_end, 'failed', started_at, error=str(e))
+        raise
+    record_slice(engine, backfill_id, slice_start, slice_end, 'done', started_at, results=results)
+    return {
+        'slice_start': slice_start.isoformat(),
+        'dag_runs_count': results['dag_runs_count'],
+        'task_instances_count': results['task_instances_count'],
+    }
+
+
+def run_backfill(start: datetime, end: datetime, slice_size: timedelta = DEFAULT_SLICE_SIZE,
+                 parallelism: int = DEFAULT_PARALLELISM, max_rows_per_sec: Optional[float] = None,
+                 observability_conn_id: str = 'observability_postgres',
+                 backfill_id: Optional[str] = None, **extractor_options) -> Dict[str, Any]:
+    """
+    Backfill [start, end) slice by slice, skipping slices already checkpointed as done.
+
+    Returns:
+        Summary with the slices loaded, skipped and failed
+    """
+    from extract.airflow_metadata import AirflowMetadataExtractor
+
+    if parallelism < 1:
+        raise ValueError("parallelism must be at least 1")
+    if extractor_options.get('build_sketches') and (
+        slice_size % timedelta(days=1) or _as_utc(start) != _as_utc(start).replace(hour=0, minute=0, second=0, microsecond=0)
+    ):
+        # Two slices merging into the same (dag_id, task_id, day) sketch concurrently would lose updates
+        raise ValueError("build_sketches needs slices aligned to whole UTC days")
+
+    backfill_id = backfill_id or default_backfill_id(start, end, slice_size)
+    slices = plan_slices(start, end, slice_size)
+    extractor_options = dict(extractor_options, observability_conn_id=observability_conn_id)
+    if max_rows_per_sec:
+        extractor_options['max_source_rows_per_sec'] = max_rows_per_sec / parallelism
+
+    engine = get_engine(observability_conn_id)
+    ensure_checkpoint_table(engine)
+    AirflowMetadataExtractor(**extractor_options).prepare_tables(load_mode='upsert')
+    done = completed_slices(engine, backfill_id)
+    pending = [period for period in slices if period not in done]
+    logger.info(
+        f"Backfill {backfill_id}: {len(slices)} slices, {len(slices) - len(pending)} already done, "
+        f"{len(pending)} to load with parallelism {parallelism}"
+    )
+
+    summary = {
+        'backfill_id': backfill_id,
+        'slices': len(slices),
+        'skipped': len(slices) - len(pending),
+        'loaded': 0,
+        'failed': [],
+        'dag_runs_count': 0,
+        'task_instances_count': 0,
+    }
+    with ProcessPoolExecutor(max_workers=parallelism, initializer=_init_worker,
+                             initargs=(extractor_options,)) as executor:
+        futures = {
+            executor.submit(_run_slice, backfill_id, slice_start, slice_end): slice_start
+            for slice_start, slice_end in pending
+        }
+        for future in as_completed(futures):
+            slice_start = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.error(f"Backfill slice {slice_start.isoformat()} failed: {str(e)}")
+                summary['failed'].append(slice_start.isoformat())
+                continue
+            summary['loaded'] += 1
+            summary['dag_runs_count'] += result['dag_runs_count']
+            summary['task_instances_count'] += result['task_instances_count']
+            logger.info(
+                f"Backfill slice {result['slice_start']} done "
+                f"({summary['loaded'] + summary['skipped']}/{len(slices)})"
+            )
+
+    summary['failed'].sort()
+    logger.info(f"Backfill {backfill_id} finished: {summary}")
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Parallel, resumable backfill of Airflow metadata')
+    parser.add_argument('--start', required=True, help='first execution_date (ISO 8601, UTC if naive)')
+    parser.add_argument('--end', required=True, help='end of the range, exclusive')
+    parser.add_argument('--slice-hours', type=float, default=DEFAULT_SLICE_SIZE.total_seconds() / 3600)
+    parser.add_argument('--parallelism', type=int, default=DEFAULT_PARALLELISM)
+    parser.add_argument('--max-rows-per-sec', type=float, default=None,
+                        help='combined read rate limit against the Airflow metadata DB')
+    parser.add_argument('--chunk-size', type=int, default=None)
+    parser.add_argument('--observability-conn-id', default='observability_postgres')
+    parser.add_argument('--backfill-id', default=None, help='defaults to one derived from the range and slice size')
+    parser.add_argument('--build-sketches', action='store_true')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(processName)s: %(message)s')
+
+    extractor_options = {'build_sketches': args.build_sketches, 'compact_frames': True}
+    if args.chunk_size:
+        extractor_options['chunk_size'] = args.chunk_size
+    summary = run_backfill(
+        _as_utc(args.start), _as_utc(args.end), slice_size=timedelta(hours=args.slice_hours),
+        parallelism=args.parallelism, max_rows_per_sec=args.max_rows_per_sec,
+        observability_conn_id=args.observability_conn_id, backfill_id=args.backfill_id,
+        **extractor_options
+    )
+    print(json.dumps(summary, indent=2))
+    if summary['failed']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
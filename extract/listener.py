@@ -0,0 +1,302 @@
+"""
+Near-real-time capture of dag_run and task_instance state changes (observability_listener plugin).
+
+Options live in the [observability_listener] section of airflow.cfg: enabled, conn_id,
+cluster_id, max_queue_size, batch_size, flush_interval_seconds.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from airflow.configuration import conf
+from airflow.listeners import hookimpl
+from extract.schema import DEFAULT_CLUSTER_ID
+
+logger = logging.getLogger(__name__)
+
+CONFIG_SECTION = 'observability_listener'
+
+# Events waiting for the flusher; further events are dropped rather than blocking the caller
+DEFAULT_MAX_QUEUE_SIZE = 10000
+
+# Flush when this many rows are waiting or the oldest has waited flush_interval seconds
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_FLUSH_INTERVAL = 5.0
+
+# Seconds a stopping process waits for the final flush
+DEFAULT_STOP_TIMEOUT = 10.0
+
+_STOP = object()
+
+
+def _duration(start_date, end_date) -> Optional[float]:
+    if start_date and end_date:
+        return (end_date - start_date).total_seconds()
+    return None
+
+
+def task_instance_row(task_instance, state: str) -> Dict[str, Any]:
+    """task_instances row for a state change, read from already-loaded attributes only."""
+    # _try_number is the stored column on Airflow < 2.10, where try_number is a derived property
+    try_number = getattr(task_instance, '_try_number', None)
+    if try_number is None:
+        try_number = task_instance.try_number
+    duration = task_instance.duration
+    if duration is None:
+        duration = _duration(task_instance.start_date, task_instance.end_date)
+    return {
+        'dag_id': task_instance.dag_id,
+        'task_id': task_instance.task_id,
+        'execution_date': task_instance.execution_date,
+        'map_index': getattr(task_instance, 'map_index', -1),
+        'state': state,
+        'start_date': task_instance.start_date,
+        'end_date': task_instance.end_date if state != 'running' else None,
+        'duration': duration if state != 'running' else None,
+        'try_number': try_number,
+        'extracted_at': datetime.now(timezone.utc),
+    }
+
+
+def dag_run_row(dag_run, state: str) -> Dict[str, Any]:
+    """dag_runs row for a state change, read from already-loaded attributes only."""
+    end_date = dag_run.end_date if state != 'running' else None
+    return {
+        'dag_id': dag_run.dag_id,
+        'execution_date': dag_run.execution_date,
+        'state': state,
+        'start_date': dag_run.start_date,
+        'end_date': end_date,
+        'duration': _duration(dag_run.start_date, end_date),
+        'extracted_at': datetime.now(timezone.utc),
+    }
+
+
+class ObservabilityEventBuffer:
+    """Bounded queue of state-change rows, flushed in batches by a background thread after start()."""
+
+    def __init__(self, extractor=None, observability_conn_id: str = 'observability_postgres',
+                 cluster_id: str = DEFAULT_CLUSTER_ID, max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE, batch_size: int = DEFAULT_BATCH_SIZE,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        self._extractor = extractor
+        self.observability_conn_id = observability_conn_id
+        self.cluster_id = cluster_id
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._pending: Dict[str, List[Dict]] = {'dag_runs': [], 'task_instances': []}
+        self._oldest: Optional[float] = None
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.dropped = 0
+        self.flushed_rows = 0
+        self.failed_batches = 0
+
+    @property
+    def extractor(self):
+        if self._extractor is None:
+            # Imported on first flush, in the flusher thread, to keep the hot path and plugin import light
+            from extract.airflow_metadata import AirflowMetadataExtractor
+            self._extractor = AirflowMetadataExtractor(
+                observability_conn_id=self.observability_conn_id, cluster_id=self.cluster_id
+            )
+        return self._extractor
+
+    def _offer(self, table_name: str, row: Dict[str, Any]) -> bool:
+        try:
+            self._queue.put_nowait((table_name, row))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.warning(f"Observability event queue full, {self.dropped} event(s) dropped so far")
+            return False
+
+    def record_task_instance(self, task_instance, state: str) -> bool:
+        """Queue a task instance state change; never blocks and never raises."""
+        try:
+            return self._offer('task_instances', task_instance_row(task_instance, state))
+        except Exception as e:
+            logger.warning(f"Could not capture task instance event: {str(e)}")
+            return False
+
+    def record_dag_run(self, dag_run, state: str) -> bool:
+        """Queue a dag run state change; never blocks and never raises."""
+        try:
+            return self._offer('dag_runs', dag_run_row(dag_run, state))
+        except Exception as e:
+            logger.warning(f"Could not capture dag run event: {str(e)}")
+            return False
+
+    def _take(self, item) -> bool:
+        """Move a queued event to the pending batch; False for the stop sentinel."""
+        if item is _STOP:
+            return False
+        table_name, row = item
+        self._pending[table_name].append(row)
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+        return True
+
+    def _pending_count(self) -> int:
+        return sum(len(rows) for rows in self._pending.values())
+
+    def _due(self) -> bool:
+        return self._oldest is not None and (
+            self._pending_count() >= self.batch_size
+            or time.monotonic() - self._oldest >= self.flush_interval
+        )
+
+    def flush(self) -> int:
+        """Drain the queue and load everything pending now; returns the rows loaded."""
+        with self._flush_lock:
+            stopping = False
+            while True:
+                try:
+                    stopping = not self._take(self._queue.get_nowait()) or stopping
+                except queue.Empty:
+                    break
+            if stopping:
+                # Leave the stop request for the flusher thread
+                self._queue.put_nowait(_STOP)
+            return self._flush_pending()
+
+    def _flush_pending(self) -> int:
+        # Loaded by the flusher thread, not by every Airflow process importing the plugin
+        import pandas as pd
+
+        pending, self._pending = self._pending, {'dag_runs': [], 'task_instances': []}
+        self._oldest = None
+        frames = {table_name: pd.DataFrame(rows) for table_name, rows in pending.items() if rows}
+        if not frames:
+            return 0
+        rows = sum(len(df) for df in frames.values())
+        try:
+            self.extractor.load_frames(frames, load_mode='upsert')
+        except Exception as e:
+            # The nightly incremental extraction reconciles whatever a failed flush missed
+            self.failed_batches += 1
+            logger.warning(f"Dropped {rows} observability event row(s) after a failed flush: {str(e)}")
+            return 0
+        self.flushed_rows += rows
+        logger.debug(f"Flushed {rows} observability event row(s)")
+        return rows
+
+    def _run(self) -> None:
+        running = True
+        while running:
+            timeout = self.flush_interval
+            if self._oldest is not None:
+                timeout = max(0.0, self._oldest + self.flush_interval - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            # Producers only touch the queue, so holding the lock through a flush never blocks them
+            with self._flush_lock:
+                if item is not None:
+                    running = self._take(item)
+                if self._due():
+                    self._flush_pending()
+        self.flush()
+
+    def start(self) -> 'ObservabilityEventBuffer':
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='observability-listener', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = DEFAULT_STOP_TIMEOUT) -> None:
+        """Flush what is buffered and stop the flusher thread, waiting at most timeout seconds."""
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.warning("Observability event queue still full at shutdown")
+        self._thread.join(timeout)
+        self._thread = None
+
+
+_buffer: Optional[ObservabilityEventBuffer] = None
+_buffer_pid: Optional[int] = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer() -> Optional[ObservabilityEventBuffer]:
+    """The buffer of this process, started on first use; None when the listener is disabled."""
+    global _buffer, _buffer_pid
+    if _buffer is not None and _buffer_pid == os.getpid():
+        return _buffer
+    if not conf.getboolean(CONFIG_SECTION, 'enabled', fallback=True):
+        return None
+    with _buffer_lock:
+        # A forked child inherits the parent's buffer but not its flusher thread
+        if _buffer is None or _buffer_pid != os.getpid():
+            _buffer = ObservabilityEventBuffer(
+                observability_conn_id=conf.get(CONFIG_SECTION, 'conn_id', fallback='observability_postgres'),
+                cluster_id=conf.get(CONFIG_SECTION, 'cluster_id', fallback=DEFAULT_CLUSTER_ID),
+                max_queue_size=conf.getint(CONFIG_SECTION, 'max_queue_size', fallback=DEFAULT_MAX_QUEUE_SIZE),
+                batch_size=conf.getint(CONFIG_SECTION, 'batch_size', fallback=DEFAULT_BATCH_SIZE),
+                flush_interval=conf.getfloat(CONFIG_SECTION, 'flush_interval_seconds',
+                                             fallback=DEFAULT_FLUSH_INTERVAL),
+            ).start()
+            _buffer_pid = os.getpid()
+            atexit.register(_buffer.stop)
+    return _buffer
+
+
+def _record_task_instance(task_instance, state: str) -> None:
+    buffer = get_buffer()
+    if buffer is not None:
+        buffer.record_task_instance(task_instance, state)
+
+
+def _record_dag_run(dag_run, state: str) -> None:
+    buffer = get_buffer()
+    if buffer is not None:
+        buffer.record_dag_run(dag_run, state)
+
+
+# Hook implementations take only the arguments they use, so they match the
+# listener specs of every Airflow 2.x release (and the session-less 3.x ones)
+
+@hookimpl
+def on_task_instance_running(previous_state, task_instance):
+    _record_task_instance(task_instance, 'running')
+
+
+@hookimpl
+def on_task_instance_success(previous_state, task_instance):
+    _record_task_instance(task_instance, 'success')
+
+
+@hookimpl
+def on_task_instance_failed(previous_state, task_instance):
+    _record_task_instance(task_instance, 'failed')
+
+
+@hookimpl
+def on_dag_run_running(dag_run, msg):
+    _record_dag_run(dag_run, 'running')
+
+
+@hookimpl
+def on_dag_run_success(dag_run, msg):
+    _record_dag_run(dag_run, 'success')
+
+
+@hookimpl
+def on_dag_run_failed(dag_run, msg):
+    _record_dag_run(dag_run, 'failed')
+
+
+@hookimpl
+def before_stopping(component):
+    if _buffer is not None and _buffer_pid == os.getpid():
+        _buffer.stop()
@@ -0,0 +1,339 @@
+"""
+Fan-in extraction from several Airflow deployments into one observability database.
+
+    python -m extract.multi_cluster --source prod=airflow_prod_db \\
+        --source staging=postgresql://reader@staging-db/airflow --incremental
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import logging
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple, Union
+from sqlalchemy import select
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from common.engines import get_connection_url
+from common.metrics import PipelineMetrics, frame_bytes
+from extract.airflow_metadata import (
+    DEFAULT_CHUNK_SIZE, DEFAULT_QUEUE_SIZE, QUERY_COLUMNS, AirflowMetadataExtractor, _as_utc,
+    apply_window_filters, join_source_tables, latest_change_select,
+)
+
+logger = logging.getLogger(__name__)
+
+# Async SQLAlchemy driver used for each metadata database backend
+ASYNC_DRIVERS = {
+    'postgresql': 'asyncpg',
+    'mysql': 'aiomysql',
+    'sqlite': 'aiosqlite',
+}
+
+# Extraction queries allowed to run at the same time against one source database
+DEFAULT_MAX_CONCURRENCY_PER_SOURCE = 2
+
+TABLE_NAMES = ('dag_runs', 'task_instances')
+
+# Extractor options that only apply to the single-source extraction path
+_UNSUPPORTED_OPTIONS = ('build_sketches', 'archive_path', 'preload_validation', 'max_source_rows_per_sec', 'cluster_id')
+
+_END_OF_STREAM = object()
+
+
+def async_url(url: Union[str, URL]) -> URL:
+    """url with its driver replaced by the asyncio driver of its backend."""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No asyncio driver known for {backend} metadata databases")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+
+def _is_dsn(source: str) -> bool:
+    return '://' in source
+
+
+def _default_cluster_id(source: str) -> str:
+    """A conn_id names its own cluster; a DSN is named after its host and database."""
+    if not _is_dsn(source):
+        return source
+    url = make_url(source)
+    return '/'.join(part for part in (url.host, url.database) if part)
+
+
+def resolve_sources(sources: Union[Mapping[str, str], Sequence[str]]) -> Dict[str, URL]:
+    """cluster_id -> async URL of every source (conn_ids or DSNs, as a mapping or a list)."""
+    if not isinstance(sources, Mapping):
+        sources = {_default_cluster_id(source): source for source in sources}
+    if not sources:
+        raise ValueError("At least one source is required")
+    return {
+        cluster_id: async_url(make_url(source) if _is_dsn(source) else get_connection_url(source))
+        for cluster_id, source in sources.items()
+    }
+
+
+async def _in_thread(func, *args, **kwargs):
+    # Blocking pandas and psycopg2 work runs off the event loop so other sources keep streaming
+    return await asyncio.get_running_loop().run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+
+class MultiClusterExtractor:
+    """Concurrent extraction from several Airflow metadata databases, loaded through one AirflowMetadataExtractor."""
+
+    def __init__(self, sources: Union[Mapping[str, str], Sequence[str]],
+                 observability_conn_id: str = 'observability_postgres',
+                 chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 max_concurrency_per_source: int = DEFAULT_MAX_CONCURRENCY_PER_SOURCE,
+                 queue_size: int = DEFAULT_QUEUE_SIZE,
+                 **extractor_options):
+        if max_concurrency_per_source < 1:
+            raise ValueError("max_concurrency_per_source must be at least 1")
+        unsupported = sorted(set(extractor_options) & set(_UNSUPPORTED_OPTIONS))
+        if unsupported:
+            raise ValueError(f"Not supported for multi-cluster extraction: {unsupported}")
+        self.sources = resolve_sources(sources)
+        self.chunk_size = chunk_size
+        self.max_concurrency_per_source = max_concurrency_per_source
+        self.queue_size = queue_size
+        self.loader = AirflowMetadataExtractor(
+            observability_conn_id=observability_conn_id, chunk_size=chunk_size, **extractor_options
+        )
+        self.metrics = self.loader.metrics
+
+    def _create_engine(self, cluster_id: str, url: URL) -> AsyncEngine:
+        kwargs: Dict[str, Any] = {'pool_pre_ping': True}
+        if url.get_backend_name() != 'sqlite':
+            # The pool is the hard cap on connections opened against the source
+            kwargs.update(pool_size=self.max_concurrency_per_source, max_overflow=0, pool_recycle=1800)
+        if url.get_backend_name() == 'postgresql':
+            kwargs['connect_args'] = {'server_settings': {'application_name': f"observability:{cluster_id}"}}
+        return create_async_engine(url, **kwargs)
+
+    async def _changed_window(self, engine: AsyncEngine, cluster_id: str,
+                              table_name: str) -> Optional[Tuple[Optional[datetime], datetime]]:
+        """Incremental (changed_after, changed_until) window of table_name in cluster_id, None if unchanged."""
+        watermark = await _in_thread(self.loader.get_watermark, table_name, cluster_id)
+        changed_after = watermark - self.loader.watermark_overlap if watermark else None
+        async with engine.connect() as conn:
+            changed_until = _as_utc((await conn.execute(latest_change_select(table_name, watermark))).scalar())
+        if changed_until is None:
+            logger.info(f"No changes to {table_name} in cluster {cluster_id} since watermark {watermark}")
+            return None
+        return changed_after, changed_until
+
+    async def _stream_table(self, cluster_id: str, engine: AsyncEngine, limit: asyncio.Semaphore,
+                            table_name: str, start_date: Optional[datetime], end_date: Optional[datetime],
+                            incremental: bool, queue: asyncio.Queue, batch_id: str) -> Dict[str, Any]:
+        to_frame = {
+            'dag_runs': self.loader._dag_run_frame,
+            'task_instances': self.loader._task_instance_frame,
+        }[table_name]
+        stage_table = f"{cluster_id}.{table_name}"
+        count = 0
+        async with limit:
+            changed_window = None
+            if incremental:
+                changed_window = await self._changed_window(engine, cluster_id, table_name)
+                if changed_window is None:
+                    return {'count': 0, 'changed_window': None}
+            query = join_source_tables(select(*QUERY_COLUMNS[table_name]), table_name)
+            query = apply_window_filters(query, table_name, start_date, end_date, changed_window)
+            async with engine.connect() as conn:
+                with self.metrics.stage('query', stage_table):
+                    result = await conn.stream(query)
+                partitions = result.partitions(self.chunk_size)
+                while True:
+                    with self.metrics.stage('fetch', stage_table) as fetched:
+                        try:
+                            rows = await partitions.__anext__()
+                        except StopAsyncIteration:
+                            break
+                        fetched['rows'] = len(rows)
+                    with self.metrics.stage('build', stage_table) as built:
+                        df = await _in_thread(to_frame, rows)
+                        built['rows'], built['bytes'] = len(df), frame_bytes(df)
+                    df['cluster_id'] = cluster_id
+                    df['batch_id'] = batch_id
+                    # Blocks while the loader is queue_size chunks behind
+                    await queue.put(df)
+                    count += len(df)
+        logger.info(f"Extracted {count} {table_name} records from cluster {cluster_id}")
+        return {'count': count, 'changed_window': changed_window}
+
+    async def _extract_cluster(self, cluster_id: str, url: URL, start_date: Optional[datetime],
+                               end_date: Optional[datetime], incremental: bool,
+                               queues: Dict[str, asyncio.Queue], batch_id: str) -> Dict[str, Any]:
+        engine = self._create_engine(cluster_id, url)
+        limit = asyncio.Semaphore(self.max_concurrency_per_source)
+        try:
+            outcomes = await asyncio.gather(
+                *(self._stream_table(cluster_id, engine, limit, table_name, start_date, end_date,
+                                     incremental, queues[table_name], batch_id)
+                  for table_name in TABLE_NAMES),
+                return_exceptions=True
+            )
+        finally:
+            await engine.dispose()
+        errors = [outcome for outcome in outcomes if isinstance(outcome, BaseException)]
+        if errors:
+            logger.error(f"Extraction from cluster {cluster_id} failed: {str(errors[0])}")
+            return {'error': str(errors[0])}
+        return dict(zip(TABLE_NAMES, outcomes))
+
+    async def _extract_all(self, start_date: Optional[datetime], end_date: Optional[datetime],
+                           incremental: bool, queues: Dict[str, asyncio.Queue],
+                           batch_id: str) -> Dict[str, Dict[str, Any]]:
+        outcomes = await asyncio.gather(*(
+            self._extract_cluster(cluster_id, url, start_date, end_date, incremental, queues, batch_id)
+            for cluster_id, url in self.sources.items()
+        ))
+        for queue in queues.values():
+            await queue.put(_END_OF_STREAM)
+        return dict(zip(self.sources, outcomes))
+
+    async def _load_queue(self, table_name: str, queue: asyncio.Queue, load_mode: str,
+                          load_lock: Optional[asyncio.Lock]) -> int:
+        loaded = 0
+        while True:
+            df = await queue.get()
+            if df is _END_OF_STREAM:
+                return loaded
+            if load_lock is None:
+                await _in_thread(self.loader.load_to_observability_db, df, table_name, load_mode)
+            else:
+                async with load_lock:
+                    await _in_thread(self.loader.load_to_observability_db, df, table_name, load_mode)
+            loaded += len(df)
+
+    async def extract_and_load_async(self, start_date: Optional[datetime] = None,
+                                     end_date: Optional[datetime] = None,
+                                     load_mode: str = 'upsert',
+                                     incremental: bool = False) -> Dict[str, Any]:
+        """Extract every source concurrently and load the rows into the observability database."""
+        batch_id = uuid.uuid4().hex
+        results: Dict[str, Any] = {'batch_id': batch_id, 'clusters': {}, 'failed_clusters': []}
+        started = time.perf_counter()
+        started_at = datetime.now(timezone.utc)
+        self.metrics = self.loader.metrics = PipelineMetrics('extract', batch_id)
+
+        try:
+            engine = self.loader._get_observability_connection()
+            await _in_thread(self.loader.prepare_tables, TABLE_NAMES, load_mode=load_mode)
+            if incremental:
+                await _in_thread(self.loader._ensure_watermark_table, engine)
+            # SQLite takes one writer at a time, so the per-table loaders take turns there
+            load_lock = asyncio.Lock() if engine.dialect.name == 'sqlite' else None
+
+            queues = {table_name: asyncio.Queue(maxsize=self.queue_size) for table_name in TABLE_NAMES}
+            loaders = {
+                table_name: asyncio.ensure_future(
+                    self._load_queue(table_name, queues[table_name], load_mode, load_lock)
+                )
+                for table_name in TABLE_NAMES
+            }
+            extraction = asyncio.ensure_future(self._extract_all(start_date, end_date, incremental, queues, batch_id))
+            tasks = [extraction, *loaders.values()]
+            done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            if pending:
+                # A loader failed: stop reading from the sources
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+            for task in tasks:
+                if task in done and task.exception() is not None:
+                    raise task.exception()
+
+            for cluster_id, outcome in extraction.result().items():
+                if 'error' in outcome:
+                    results['failed_clusters'].append(cluster_id)
+                    results['clusters'][cluster_id] = {'error': outcome['error']}
+                    continue
+                results['clusters'][cluster_id] = {
+                    f'{table_name}_count': outcome[table_name]['count'] for table_name in TABLE_NAMES
+                }
+                for table_name in TABLE_NAMES:
+                    changed_window = outcome[table_name]['changed_window']
+                    if changed_window is not None:
+                        await _in_thread(self.loader.commit_watermark, table_name, changed_window[1], cluster_id)
+                        results['clusters'][cluster_id][f'{table_name}_watermark'] = changed_window[1].isoformat()
+
+            for table_name in TABLE_NAMES:
+                results[f'{table_name}_count'] = loaders[table_name].result()
+                await _in_thread(self.loader._record_batch, batch_id, table_name,
+                                 results[f'{table_name}_count'], load_mode, started_at)
+
+            self.metrics.record(
+                'total', None, time.perf_counter() - started,
+                rows=sum(results[f'{table_name}_count'] for table_name in TABLE_NAMES), started_at=started_at
+            )
+            results['wall_seconds'] = round(time.perf_counter() - started, 3)
+            results['metrics'] = self.metrics.as_records()
+            logger.info(
+                f"Multi-cluster extraction completed: {len(self.sources) - len(results['failed_clusters'])}/"
+                f"{len(self.sources)} clusters, {results['dag_runs_count']} dag_runs, "
+                f"{results['task_instances_count']} task_instances"
+            )
+            return results
+        except Exception as e:
+            logger.error(f"Error in multi-cluster extract_and_load: {str(e)}")
+            raise
+        finally:
+            if self.loader.observability_engine is not None:
+                await _in_thread(self.metrics.save, self.loader.observability_engine)
+
+    def extract_and_load(self, start_date: Optional[datetime] = None,
+                         end_date: Optional[datetime] = None,
+                         load_mode: str = 'upsert',
+                         incremental: bool = False) -> Dict[str, Any]:
+        """Blocking wrapper of extract_and_load_async for callers without an event loop (Airflow tasks)."""
+        return asyncio.run(self.extract_and_load_async(start_date, end_date, load_mode, incremental))
+
+
+def _parse_source(value: str) -> Tuple[Optional[str], str]:
+    # cluster_id=source, unless the '=' belongs to a DSN's query string
+    cluster_id, separator, source = value.partition('=')
+    if not separator or _is_dsn(cluster_id):
+        return None, value
+    return cluster_id, source
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Extract several Airflow deployments into one observability DB')
+    parser.add_argument('--source', action='append', required=True,
+                        help='[cluster_id=]conn_id or DSN of an Airflow metadata DB; repeat per cluster')
+    parser.add_argument('--start', default=None, help='first execution_date (ISO 8601)')
+    parser.add_argument('--end', default=None, help='last execution_date (ISO 8601)')
+    parser.add_argument('--incremental', action='store_true')
+    parser.add_argument('--load-mode', default='upsert', choices=['upsert', 'append'])
+    parser.add_argument('--max-concurrency-per-source', type=int, default=DEFAULT_MAX_CONCURRENCY_PER_SOURCE)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--observability-conn-id', default='observability_postgres')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+
+    sources = {}
+    for value in args.source:
+        cluster_id, source = _parse_source(value)
+        sources[cluster_id or _default_cluster_id(source)] = source
+    extractor = MultiClusterExtractor(
+        sources, observability_conn_id=args.observability_conn_id, chunk_size=args.chunk_size,
+        max_concurrency_per_source=args.max_concurrency_per_source, compact_frames=True,
+    )
+    results = extractor.extract_and_load(
+        start_date=_as_utc(args.start), end_date=_as_utc(args.end),
+        load_mode=args.load_mode, incremental=args.incremental,
+    )
+    results.pop('metrics', None)
+    print(json.dumps(results, indent=2, default=str))
+    if results['failed_clusters']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
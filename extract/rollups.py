@@ -0,0 +1,219 @@
+"""Hourly and daily rollups of the raw tables, maintained at load time."""
+
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+import pandas as pd
+from sqlalchemy import inspect, text
+
+logger = logging.getLogger(__name__)
+
+# Rollup grain name -> pandas floor frequency of execution_date
+ROLLUP_GRAINS = {
+    'hourly': 'h',
+    'daily': 'D',
+}
+
+# Grouping columns of the rollups of each raw table (plus bucket_start)
+ROLLUP_KEYS = {
+    'dag_runs': ['cluster_id', 'dag_id'],
+    'task_instances': ['cluster_id', 'dag_id', 'task_id'],
+}
+
+# Raw columns a rollup delta is computed from
+SOURCE_COLUMNS = {
+    'dag_runs': ['cluster_id', 'dag_id', 'execution_date', 'state', 'start_date', 'end_date', 'duration'],
+    'task_instances': ['cluster_id', 'dag_id', 'task_id', 'execution_date', 'state', 'start_date', 'end_date',
+                       'duration', 'try_number'],
+}
+
+RUNNING_STATES = ('running', 'queued', 'scheduled')
+
+# Additive measures; duration_min/duration_max are merged with least/greatest
+COUNT_COLUMNS = [
+    'total_count', 'success_count', 'failed_count', 'running_count', 'other_count',
+    'retry_count', 'duration_count', 'duration_sum',
+]
+
+
+def rollup_table_name(table_name: str, grain: str) -> str:
+    return f"{table_name}_rollup_{grain}"
+
+
+def create_rollup_tables(conn, table_name: str) -> None:
+    keys = ROLLUP_KEYS[table_name]
+    key_ddl = ', '.join(f'"{column}" VARCHAR(250) NOT NULL' for column in keys)
+    primary_key = ', '.join(f'"{column}"' for column in keys + ['bucket_start'])
+    for grain in ROLLUP_GRAINS:
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {rollup_table_name(table_name, grain)} ("
+            f"{key_ddl}, "
+            f"bucket_start TIMESTAMP WITH TIME ZONE NOT NULL, "
+            f"total_count BIGINT NOT NULL, "
+            f"success_count BIGINT NOT NULL, "
+            f"failed_count BIGINT NOT NULL, "
+            f"running_count BIGINT NOT NULL, "
+            f"other_count BIGINT NOT NULL, "
+            f"retry_count BIGINT NOT NULL, "
+            f"duration_count BIGINT NOT NULL, "
+            f"duration_sum DOUBLE PRECISION NOT NULL, "
+            f"duration_min DOUBLE PRECISION, "
+            f"duration_max DOUBLE PRECISION, "
+            f"updated_at TIMESTAMP WITH TIME ZONE NOT NULL, "
+            f"PRIMARY KEY ({primary_key}))"
+        ))
+
+
+def _measures(df: pd.DataFrame, table_name: str, sign: int) -> pd.DataFrame:
+    """Per-row contributions to the rollup measures, multiplied by sign (+1 added, -1 replaced)."""
+    # Same fallback as the stg_* views: recorded duration, else end_date - start_date
+    duration = pd.to_numeric(df['duration'], errors='coerce')
+    elapsed = (pd.to_datetime(df['end_date'], utc=True) - pd.to_datetime(df['start_date'], utc=True))
+    duration = duration.fillna(elapsed.dt.total_seconds())
+    state = df['state']
+    measures = pd.DataFrame({column: df[column] for column in ROLLUP_KEYS[table_name]})
+    measures['execution_date'] = pd.to_datetime(df['execution_date'], utc=True)
+    measures['total_count'] = sign
+    measures['success_count'] = (state == 'success').astype(int) * sign
+    measures['failed_count'] = (state == 'failed').astype(int) * sign
+    measures['running_count'] = state.isin(RUNNING_STATES).astype(int) * sign
+    measures['other_count'] = sign - measures['success_count'] - measures['failed_count'] - measures['running_count']
+    if 'try_number' in df:
+        measures['retry_count'] = (pd.to_numeric(df['try_number'], errors='coerce') > 1).astype(int) * sign
+    else:
+        measures['retry_count'] = 0
+    measures['duration_count'] = duration.notna().astype(int) * sign
+    measures['duration_sum'] = duration.fillna(0.0) * sign
+    # A replaced row version cannot be taken back out of a min/max
+    measures['duration_min'] = duration if sign > 0 else float('nan')
+    measures['duration_max'] = duration if sign > 0 else float('nan')
+    return measures
+
+
+def rollup_deltas(df: pd.DataFrame, table_name: str, grain: str,
+                  replaced: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """Rollup rows to add for a loaded batch, minus the contribution of the replaced row versions."""
+    measures = _measures(df, table_name, 1)
+    if replaced is not None and not replaced.empty:
+        measures = pd.concat([measures, _measures(replaced, table_name, -1)], ignore_index=True)
+    measures['bucket_start'] = measures.pop('execution_date').dt.floor(ROLLUP_GRAINS[grain])
+    aggregations = {column: 'sum' for column in COUNT_COLUMNS}
+    aggregations.update({'duration_min': 'min', 'duration_max': 'max'})
+    # Sorted so concurrent loads (mapped shards, backfill slices) lock shared rollup rows in the same order
+    deltas = measures.groupby(ROLLUP_KEYS[table_name] + ['bucket_start'], sort=True, observed=True).agg(aggregations)
+    return deltas.reset_index()
+
+
+def apply_rollup_deltas(conn, table_name: str, df: pd.DataFrame,
+                        replaced: Optional[pd.DataFrame] = None) -> None:
+    """Add a loaded batch to every rollup of table_name with additive upserts on conn."""
+    least, greatest = ('LEAST', 'GREATEST') if conn.dialect.name == 'postgresql' else ('MIN', 'MAX')
+    updated_at = datetime.now(timezone.utc)
+    for grain in ROLLUP_GRAINS:
+        rollup_table = rollup_table_name(table_name, grain)
+        deltas = rollup_deltas(df, table_name, grain, replaced)
+        if deltas.empty:
+            continue
+        keys = ROLLUP_KEYS[table_name] + ['bucket_start']
+        columns = keys + COUNT_COLUMNS + ['duration_min', 'duration_max', 'updated_at']
+        additions = ', '.join(
+            f'{column} = {rollup_table}.{column} + EXCLUDED.{column}' for column in COUNT_COLUMNS
+        )
+        upsert = (
+            f"ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {additions}, "
+            f"duration_min = {least}(COALESCE({rollup_table}.duration_min, EXCLUDED.duration_min), "
+            f"COALESCE(EXCLUDED.duration_min, {rollup_table}.duration_min)), "
+            f"duration_max = {greatest}(COALESCE({rollup_table}.duration_max, EXCLUDED.duration_max), "
+            f"COALESCE(EXCLUDED.duration_max, {rollup_table}.duration_max)), "
+            f"updated_at = EXCLUDED.updated_at"
+        )
+        records = _parameters(deltas, updated_at)
+        if conn.dialect.driver == 'psycopg2':
+            # Imported here so SQLite-only installs do not need psycopg2
+            from psycopg2.extras import execute_values
+
+            # executemany costs one round-trip per rollup row; send them as multi-row VALUES pages
+            with conn.connection.cursor() as cursor:
+                execute_values(
+                    cursor,
+                    f"INSERT INTO {rollup_table} ({', '.join(columns)}) VALUES %s {upsert}",
+                    [tuple(record[column] for column in columns) for record in records],
+                    page_size=1000,
+                )
+        else:
+            conn.execute(
+                text(
+                    f"INSERT INTO {rollup_table} ({', '.join(columns)}) "
+                    f"VALUES ({', '.join(f':{column}' for column in columns)}) {upsert}"
+                ),
+                records
+            )
+
+
+def _parameters(deltas: pd.DataFrame, updated_at: datetime) -> List[Dict]:
+    deltas = deltas.astype(object).where(deltas.notna(), None)
+    records = deltas.to_dict('records')
+    for record in records:
+        record['bucket_start'] = record['bucket_start'].to_pydatetime()
+        for column in COUNT_COLUMNS:
+            record[column] = float(record[column]) if column == 'duration_sum' else int(record[column])
+        record['updated_at'] = updated_at
+    return records
+
+
+def read_replaced_rows(conn, table_name: str, staging_table: str, key_columns: List[str]) -> pd.DataFrame:
+    """Current versions of the rows in staging_table that an upsert is about to overwrite."""
+    columns = ', '.join(f't."{column}"' for column in SOURCE_COLUMNS[table_name])
+    match = ' AND '.join(f't."{column}" = s."{column}"' for column in key_columns)
+    return pd.read_sql(
+        text(f"SELECT {columns} FROM {table_name} t JOIN {staging_table} s ON {match}"), conn
+    )
+
+
+def rebuild_rollups(engine, table_name: str, chunk_size: int = 50000) -> None:
+    """Recompute every rollup of table_name from the raw table."""
+    with engine.begin() as conn:
+        if _has_stale_keys(conn, table_name):
+            # Rollups created before their current grouping columns are recreated from scratch
+            for grain in ROLLUP_GRAINS:
+                conn.execute(text(f"DROP TABLE {rollup_table_name(table_name, grain)}"))
+        create_rollup_tables(conn, table_name)
+        for grain in ROLLUP_GRAINS:
+            conn.execute(text(f"DELETE FROM {rollup_table_name(table_name, grain)}"))
+        if not inspect(conn).has_table(table_name):
+            return
+        columns = ', '.join(f'"{column}"' for column in SOURCE_COLUMNS[table_name])
+        for chunk in pd.read_sql(text(f"SELECT {columns} FROM {table_name}"), conn, chunksize=chunk_size):
+            apply_rollup_deltas(conn, table_name, chunk)
+    logger.info(f"Rebuilt rollups of {table_name}")
+
+
+def _has_stale_keys(conn, table_name: str) -> bool:
+    """Whether the rollups of table_name exist without all of their ROLLUP_KEYS (e.g. before cluster_id)."""
+    inspector = inspect(conn)
+    for grain in ROLLUP_GRAINS:
+        rollup_table = rollup_table_name(table_name, grain)
+        if inspector.has_table(rollup_table):
+            columns = {column['name'] for column in inspector.get_columns(rollup_table)}
+            if not set(ROLLUP_KEYS[table_name]) <= columns:
+                return True
+    return False
+
+
+def ensure_rollup_tables(engine, table_name: str) -> None:
+    """Create the rollups of table_name, backfilling them when the raw table already holds rows."""
+    inspector = inspect(engine)
+    with engine.connect() as conn:
+        stale = _has_stale_keys(conn, table_name)
+    if stale:
+        logger.info(f"Rebuilding rollups of {table_name} with their current grouping columns")
+        rebuild_rollups(engine, table_name)
+        return
+    if inspector.has_table(rollup_table_name(table_name, next(iter(ROLLUP_GRAINS)))):
+        return
+    if inspector.has_table(table_name):
+        logger.info(f"Backfilling rollups of existing {table_name} rows")
+        rebuild_rollups(engine, table_name)
+    else:
+        with engine.begin() as conn:
+            create_rollup_tables(conn, table_name)
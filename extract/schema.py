@@ -0,0 +1,166 @@
+"""Typed DDL for the raw observability tables."""
+
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import text
+from quality.dataframe_validation import QUARANTINE_COLUMN
+
+# cluster_id of rows extracted from a single, unnamed Airflow deployment
+DEFAULT_CLUSTER_ID = 'default'
+
+# Natural keys of the raw tables: the primary key of typed tables and the
+# ON CONFLICT target of upsert loads
+NATURAL_KEYS = {
+    'dag_runs': ['dag_id', 'execution_date', 'cluster_id'],
+    'task_instances': ['dag_id', 'task_id', 'execution_date', 'map_index', 'try_number', 'cluster_id'],
+}
+
+CLUSTER_COLUMN_TYPE = f"VARCHAR(64) NOT NULL DEFAULT '{DEFAULT_CLUSTER_ID}'"
+
+TABLE_COLUMNS: Dict[str, List[Tuple[str, str]]] = {
+    'dag_runs': [
+        ('dag_id', 'VARCHAR(250) NOT NULL'),
+        ('execution_date', 'TIMESTAMP WITH TIME ZONE NOT NULL'),
+        ('state', 'VARCHAR(50)'),
+        ('start_date', 'TIMESTAMP WITH TIME ZONE'),
+        ('end_date', 'TIMESTAMP WITH TIME ZONE'),
+        ('duration', 'DOUBLE PRECISION'),
+        ('extracted_at', 'TIMESTAMP WITH TIME ZONE'),
+        ('cluster_id', CLUSTER_COLUMN_TYPE),
+        ('batch_id', 'VARCHAR(32)'),
+        # Stamped by the loader on every insert and update; the dbt marts build incrementally on it
+        ('loaded_at', 'TIMESTAMP WITH TIME ZONE'),
+    ],
+    'task_instances': [
+        ('dag_id', 'VARCHAR(250) NOT NULL'),
+        ('task_id', 'VARCHAR(250) NOT NULL'),
+        ('execution_date', 'TIMESTAMP WITH TIME ZONE NOT NULL'),
+        # Airflow's -1 for unmapped task instances, the expansion index of mapped ones
+        ('map_index', 'INTEGER NOT NULL DEFAULT -1'),
+        ('state', 'VARCHAR(50)'),
+        ('start_date', 'TIMESTAMP WITH TIME ZONE'),
+        ('end_date', 'TIMESTAMP WITH TIME ZONE'),
+        ('duration', 'DOUBLE PRECISION'),
+        ('try_number', 'INTEGER NOT NULL'),
+        ('extracted_at', 'TIMESTAMP WITH TIME ZONE'),
+        ('cluster_id', CLUSTER_COLUMN_TYPE),
+        ('batch_id', 'VARCHAR(32)'),
+        # Stamped by the loader on every insert and update; the dbt marts build incrementally on it
+        ('loaded_at', 'TIMESTAMP WITH TIME ZONE'),
+    ],
+}
+
+
+def quarantine_table_name(table_name: str) -> str:
+    """Table the rows of table_name failing pre-load validation are diverted to."""
+    return f"{table_name}_quarantine"
+
+
+# Quarantine tables are typed and keyed like their raw table, plus the rules each row failed.
+# A missing key is itself a reason for quarantine, so nothing is NOT NULL and the natural key
+# is a unique index (whose NULLs never conflict) rather than the primary key
+QUARANTINE_TABLES = {quarantine_table_name(table_name): table_name for table_name in ('dag_runs', 'task_instances')}
+NATURAL_KEYS.update({quarantine: NATURAL_KEYS[table_name] for quarantine, table_name in QUARANTINE_TABLES.items()})
+TABLE_COLUMNS.update({
+    quarantine: [(name, column_type.replace(' NOT NULL', '')) for name, column_type in TABLE_COLUMNS[table_name]]
+    + [(QUARANTINE_COLUMN, 'TEXT')]
+    for quarantine, table_name in QUARANTINE_TABLES.items()
+})
+
+PARTITION_INTERVALS = ('day', 'month')
+
+
+def partition_start(value: datetime, interval: str) -> datetime:
+    """Start of the partition period containing value."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    value = value.astimezone(timezone.utc)
+    if interval == 'day':
+        return value.replace(hour=0, minute=0, second=0, microsecond=0)
+    if interval == 'month':
+        return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unknown partition interval {interval}, expected one of {PARTITION_INTERVALS}")
+
+
+def next_partition_start(start: datetime, interval: str) -> datetime:
+    if interval == 'day':
+        return start + timedelta(days=1)
+    if start.month == 12:
+        return start.replace(year=start.year + 1, month=1)
+    return start.replace(month=start.month + 1)
+
+
+def partition_name(table_name: str, start: datetime, interval: str) -> str:
+    suffix = start.strftime('%Y%m%d') if interval == 'day' else start.strftime('%Y%m')
+    return f"{table_name}_p{suffix}"
+
+
+def partition_periods(first: datetime, last: datetime, interval: str) -> Iterator[Tuple[datetime, datetime]]:
+    """(start, end) bounds of every partition period overlapping [first, last]."""
+    if last.tzinfo is None:
+        last = last.replace(tzinfo=timezone.utc)
+    start = partition_start(first, interval)
+    while start <= last:
+        end = next_partition_start(start, interval)
+        yield start, end
+        start = end
+
+
+def create_table(conn, table_name: str, dialect_name: str,
+                 partition_interval: Optional[str] = None) -> None:
+    """Create a raw or quarantine table with explicit types, its natural key and indexes."""
+    columns = ', '.join(f'"{name}" {column_type}' for name, column_type in TABLE_COLUMNS[table_name])
+    natural_key = ', '.join(f'"{column}"' for column in NATURAL_KEYS[table_name])
+    if table_name in QUARANTINE_TABLES:
+        conn.execute(text(f"CREATE TABLE {table_name} ({columns})"))
+        # Same name as the index _ensure_natural_key would add for upserts
+        conn.execute(text(f"CREATE UNIQUE INDEX {table_name}_natural_key ON {table_name} ({natural_key})"))
+    else:
+        ddl = f"CREATE TABLE {table_name} ({columns}, PRIMARY KEY ({natural_key}))"
+        if partition_interval and dialect_name == 'postgresql':
+            ddl += ' PARTITION BY RANGE (execution_date)'
+        conn.execute(text(ddl))
+
+    if NATURAL_KEYS[table_name][:2] != ['dag_id', 'execution_date']:
+        conn.execute(text(
+            f"CREATE INDEX IF NOT EXISTS {table_name}_dag_id_execution_date_idx "
+            f"ON {table_name} (dag_id, execution_date)"
+        ))
+    conn.execute(text(
+        f"CREATE INDEX IF NOT EXISTS {table_name}_batch_id_idx ON {table_name} (batch_id)"
+    ))
+    if dialect_name == 'postgresql':
+        # extracted_at grows with insertion order, which is where BRIN is tiny and effective
+        conn.execute(text(
+            f"CREATE INDEX IF NOT EXISTS {table_name}_extracted_at_brin "
+            f"ON {table_name} USING brin (extracted_at)"
+        ))
+        create_loaded_at_index(conn, table_name)
+
+
+def create_loaded_at_index(conn, table_name: str) -> None:
+    # Upserted rows are rewritten at the end of the heap, so loaded_at also follows insertion order
+    conn.execute(text(
+        f"CREATE INDEX IF NOT EXISTS {table_name}_loaded_at_brin "
+        f"ON {table_name} USING brin (loaded_at)"
+    ))
+
+
+def create_partition(conn, table_name: str, start: datetime, end: datetime, interval: str) -> str:
+    name = partition_name(table_name, start, interval)
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table_name} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    ))
+    return name
+
+
+def is_partitioned(conn, table_name: str) -> bool:
+    result = conn.execute(
+        text(
+            "SELECT EXISTS (SELECT FROM pg_partitioned_table p "
+            "JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = :table_name)"
+        ),
+        {'table_name': table_name}
+    )
+    return bool(result.scalar())
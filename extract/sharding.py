@@ -0,0 +1,159 @@
+"""Sharded incremental extraction for dynamically mapped Airflow tasks."""
+
+import logging
+import zlib
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import select, union
+from airflow import settings
+
+from extract.airflow_metadata import SOURCE_MODELS, apply_window_filters
+
+logger = logging.getLogger(__name__)
+
+TABLE_NAMES = ['dag_runs', 'task_instances']
+
+DEFAULT_DAG_SHARDS = 4
+DEFAULT_TIME_SLICES = 1
+
+# apply_window_filters bounds are inclusive; time slices start just after the previous one ends
+_SLICE_START_EPSILON = timedelta(microseconds=1)
+
+
+def dag_shard(dag_id: str, shard_count: int) -> int:
+    """Stable shard of dag_id (crc32, unlike hash(), is the same in every worker process)."""
+    return zlib.crc32(dag_id.encode('utf-8')) % shard_count
+
+
+def _encode_window(window: Optional[Tuple[Optional[datetime], datetime]]) -> Optional[List[Optional[str]]]:
+    if window is None:
+        return None
+    changed_after, changed_until = window
+    return [changed_after.isoformat() if changed_after else None, changed_until.isoformat()]
+
+
+def decode_windows(windows: Dict[str, Optional[List[Optional[str]]]]) -> Dict[str, Any]:
+    """Turn the ISO window lists of a shard (or plan) back into changed_windows for extract_and_load."""
+    decoded = {}
+    for table_name, window in windows.items():
+        if window is None:
+            decoded[table_name] = None
+            continue
+        changed_after, changed_until = window
+        decoded[table_name] = (datetime.fromisoformat(changed_after) if changed_after else None,
+                               datetime.fromisoformat(changed_until))
+    return decoded
+
+
+def split_window(window: Optional[Tuple[Optional[datetime], datetime]], time_slices: int,
+                 earliest_change: Optional[datetime] = None) -> List[Optional[Tuple[Optional[datetime], datetime]]]:
+    """Split a (changed_after, changed_until) window into time_slices disjoint windows."""
+    if window is None:
+        return [None] * time_slices
+    changed_after, changed_until = window
+    lower = changed_after or earliest_change
+    if time_slices == 1 or lower is None or lower >= changed_until:
+        return [window] + [None] * (time_slices - 1)
+    step = (changed_until - lower) / time_slices
+    windows = []
+    for index in range(time_slices):
+        slice_after = changed_after if index == 0 else lower + step * index + _SLICE_START_EPSILON
+        slice_until = changed_until if index == time_slices - 1 else lower + step * (index + 1)
+        windows.append((slice_after, slice_until))
+    return windows
+
+
+def _source_dag_ids(windows: Dict[str, Optional[Tuple[Optional[datetime], datetime]]]) -> List[str]:
+    """dag_ids with rows inside the pinned windows (tables without a window changed nothing)."""
+    selects = [
+        apply_window_filters(select(SOURCE_MODELS[table_name].dag_id).distinct(), table_name, changed_window=window)
+        for table_name, window in windows.items() if window is not None
+    ]
+    if not selects:
+        return []
+    session = settings.Session()
+    try:
+        return sorted(row[0] for row in session.execute(union(*selects)))
+    finally:
+        session.close()
+
+
+def plan_shards(extractor, dag_shards: int = DEFAULT_DAG_SHARDS,
+                time_slices: int = DEFAULT_TIME_SLICES) -> Dict[str, Any]:
+    """Plan the shards of the next incremental extraction: the pinned per-table windows and the shard list."""
+    if dag_shards < 1 or time_slices < 1:
+        raise ValueError("dag_shards and time_slices must be at least 1")
+    if time_slices > 1 and extractor.build_sketches:
+        raise ValueError("build_sketches needs time_slices=1, concurrent slices would lose sketch updates")
+
+    extractor.prepare_tables(TABLE_NAMES, load_mode='upsert')
+
+    # Windows are pinned before listing DAGs, so every row inside them belongs to a listed dag_id
+    windows = {table_name: extractor.pin_window(table_name) for table_name in TABLE_NAMES}
+    sliced = {}
+    for table_name, window in windows.items():
+        earliest_change = None
+        if time_slices > 1 and window is not None and window[0] is None:
+            earliest_change = extractor.earliest_change(table_name)
+        sliced[table_name] = split_window(window, time_slices, earliest_change)
+
+    dag_id_shards: List[Optional[List[str]]] = [None]
+    if dag_shards > 1:
+        dag_id_shards = [[] for _ in range(dag_shards)]
+        for dag_id in _source_dag_ids(windows):
+            dag_id_shards[dag_shard(dag_id, dag_shards)].append(dag_id)
+        dag_id_shards = [dag_ids for dag_ids in dag_id_shards if dag_ids] or [None]
+
+    shards = []
+    for dag_ids in dag_id_shards:
+        for time_slice in range(time_slices):
+            shards.append({
+                'index': len(shards),
+                'cluster_id': extractor.cluster_id,
+                'dag_ids': dag_ids,
+                'changed_windows': {
+                    table_name: _encode_window(sliced[table_name][time_slice]) for table_name in TABLE_NAMES
+                },
+            })
+    logger.info(
+        f"Planned {len(shards)} extraction shards ({len(dag_id_shards)} dag_id shards x {time_slices} time slices)"
+    )
+    return {
+        'changed_windows': {table_name: _encode_window(window) for table_name, window in windows.items()},
+        'shards': shards,
+    }
+
+
+def extract_shard(extractor, shard: Dict[str, Any], spool_id: Optional[str] = None,
+                  concurrent: bool = True) -> Dict[str, Any]:
+    """Upsert one planned shard; extractor must have been created with dag_ids=shard['dag_ids']."""
+    if extractor.dag_ids != shard['dag_ids']:
+        raise ValueError(f"Extractor dag_ids do not match shard {shard['index']}")
+    results = extractor.extract_and_load(
+        streaming=True, load_mode='upsert', concurrent=concurrent, spool_id=spool_id,
+        changed_windows=decode_windows(shard['changed_windows']),
+    )
+    results['shard'] = shard['index']
+    return results
+
+
+def merge_shard_results(shard_results: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine the results of every shard of a run into one summary."""
+    merged = {'shards': len(shard_results), 'batch_ids': []}
+    for result in sorted(shard_results, key=lambda result: result.get('shard', 0)):
+        merged['batch_ids'].append(result['batch_id'])
+        for key, value in result.items():
+            if key.endswith('_count') and isinstance(value, int):
+                merged[key] = merged.get(key, 0) + value
+    return merged
+
+
+def commit_watermarks(extractor, changed_windows: Dict[str, Optional[List[Optional[str]]]]) -> Dict[str, str]:
+    """Advance each table's watermark to the end of its planned window; returns the new watermarks."""
+    watermarks = {}
+    for table_name, window in decode_windows(changed_windows).items():
+        if window is None:
+            continue
+        extractor.commit_watermark(table_name, window[1])
+        watermarks[f'{table_name}_watermark'] = window[1].isoformat()
+    return watermarks
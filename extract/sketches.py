@@ -0,0 +1,416 @@
+"""Mergeable duration quantile sketches built during extraction."""
+
+import logging
+import math
+import struct
+from datetime import date, datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from sqlalchemy import inspect, text
+from extract.schema import CLUSTER_COLUMN_TYPE, DEFAULT_CLUSTER_ID
+
+logger = logging.getLogger(__name__)
+
+# Observability table holding one serialized sketch per (source_table, cluster_id, dag_id, task_id, day)
+SKETCH_TABLE = 'duration_sketches'
+
+# Relative error guaranteed on every quantile estimate
+DEFAULT_RELATIVE_ACCURACY = 0.01
+
+# task_id stored for DAG-level sketches built from dag_runs
+DAG_RUN_TASK_ID = ''
+
+# Rows still running (or never started) carry no final duration
+TERMINAL_STATES = ('success', 'failed', 'upstream_failed', 'skipped')
+
+# Sketches of different Airflow deployments never merge on write; merge_sketches combines them on read
+SKETCH_KEY = ['cluster_id', 'dag_id', 'task_id', 'day']
+
+_HEADER = struct.Struct('<BdIdddQ')
+_FORMAT_VERSION = 1
+# Durations at or below this are counted in the zero bucket
+_MIN_INDEXABLE = 1e-9
+
+
+class DDSketch:
+    """Quantile sketch with relative-error guarantees (DDSketch) that merges exactly by adding bucket counts."""
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError(f"relative_accuracy must be in (0, 1), got {relative_accuracy}")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sum = 0.0
+
+    def bucket_indexes(self, values: np.ndarray) -> np.ndarray:
+        """Bucket index of every value; values in the zero bucket map to the minimum int."""
+        indexes = np.full(len(values), np.iinfo(np.int32).min, dtype=np.int64)
+        positive = values > _MIN_INDEXABLE
+        indexes[positive] = np.ceil(np.log(values[positive]) / self._log_gamma)
+        return indexes
+
+    def add_many(self, values: Iterable[float]) -> 'DDSketch':
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        indexes = self.bucket_indexes(values)
+        zero = indexes == np.iinfo(np.int32).min
+        self._add_bins(*np.unique(indexes[~zero], return_counts=True))
+        self.zero_count += int(zero.sum())
+        self.count += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.sum += float(values.sum())
+        return self
+
+    def _add_bins(self, indexes: Sequence[int], counts: Sequence[int]) -> None:
+        for index, bin_count in zip(indexes, counts):
+            index = int(index)
+            self.bins[index] = self.bins.get(index, 0) + int(bin_count)
+
+    def merge(self, other: 'DDSketch') -> 'DDSketch':
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError(
+                f"Cannot merge sketches with relative accuracy {self.relative_accuracy} "
+                f"and {other.relative_accuracy}"
+            )
+        self._add_bins(other.bins.keys(), other.bins.values())
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.sum += other.sum
+        return self
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate the q-quantile (0 <= q <= 1), or None for an empty sketch."""
+        if not 0 <= q <= 1:
+            raise ValueError(f"Quantile must be in [0, 1], got {q}")
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        cumulative = self.zero_count
+        if cumulative > rank:
+            return 0.0
+        for index in sorted(self.bins):
+            cumulative += self.bins[index]
+            if cumulative > rank:
+                value = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+    def to_bytes(self) -> bytes:
+        indexes = np.fromiter(self.bins.keys(), dtype=np.int32, count=len(self.bins))
+        counts = np.fromiter(self.bins.values(), dtype=np.int64, count=len(self.bins))
+        header = _HEADER.pack(_FORMAT_VERSION, self.relative_accuracy, len(self.bins),
+                              self.min, self.max, self.sum, self.zero_count)
+        return header + indexes.tobytes() + counts.tobytes()
+
+    @classmethod
+    def from_bytes(cls, payload: bytes) -> 'DDSketch':
+        payload = bytes(payload)
+        version, relative_accuracy, bin_count, minimum, maximum, total, zero_count = \
+            _HEADER.unpack_from(payload)
+        if version != _FORMAT_VERSION:
+            raise ValueError(f"Unsupported sketch format version {version}")
+        sketch = cls(relative_accuracy)
+        offset = _HEADER.size
+        indexes = np.frombuffer(payload, dtype=np.int32, count=bin_count, offset=offset)
+        counts = np.frombuffer(payload, dtype=np.int64, count=bin_count, offset=offset + 4 * bin_count)
+        sketch._add_bins(indexes, counts)
+        sketch.zero_count = zero_count
+        sketch.count = zero_count + int(counts.sum())
+        sketch.min, sketch.max, sketch.sum = minimum, maximum, total
+        return sketch
+
+
+def build_sketches(df: pd.DataFrame, key_columns: Sequence[str], value_column: str = 'duration',
+                   relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY) -> Dict[Tuple, DDSketch]:
+    """Sketch value_column per group of key_columns."""
+    values = pd.to_numeric(df[value_column], errors='coerce')
+    df = df.loc[values.notna(), list(key_columns)].assign(_value=values[values.notna()])
+    if df.empty:
+        return {}
+
+    template = DDSketch(relative_accuracy)
+    df['_bucket'] = template.bucket_indexes(df['_value'].to_numpy(dtype=float))
+    key_columns = list(key_columns)
+    stats = df.groupby(key_columns, sort=False, observed=True)['_value'].agg(['min', 'max', 'sum', 'count'])
+    buckets = df.groupby(key_columns + ['_bucket'], sort=False, observed=True).size()
+
+    sketches = {}
+    zero_index = np.iinfo(np.int32).min
+    for key, row in stats.iterrows():
+        key = key if isinstance(key, tuple) else (key,)
+        sketch = DDSketch(relative_accuracy)
+        sketch.min, sketch.max, sketch.sum = float(row['min']), float(row['max']), float(row['sum'])
+        sketch.count = int(row['count'])
+        sketches[key] = sketch
+    for key, bin_count in buckets.items():
+        sketch = sketches[key[:-1]]
+        if key[-1] == zero_index:
+            sketch.zero_count += int(bin_count)
+        else:
+            sketch.bins[int(key[-1])] = sketch.bins.get(int(key[-1]), 0) + int(bin_count)
+    return sketches
+
+
+def _create_sketch_table(conn, table_name: str) -> None:
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {table_name} ("
+        f"source_table VARCHAR(64) NOT NULL, "
+        f"cluster_id {CLUSTER_COLUMN_TYPE}, "
+        f"dag_id VARCHAR(250) NOT NULL, "
+        f"task_id VARCHAR(250) NOT NULL, "
+        f"day DATE NOT NULL, "
+        f"relative_accuracy DOUBLE PRECISION NOT NULL, "
+        f"value_count BIGINT NOT NULL, "
+        f"last_end_date TIMESTAMP WITH TIME ZONE, "
+        f"sketch {'BYTEA' if conn.dialect.name == 'postgresql' else 'BLOB'} NOT NULL, "
+        f"updated_at TIMESTAMP WITH TIME ZONE NOT NULL, "
+        f"PRIMARY KEY (source_table, {', '.join(SKETCH_KEY)}))"
+    ))
+
+
+def _add_cluster_column(engine) -> None:
+    """Key a sketch table created before cluster_id by it; existing sketches get the default cluster."""
+    inspector = inspect(engine)
+    if 'cluster_id' in {column['name'] for column in inspector.get_columns(SKETCH_TABLE)}:
+        return
+    logger.info(f"Adding cluster_id to the primary key of {SKETCH_TABLE}")
+    columns = ('source_table, dag_id, task_id, day, relative_accuracy, value_count, '
+               'last_end_date, sketch, updated_at')
+    with engine.begin() as conn:
+        if engine.dialect.name == 'postgresql':
+            primary_key = inspector.get_pk_constraint(SKETCH_TABLE)['name']
+            conn.execute(text(f"ALTER TABLE {SKETCH_TABLE} ADD COLUMN cluster_id {CLUSTER_COLUMN_TYPE}"))
+            conn.execute(text(
+                f"ALTER TABLE {SKETCH_TABLE} DROP CONSTRAINT {primary_key}, "
+                f"ADD PRIMARY KEY (source_table, {', '.join(SKETCH_KEY)})"
+            ))
+            return
+        conn.execute(text(f"ALTER TABLE {SKETCH_TABLE} RENAME TO {SKETCH_TABLE}_unclustered"))
+        _create_sketch_table(conn, SKETCH_TABLE)
+        conn.execute(text(
+            f"INSERT INTO {SKETCH_TABLE} ({columns}) SELECT {columns} FROM {SKETCH_TABLE}_unclustered"
+        ))
+        conn.execute(text(f"DROP TABLE {SKETCH_TABLE}_unclustered"))
+
+
+def ensure_sketch_table(engine) -> None:
+    if inspect(engine).has_table(SKETCH_TABLE):
+        _add_cluster_column(engine)
+        return
+    with engine.begin() as conn:
+        _create_sketch_table(conn, SKETCH_TABLE)
+
+
+def _as_utc_timestamp(value) -> pd.Timestamp:
+    value = pd.Timestamp(value)
+    return value.tz_localize('UTC') if value.tzinfo is None else value.tz_convert('UTC')
+
+
+def _as_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value
+
+
+class DurationSketchBuilder:
+    """Accumulate per-(cluster_id, dag_id, task_id, day) duration sketches of finished rows from extracted chunks."""
+
+    def __init__(self, engine, source_table: str,
+                 relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        self.engine = engine
+        self.source_table = source_table
+        self.relative_accuracy = relative_accuracy
+        self.sketches: Dict[Tuple, DDSketch] = {}
+        self.last_end_dates: Dict[Tuple, pd.Timestamp] = {}
+        self._stored_end_dates: Dict[Tuple, pd.Timestamp] = {}
+        self._loaded_days = set()
+
+    def _load_stored_end_dates(self, days: Iterable[date]) -> None:
+        days = sorted(set(days) - self._loaded_days)
+        if not days:
+            return
+        with self.engine.connect() as conn:
+            result = conn.execute(
+                text(
+                    f"SELECT cluster_id, dag_id, task_id, day, last_end_date FROM {SKETCH_TABLE} "
+                    f"WHERE source_table = :source_table AND day >= :first_day AND day <= :last_day"
+                ),
+                {'source_table': self.source_table, 'first_day': days[0], 'last_day': days[-1]}
+            )
+            for cluster_id, dag_id, task_id, day, last_end_date in result:
+                if last_end_date is not None:
+                    key = (cluster_id, dag_id, task_id, _as_date(day))
+                    self._stored_end_dates[key] = _as_utc_timestamp(last_end_date)
+        self._loaded_days.update(days)
+
+    def add(self, df: pd.DataFrame) -> None:
+        if df.empty:
+            return
+        finished = df[df['state'].isin(TERMINAL_STATES) & df['duration'].notna() & df['end_date'].notna()]
+        if finished.empty:
+            return
+        frame = pd.DataFrame({
+            'cluster_id': finished['cluster_id'] if 'cluster_id' in finished else DEFAULT_CLUSTER_ID,
+            'dag_id': finished['dag_id'],
+            'task_id': finished['task_id'] if 'task_id' in finished else DAG_RUN_TASK_ID,
+            'day': pd.to_datetime(finished['execution_date'], utc=True).dt.date,
+            'end_date': pd.to_datetime(finished['end_date'], utc=True),
+            'duration': finished['duration'],
+        })
+
+        self._load_stored_end_dates(frame['day'].unique())
+        if self._stored_end_dates:
+            stored = pd.Series(
+                [self._stored_end_dates.get(key) for key in zip(*(frame[column] for column in SKETCH_KEY))],
+                index=frame.index, dtype='datetime64[ns, UTC]'
+            )
+            frame = frame[stored.isna() | (frame['end_date'] > stored)]
+            if frame.empty:
+                return
+
+        for key, sketch in build_sketches(frame, SKETCH_KEY, relative_accuracy=self.relative_accuracy).items():
+            if key in self.sketches:
+                self.sketches[key].merge(sketch)
+            else:
+                self.sketches[key] = sketch
+        for key, last_end_date in frame.groupby(SKETCH_KEY, sort=False, observed=True)['end_date'].max().items():
+            previous = self.last_end_dates.get(key)
+            self.last_end_dates[key] = last_end_date if previous is None else max(previous, last_end_date)
+
+    def wrap(self, chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        for df in chunks:
+            self.add(df)
+            yield df
+
+    def flush(self) -> int:
+        """Merge the accumulated sketches into the sketch table and return the number of keys written."""
+        if not self.sketches:
+            return 0
+        keys = list(self.sketches)
+        with self.engine.begin() as conn:
+            days = sorted({key[3] for key in keys})
+            result = conn.execute(
+                text(
+                    f"SELECT cluster_id, dag_id, task_id, day, sketch FROM {SKETCH_TABLE} "
+                    f"WHERE source_table = :source_table AND day >= :first_day AND day <= :last_day"
+                ),
+                {'source_table': self.source_table, 'first_day': days[0], 'last_day': days[-1]}
+            )
+            for cluster_id, dag_id, task_id, day, payload in result:
+                key = (cluster_id, dag_id, task_id, _as_date(day))
+                if key in self.sketches:
+                    self.sketches[key] = DDSketch.from_bytes(payload).merge(self.sketches[key])
+
+            updated_at = datetime.now(timezone.utc)
+            conn.execute(
+                text(
+                    f"INSERT INTO {SKETCH_TABLE} "
+                    f"(source_table, cluster_id, dag_id, task_id, day, relative_accuracy, value_count, "
+                    f"last_end_date, sketch, updated_at) "
+                    f"VALUES (:source_table, :cluster_id, :dag_id, :task_id, :day, :relative_accuracy, "
+                    f":value_count, :last_end_date, :sketch, :updated_at) "
+                    f"ON CONFLICT (source_table, {', '.join(SKETCH_KEY)}) DO UPDATE SET "
+                    f"relative_accuracy = EXCLUDED.relative_accuracy, value_count = EXCLUDED.value_count, "
+                    f"last_end_date = EXCLUDED.last_end_date, sketch = EXCLUDED.sketch, "
+                    f"updated_at = EXCLUDED.updated_at"
+                ),
+                [
+                    {
+                        'source_table': self.source_table,
+                        'cluster_id': key[0],
+                        'dag_id': key[1],
+                        'task_id': key[2],
+                        'day': key[3],
+                        'relative_accuracy': self.relative_accuracy,
+                        'value_count': self.sketches[key].count,
+                        'last_end_date': self.last_end_dates[key].to_pydatetime(),
+                        'sketch': self.sketches[key].to_bytes(),
+                        'updated_at': updated_at,
+                    }
+                    for key in keys
+                ]
+            )
+        logger.info(f"Merged {len(keys)} {self.source_table} duration sketches into {SKETCH_TABLE}")
+        self._stored_end_dates.update(self.last_end_dates)
+        self.sketches.clear()
+        self.last_end_dates.clear()
+        return len(keys)
+
+
+def merge_sketches(engine, source_table: str, start_day: date, end_day: date,
+                   group_by: Sequence[str] = ('dag_id', 'task_id'), period: Optional[str] = None,
+                   dag_id: Optional[str] = None, task_id: Optional[str] = None,
+                   cluster_id: Optional[str] = None) -> Dict[Tuple, DDSketch]:
+    """Merge the stored daily sketches of [start_day, end_day] into one sketch per group (and period)."""
+    if period not in (None, 'week', 'month'):
+        raise ValueError(f"Unknown period {period}, expected 'week' or 'month'")
+    query = (
+        f"SELECT cluster_id, dag_id, task_id, day, sketch FROM {SKETCH_TABLE} "
+        f"WHERE source_table = :source_table AND day >= :start_day AND day <= :end_day"
+    )
+    params = {'source_table': source_table, 'start_day': start_day, 'end_day': end_day}
+    if dag_id is not None:
+        query += " AND dag_id = :dag_id"
+        params['dag_id'] = dag_id
+    if task_id is not None:
+        query += " AND task_id = :task_id"
+        params['task_id'] = task_id
+    if cluster_id is not None:
+        query += " AND cluster_id = :cluster_id"
+        params['cluster_id'] = cluster_id
+
+    merged: Dict[Tuple, DDSketch] = {}
+    with engine.connect() as conn:
+        for row in conn.execute(text(query), params):
+            values = {'cluster_id': row.cluster_id, 'dag_id': row.dag_id, 'task_id': row.task_id,
+                      'day': _as_date(row.day)}
+            key = tuple(values[column] for column in group_by)
+            if period is not None:
+                day = values['day']
+                start = pd.Timestamp(day).to_period('W' if period == 'week' else 'M').start_time.date()
+                key += (start,)
+            sketch = DDSketch.from_bytes(row.sketch)
+            if key in merged:
+                merged[key].merge(sketch)
+            else:
+                merged[key] = sketch
+    return merged
+
+
+def sketch_quantiles(engine, source_table: str, start_day: date, end_day: date,
+                     quantiles: Sequence[float] = (0.5, 0.95, 0.99),
+                     group_by: Sequence[str] = ('dag_id', 'task_id'), period: Optional[str] = None,
+                     dag_id: Optional[str] = None, task_id: Optional[str] = None,
+                     cluster_id: Optional[str] = None) -> pd.DataFrame:
+    """Duration quantiles per group over a date range, estimated from the stored sketches."""
+    merged = merge_sketches(engine, source_table, start_day, end_day, group_by=group_by,
+                            period=period, dag_id=dag_id, task_id=task_id, cluster_id=cluster_id)
+    columns: List[str] = list(group_by) + (['period_start'] if period else [])
+    rows = []
+    for key, sketch in merged.items():
+        row = dict(zip(columns, key))
+        row['count'] = sketch.count
+        row['mean_duration_seconds'] = sketch.mean
+        for q in quantiles:
+            row[f'p{round(q * 100):g}_duration_seconds'] = sketch.quantile(q)
+        rows.append(row)
+    return pd.DataFrame(rows, columns=columns + ['count', 'mean_duration_seconds'] +
+                        [f'p{round(q * 100):g}_duration_seconds' for q in quantiles])
@@ -0,0 +1,174 @@
+"""Local Arrow IPC spool between the extract and load stages; a spool without a manifest is incomplete."""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import pandas as pd
+import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+SPOOL_MANIFEST = 'manifest.json'
+
+# Spools of runs that never loaded successfully are removed after this long
+DEFAULT_SPOOL_RETENTION = timedelta(days=2)
+
+_UNSAFE_CHARACTERS = re.compile(r'[^A-Za-z0-9_.-]+')
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def _sha256(buffer) -> str:
+    return hashlib.sha256(memoryview(buffer)).hexdigest()
+
+
+def _fsync_directory(path: str) -> None:
+    # Makes the entries of files created or renamed in path durable
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class ChunkSpool:
+    """Arrow IPC files of one extraction, replayable until the load succeeds."""
+
+    def __init__(self, root: str, spool_id: str):
+        self.root = root
+        self.spool_id = spool_id
+        self.path = os.path.join(root, _UNSAFE_CHARACTERS.sub('_', spool_id))
+        self.manifest: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.path, SPOOL_MANIFEST)
+
+    def is_complete(self) -> bool:
+        return os.path.exists(self.manifest_path)
+
+    def open(self) -> Dict[str, Any]:
+        """Read the manifest of a complete spool."""
+        with open(self.manifest_path) as f:
+            self.manifest = json.load(f)
+        return self.manifest
+
+    def begin(self, batch_id: str, table_names: List[str], start_date: Optional[datetime] = None,
+              end_date: Optional[datetime] = None) -> None:
+        self.remove()
+        for table_name in table_names:
+            os.makedirs(os.path.join(self.path, table_name))
+        self.manifest = {
+            'spool_id': self.spool_id,
+            'batch_id': batch_id,
+            'start_date': _isoformat(start_date),
+            'end_date': _isoformat(end_date),
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'tables': {table_name: {'files': [], 'rows': 0, 'changed_window': None} for table_name in table_names},
+        }
+
+    def write(self, table_name: str, df: pd.DataFrame) -> int:
+        """Spool one chunk as its own IPC file; returns the bytes written."""
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        # Serialized in memory first so the checksum covers exactly the bytes on disk
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        buffer = sink.getvalue()
+
+        with self._lock:
+            entry = self.manifest['tables'][table_name]
+            name = f"{table_name}/{len(entry['files']):06d}.arrow"
+            entry['files'].append({'name': name, 'rows': table.num_rows, 'bytes': buffer.size,
+                                   'sha256': _sha256(buffer)})
+            entry['rows'] += table.num_rows
+        with open(os.path.join(self.path, name), 'wb') as f:
+            f.write(memoryview(buffer))
+            f.flush()
+            # Synced here, in the extraction thread, so commit() only has the directories left
+            os.fsync(f.fileno())
+        return buffer.size
+
+    def set_changed_window(self, table_name: str,
+                           changed_window: Optional[Tuple[Optional[datetime], datetime]]) -> None:
+        """Keep the incremental window the chunks of table_name were read with, for the watermark."""
+        with self._lock:
+            self.manifest['tables'][table_name]['changed_window'] = (
+                [_isoformat(changed_window[0]), _isoformat(changed_window[1])] if changed_window else None
+            )
+
+    def changed_window(self, table_name: str) -> Optional[Tuple[Optional[datetime], datetime]]:
+        window = self.manifest['tables'][table_name]['changed_window']
+        if window is None:
+            return None
+        changed_after, changed_until = window
+        return (datetime.fromisoformat(changed_after) if changed_after else None,
+                datetime.fromisoformat(changed_until))
+
+    def commit(self) -> None:
+        """Write the manifest, marking the spool complete."""
+        # A manifest that survives a crash must never point at data files that did not
+        for table_name in self.manifest['tables']:
+            _fsync_directory(os.path.join(self.path, table_name))
+        _fsync_directory(self.path)
+        _fsync_directory(self.root)
+        self.manifest['committed_at'] = datetime.now(timezone.utc).isoformat()
+        temporary = f"{self.manifest_path}.tmp"
+        with open(temporary, 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self.manifest_path)
+        _fsync_directory(self.path)
+
+    def stats(self) -> Dict[str, int]:
+        files = [entry for table in self.manifest['tables'].values() for entry in table['files']]
+        return {
+            'files': len(files),
+            'rows': sum(entry['rows'] for entry in files),
+            'bytes': sum(entry['bytes'] for entry in files),
+        }
+
+    def iter_chunks(self, table_name: str) -> Iterator[pd.DataFrame]:
+        """Memory-map and yield the spooled chunks of table_name; raises ValueError on a checksum mismatch."""
+        for entry in self.manifest['tables'][table_name]['files']:
+            path = os.path.join(self.path, entry['name'])
+            source = pa.memory_map(path)
+            buffer = source.read_buffer()
+            if buffer.size != entry['bytes'] or _sha256(buffer) != entry['sha256']:
+                self.remove()
+                raise ValueError(f"Spool file {path} does not match its checksum, spool {self.spool_id} discarded")
+            # Record batches reference the mapped pages; only the pandas conversion copies
+            table = pa.ipc.open_file(buffer).read_all()
+            yield table.to_pandas(split_blocks=True)
+
+    def remove(self) -> None:
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+def collect_garbage(root: str, retention: timedelta = DEFAULT_SPOOL_RETENTION,
+                    keep: Optional[str] = None) -> List[str]:
+    """Remove spools under root last modified more than retention ago, except keep; returns their paths."""
+    if not os.path.isdir(root):
+        return []
+    cutoff = time.time() - retention.total_seconds()
+    removed = []
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        if path == keep or not os.path.isdir(path) or os.path.getmtime(path) >= cutoff:
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+        removed.append(path)
+    if removed:
+        logger.info(f"Removed {len(removed)} stale spool(s) under {root}")
+    return removed
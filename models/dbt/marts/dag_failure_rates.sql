@@ -1,6 +1,8 @@
 {{
     config(
-        materialized='table',
+        materialized='incremental',
+        unique_key=['cluster_id', 'dag_id', 'execution_day'],
+        incremental_strategy='delete+insert',
         tags=['marts', 'dag_metrics']
     )
 }}
@@ -9,14 +11,35 @@ with dag_runs as (
     select * from {{ ref('stg_dag_runs') }}
 ),
 
+{% if is_incremental() %}
+-- (cluster, dag, day) groups with rows loaded since the last build (minus the lookback)
+touched_days as (
+    select distinct
+        cluster_id,
+        dag_id,
+        date_trunc('day', execution_date) as execution_day
+    from dag_runs
+    where loaded_at > (
+        select coalesce(max(last_loaded_at), '1900-01-01'::timestamptz) from {{ this }}
+    ) - interval '{{ var("loaded_at_lookback") }}'
+),
+
+-- Rolling windows change from the earliest touched day onwards
+first_touched_day as (
+    select cluster_id, dag_id, min(execution_day) as execution_day
+    from touched_days
+    group by cluster_id, dag_id
+),
+{% endif %}
+
 failure_rates as (
     select
+        cluster_id,
         dag_id,
         date_trunc('day', execution_date) as execution_day,
         count(*) as total_runs,
         count(case when state = 'failed' then 1 end) as failed_runs,
         count(case when state = 'success' then 1 end) as successful_runs,
-        count(case when state in ('running', 'queued', 'scheduled') then 1 end) as in_progress_runs,
         round(
             (count(case when state = 'failed' then 1 end)::numeric / 
              nullif(count(*), 0)) * 100, 
@@ -26,13 +49,52 @@ failure_rates as (
             (count(case when state = 'success' then 1 end)::numeric / 
              nullif(count(*), 0)) * 100, 
             2
-        ) as success_rate_percent
+        ) as success_rate_percent,
+        max(loaded_at) as last_loaded_at
     from dag_runs
-    group by dag_id, date_trunc('day', execution_date)
+    {% if is_incremental() %}
+    where (cluster_id, dag_id, date_trunc('day', execution_date)) in (
+        select cluster_id, dag_id, execution_day from touched_days
+    )
+    {% endif %}
+    group by cluster_id, dag_id, date_trunc('day', execution_date)
 ),
 
+{% if is_incremental() %}
+-- Untouched days of the affected DAGs are read back from the mart itself, so the
+-- 7d/30d windows see their full history without rescanning raw dag runs
+daily_rates as (
+    select * from failure_rates
+
+    union all
+
+    select
+        existing.cluster_id,
+        existing.dag_id,
+        existing.execution_day,
+        existing.total_runs,
+        existing.failed_runs,
+        existing.successful_runs,
+        existing.failure_rate_percent,
+        existing.success_rate_percent,
+        existing.last_loaded_at
+    from {{ this }} existing
+    inner join first_touched_day ftd
+        on existing.cluster_id = ftd.cluster_id
+        and existing.dag_id = ftd.dag_id
+    where (existing.cluster_id, existing.dag_id, existing.execution_day) not in (
+        select cluster_id, dag_id, execution_day from touched_days
+    )
+),
+{% else %}
+daily_rates as (
+    select * from failure_rates
+),
+{% endif %}
+
 rolling_metrics as (
     select
+        cluster_id,
         dag_id,
         execution_day,
         total_runs,
@@ -42,19 +104,25 @@ rolling_metrics as (
         success_rate_percent,
         -- 7-day rolling failure rate
         avg(failure_rate_percent) over (
-            partition by dag_id 
+            partition by cluster_id, dag_id 
             order by execution_day 
             rows between 6 preceding and current row
         ) as rolling_7d_failure_rate,
         -- 30-day rolling failure rate
         avg(failure_rate_percent) over (
-            partition by dag_id 
+            partition by cluster_id, dag_id 
             order by execution_day 
             rows between 29 preceding and current row
-        ) as rolling_30d_failure_rate
-    from failure_rates
+        ) as rolling_30d_failure_rate,
+        last_loaded_at
+    from daily_rates
 )
 
-select * from rolling_metrics
-order by dag_id, execution_day desc
-
+select rolling_metrics.*
+from rolling_metrics
+{% if is_incremental() %}
+inner join first_touched_day ftd
+    on rolling_metrics.cluster_id = ftd.cluster_id
+    and rolling_metrics.dag_id = ftd.dag_id
+    and rolling_metrics.execution_day >= ftd.execution_day
+{% endif %}
@@ -1,6 +1,8 @@
 {{
     config(
-        materialized='table',
+        materialized='incremental',
+        unique_key=['cluster_id', 'dag_id', 'execution_day'],
+        incremental_strategy='delete+insert',
         tags=['marts', 'dag_metrics']
     )
 }}
@@ -9,8 +11,24 @@ with dag_runs as (
     select * from {{ ref('stg_dag_runs') }}
 ),
 
+{% if is_incremental() %}
+-- Only (cluster, dag, day) groups with rows loaded since the last build are recomputed;
+-- the lookback re-reads loads that were still committing while the last build ran
+touched_days as (
+    select distinct
+        cluster_id,
+        dag_id,
+        date_trunc('day', execution_date) as execution_day
+    from dag_runs
+    where loaded_at > (
+        select coalesce(max(last_loaded_at), '1900-01-01'::timestamptz) from {{ this }}
+    ) - interval '{{ var("loaded_at_lookback") }}'
+),
+{% endif %}
+
 dag_runtime_metrics as (
     select
+        cluster_id,
         dag_id,
         date_trunc('day', execution_date) as execution_day,
         count(*) as total_runs,
@@ -21,11 +39,16 @@ dag_runtime_metrics as (
         max(calculated_duration) as max_duration_seconds,
         percentile_cont(0.5) within group (order by calculated_duration) as median_duration_seconds,
         percentile_cont(0.95) within group (order by calculated_duration) as p95_duration_seconds,
-        sum(calculated_duration) as total_duration_seconds
+        sum(calculated_duration) as total_duration_seconds,
+        max(loaded_at) as last_loaded_at
     from dag_runs
     where calculated_duration is not null
-    group by dag_id, date_trunc('day', execution_date)
+    {% if is_incremental() %}
+        and (cluster_id, dag_id, date_trunc('day', execution_date)) in (
+            select cluster_id, dag_id, execution_day from touched_days
+        )
+    {% endif %}
+    group by cluster_id, dag_id, date_trunc('day', execution_date)
 )
 
 select * from dag_runtime_metrics
-
@@ -1,6 +1,8 @@
 {{
     config(
-        materialized='table',
+        materialized='incremental',
+        unique_key='sla_key',
+        incremental_strategy='delete+insert',
         tags=['marts', 'sla_metrics']
     )
 }}
@@ -13,10 +15,43 @@ task_instances as (
     select * from {{ ref('stg_task_instances') }}
 ),
 
+{% if is_incremental() %}
+-- Only (cluster, dag, task, day) and (cluster, dag, day) groups with rows loaded
+-- since the last build (minus the lookback) are recomputed; each entity type keeps
+-- its own high-water mark
+touched_task_days as (
+    select distinct
+        cluster_id,
+        dag_id,
+        task_id,
+        date_trunc('day', execution_date) as execution_day
+    from task_instances
+    where loaded_at > (
+        select coalesce(max(last_loaded_at), '1900-01-01'::timestamptz)
+        from {{ this }}
+        where entity_type = 'task'
+    ) - interval '{{ var("loaded_at_lookback") }}'
+),
+
+touched_dag_days as (
+    select distinct
+        cluster_id,
+        dag_id,
+        date_trunc('day', execution_date) as execution_day
+    from dag_runs
+    where loaded_at > (
+        select coalesce(max(last_loaded_at), '1900-01-01'::timestamptz)
+        from {{ this }}
+        where entity_type = 'dag'
+    ) - interval '{{ var("loaded_at_lookback") }}'
+),
+{% endif %}
+
 -- Define SLA thresholds (in seconds)
 -- These can be customized per DAG or task
 sla_thresholds as (
     select
+        cluster_id,
         dag_id,
         task_id,
         case
@@ -25,11 +60,17 @@ sla_thresholds as (
             else 10800                                -- 3 hours default
         end as sla_threshold_seconds
     from task_instances
-    group by dag_id, task_id
+    {% if is_incremental() %}
+    where (cluster_id, dag_id, task_id, date_trunc('day', execution_date)) in (
+        select cluster_id, dag_id, task_id, execution_day from touched_task_days
+    )
+    {% endif %}
+    group by cluster_id, dag_id, task_id
 ),
 
 task_sla_analysis as (
     select
+        ti.cluster_id,
         ti.dag_id,
         ti.task_id,
         date_trunc('day', ti.execution_date) as execution_day,
@@ -43,17 +84,25 @@ task_sla_analysis as (
         ) as sla_miss_rate_percent,
         avg(ti.calculated_duration) as avg_duration_seconds,
         max(ti.calculated_duration) as max_duration_seconds,
-        st.sla_threshold_seconds
+        st.sla_threshold_seconds,
+        max(ti.loaded_at) as last_loaded_at
     from task_instances ti
     inner join sla_thresholds st
-        on ti.dag_id = st.dag_id
+        on ti.cluster_id = st.cluster_id
+        and ti.dag_id = st.dag_id
         and ti.task_id = st.task_id
     where ti.calculated_duration is not null
-    group by ti.dag_id, ti.task_id, date_trunc('day', ti.execution_date), st.sla_threshold_seconds
+    {% if is_incremental() %}
+        and (ti.cluster_id, ti.dag_id, ti.task_id, date_trunc('day', ti.execution_date)) in (
+            select cluster_id, dag_id, task_id, execution_day from touched_task_days
+        )
+    {% endif %}
+    group by ti.cluster_id, ti.dag_id, ti.task_id, date_trunc('day', ti.execution_date), st.sla_threshold_seconds
 ),
 
 dag_sla_analysis as (
     select
+        dr.cluster_id,
         dr.dag_id,
         date_trunc('day', dr.execution_date) as execution_day,
         count(*) as total_runs,
@@ -65,42 +114,58 @@ dag_sla_analysis as (
             2
         ) as sla_miss_rate_percent,
         avg(dr.calculated_duration) as avg_duration_seconds,
-        max(dr.calculated_duration) as max_duration_seconds
+        max(dr.calculated_duration) as max_duration_seconds,
+        max(dr.loaded_at) as last_loaded_at
     from dag_runs dr
     where dr.calculated_duration is not null
-    group by dr.dag_id, date_trunc('day', dr.execution_date)
-)
+    {% if is_incremental() %}
+        and (dr.cluster_id, dr.dag_id, date_trunc('day', dr.execution_date)) in (
+            select cluster_id, dag_id, execution_day from touched_dag_days
+        )
+    {% endif %}
+    group by dr.cluster_id, dr.dag_id, date_trunc('day', dr.execution_date)
+),
 
 -- Combine task and DAG SLA misses
-select
-    'task' as entity_type,
-    dag_id,
-    task_id as identifier,
-    execution_day,
-    total_executions as total_count,
-    sla_misses,
-    sla_meets,
-    sla_miss_rate_percent,
-    avg_duration_seconds,
-    max_duration_seconds,
-    sla_threshold_seconds
-from task_sla_analysis
+combined as (
+    select
+        'task' as entity_type,
+        cluster_id,
+        dag_id,
+        task_id as identifier,
+        execution_day,
+        total_executions as total_count,
+        sla_misses,
+        sla_meets,
+        sla_miss_rate_percent,
+        avg_duration_seconds,
+        max_duration_seconds,
+        sla_threshold_seconds,
+        last_loaded_at
+    from task_sla_analysis
 
-union all
+    union all
 
-select
-    'dag' as entity_type,
-    dag_id,
-    null as identifier,
-    execution_day,
-    total_runs as total_count,
-    sla_misses,
-    sla_meets,
-    sla_miss_rate_percent,
-    avg_duration_seconds,
-    max_duration_seconds,
-    7200 as sla_threshold_seconds
-from dag_sla_analysis
+    select
+        'dag' as entity_type,
+        cluster_id,
+        dag_id,
+        null as identifier,
+        execution_day,
+        total_runs as total_count,
+        sla_misses,
+        sla_meets,
+        sla_miss_rate_percent,
+        avg_duration_seconds,
+        max_duration_seconds,
+        7200 as sla_threshold_seconds,
+        last_loaded_at
+    from dag_sla_analysis
+)
 
-order by execution_day desc, sla_miss_rate_percent desc
+-- identifier is null for DAG rows, so the merge key is a null-safe surrogate
+select
+    {{ dbt_utils.generate_surrogate_key(['entity_type', 'cluster_id', 'dag_id', 'identifier', 'execution_day']) }} as sla_key,
+    combined.*
+from combined
 
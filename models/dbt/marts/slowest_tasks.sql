@@ -11,9 +11,11 @@ with task_instances as (
 
 task_metrics as (
     select
+        cluster_id,
         dag_id,
         task_id,
         count(*) as total_executions,
+        count(case when map_index >= 0 then 1 end) as mapped_executions,
         avg(calculated_duration) as avg_duration_seconds,
         min(calculated_duration) as min_duration_seconds,
         max(calculated_duration) as max_duration_seconds,
@@ -24,14 +26,16 @@ task_metrics as (
         max(extracted_at) as last_updated
     from task_instances
     where calculated_duration is not null
-    group by dag_id, task_id
+    group by cluster_id, dag_id, task_id
 ),
 
 ranked_tasks as (
     select
+        cluster_id,
         dag_id,
         task_id,
         total_executions,
+        mapped_executions,
         avg_duration_seconds,
         max_duration_seconds,
         p95_duration_seconds,
@@ -18,6 +18,8 @@ renamed as (
         end_date,
         duration,
         extracted_at,
+        loaded_at,
+        cluster_id,
         coalesce(
             duration,
             extract(epoch from (end_date - start_date))
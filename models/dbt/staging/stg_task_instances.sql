@@ -14,12 +14,15 @@ renamed as (
         dag_id,
         task_id,
         execution_date,
+        map_index,
         state,
         start_date,
         end_date,
         duration,
         try_number,
         extracted_at,
+        loaded_at,
+        cluster_id,
 
         coalesce(
             duration,
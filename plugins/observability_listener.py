@@ -0,0 +1,15 @@
+"""Airflow plugin registering the observability listener (see extract/listener.py)."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from airflow.plugins_manager import AirflowPlugin
+
+from extract import listener
+
+
+class ObservabilityListenerPlugin(AirflowPlugin):
+    name = 'observability_listener'
+    listeners = [listener]
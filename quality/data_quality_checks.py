@@ -1,208 +1,474 @@
 import logging
-from typing import Dict, List, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
 import pandas as pd
-from sqlalchemy import create_engine, text
-from airflow.hooks.base import BaseHook
+from sqlalchemy import inspect, text
+from common.engines import get_engine, is_statement_timeout, statement_timeout
+from common.metrics import PipelineMetrics
 
 logger = logging.getLogger(__name__)
+
+# One load batch id, or the batch ids of every shard of a mapped extraction
+BatchIds = Optional[Union[str, Sequence[str]]]
+
+# Per-check statement_timeout of parallel runs; a check that runs longer is reported as timed out
+DEFAULT_CHECK_TIMEOUT_MS = 5 * 60 * 1000
+
+# Checks run by run_all_checks: batched into one aggregate query per table, or one query per check in parallel mode
+TABLE_CHECKS = {
+    'dag_runs': {
+        'min_rows': 0,
+        'null_columns': {'dag_id': 0.0},
+        'timestamp_column': 'extracted_at',
+        'max_age_hours': 25,
+    },
+    'task_instances': {
+        'min_rows': 0,
+        'null_columns': {'task_id': 0.0, 'dag_id': 0.0},
+        'timestamp_column': 'extracted_at',
+        'max_age_hours': 25,
+    },
+}
+
+
 class DataQualityChecker:
     def __init__(self, observability_conn_id: str = 'observability_postgres'):
         self.observability_conn_id = observability_conn_id
         self.observability_engine = None
         self.check_results = []
+        # Per-table check timings of the last run_all_checks, written to pipeline_metrics
+        self.metrics = PipelineMetrics('quality')
         
     def _get_observability_connection(self):
         if self.observability_engine is None:
-            conn = BaseHook.get_connection(self.observability_conn_id)
-            connection_string = (
-                f"postgresql://{conn.login}:{conn.password}@{conn.host}:{conn.port}/{conn.schema}"
-            )
-            self.observability_engine = create_engine(connection_string)
+            self.observability_engine = get_engine(self.observability_conn_id)
         return self.observability_engine
     
     def check_table_exists(self, table_name: str) -> bool:
         try:
             engine = self._get_observability_connection()
-            with engine.connect() as conn:
-                result = conn.execute(text(
-                    f"SELECT EXISTS (SELECT FROM information_schema.tables "
-                    f"WHERE table_name = '{table_name}')"
-                ))
-                exists = result.scalar()
-                logger.info(f"Table {table_name} exists: {exists}")
-                return exists
+            exists = inspect(engine).has_table(table_name)
+            logger.info(f"Table {table_name} exists: {exists}")
+            return exists
         except Exception as e:
             logger.error(f"Error checking if table {table_name} exists: {str(e)}")
             return False
-    
-    def check_row_count(self, table_name: str, min_rows: int = 0) -> Dict[str, any]:
+
+    def _row_count_result(self, table_name: str, row_count: int, min_rows: int) -> Dict[str, any]:
         check_name = f"row_count_{table_name}"
-        try:
-            engine = self._get_observability_connection()
-            with engine.connect() as conn:
-                result = conn.execute(text(f"SELECT COUNT(*) FROM {table_name}"))
-                row_count = result.scalar()
-                
-                passed = row_count >= min_rows
-                result_dict = {
-                    'check_name': check_name,
-                    'table_name': table_name,
-                    'passed': passed,
-                    'row_count': row_count,
-                    'min_expected': min_rows,
-                    'message': f"Row count check: {row_count} >= {min_rows}"
-                }
-                
-                if passed:
-                    logger.info(f" {check_name}: PASSED - {row_count} rows")
-                else:
-                    logger.warning(f"✗ {check_name}: FAILED - {row_count} rows (expected >= {min_rows})")
-                
-                self.check_results.append(result_dict)
-                return result_dict
-                
-        except Exception as e:
-            error_msg = f"Error checking row count for {table_name}: {str(e)}"
-            logger.error(error_msg)
+        passed = row_count >= min_rows
+        result_dict = {
+            'check_name': check_name,
+            'table_name': table_name,
+            'passed': passed,
+            'row_count': row_count,
+            'min_expected': min_rows,
+            'message': f"Row count check: {row_count} >= {min_rows}"
+        }
+        
+        if passed:
+            logger.info(f" {check_name}: PASSED - {row_count} rows")
+        else:
+            logger.warning(f"✗ {check_name}: FAILED - {row_count} rows (expected >= {min_rows})")
+        
+        self.check_results.append(result_dict)
+        return result_dict
+
+    def _null_values_result(self, table_name: str, column_name: str, null_count: int,
+                            total_count: int, max_null_percentage: float,
+                            batch_id: BatchIds = None) -> Dict[str, any]:
+        check_name = f"null_check_{table_name}_{column_name}"
+        if total_count == 0 and batch_id is not None:
+            # A batch that changed no rows has nothing to validate
             result_dict = {
                 'check_name': check_name,
                 'table_name': table_name,
-                'passed': False,
-                'error': str(e),
-                'message': error_msg
+                'column_name': column_name,
+                'passed': True,
+                'null_count': 0,
+                'total_count': 0,
+                'null_percentage': 0.0,
+                'batch_id': batch_id,
+                'message': f"Batch {batch_id} has no rows in {table_name}"
             }
             self.check_results.append(result_dict)
             return result_dict
-    
-    def check_null_values(self, table_name: str, column_name: str, 
-                         max_null_percentage: float = 0.0) -> Dict[str, any]:
 
-        check_name = f"null_check_{table_name}_{column_name}"
-        try:
-            engine = self._get_observability_connection()
-            with engine.connect() as conn:
-                # Get total count
-                total_result = conn.execute(text(f"SELECT COUNT(*) FROM {table_name}"))
-                total_count = total_result.scalar()
-                
-                if total_count == 0:
-                    result_dict = {
-                        'check_name': check_name,
-                        'table_name': table_name,
-                        'column_name': column_name,
-                        'passed': False,
-                        'null_count': 0,
-                        'total_count': 0,
-                        'null_percentage': 0.0,
-                        'message': 'Table is empty'
-                    }
-                    self.check_results.append(result_dict)
-                    return result_dict
-
-                null_result = conn.execute(text(
-                    f"SELECT COUNT(*) FROM {table_name} WHERE {column_name} IS NULL"
-                ))
-                null_count = null_result.scalar()
-                null_percentage = null_count / total_count if total_count > 0 else 0.0
-                
-                passed = null_percentage <= max_null_percentage
-                result_dict = {
-                    'check_name': check_name,
-                    'table_name': table_name,
-                    'column_name': column_name,
-                    'passed': passed,
-                    'null_count': null_count,
-                    'total_count': total_count,
-                    'null_percentage': null_percentage,
-                    'max_allowed': max_null_percentage,
-                    'message': f"Null check: {null_percentage:.2%} null values (max allowed: {max_null_percentage:.2%})"
-                }
-                
-                if passed:
-                    logger.info(f"✓ {check_name}: PASSED - {null_percentage:.2%} null values")
-                else:
-                    logger.warning(f"✗ {check_name}: FAILED - {null_percentage:.2%} null values (max: {max_null_percentage:.2%})")
-                
-                self.check_results.append(result_dict)
-                return result_dict
-                
-        except Exception as e:
-            error_msg = f"Error checking null values for {table_name}.{column_name}: {str(e)}"
-            logger.error(error_msg)
+        if total_count == 0:
             result_dict = {
                 'check_name': check_name,
                 'table_name': table_name,
                 'column_name': column_name,
                 'passed': False,
-                'error': str(e),
-                'message': error_msg
+                'null_count': 0,
+                'total_count': 0,
+                'null_percentage': 0.0,
+                'message': 'Table is empty'
             }
             self.check_results.append(result_dict)
             return result_dict
-    
-    def check_data_freshness(self, table_name: str, timestamp_column: str = 'extracted_at',
-                           max_age_hours: int = 25) -> Dict[str, any]:
 
+        null_percentage = null_count / total_count if total_count > 0 else 0.0
+        
+        passed = null_percentage <= max_null_percentage
+        result_dict = {
+            'check_name': check_name,
+            'table_name': table_name,
+            'column_name': column_name,
+            'passed': passed,
+            'null_count': null_count,
+            'total_count': total_count,
+            'null_percentage': null_percentage,
+            'max_allowed': max_null_percentage,
+            'message': f"Null check: {null_percentage:.2%} null values (max allowed: {max_null_percentage:.2%})"
+        }
+        
+        if passed:
+            logger.info(f"✓ {check_name}: PASSED - {null_percentage:.2%} null values")
+        else:
+            logger.warning(f"✗ {check_name}: FAILED - {null_percentage:.2%} null values (max: {max_null_percentage:.2%})")
+        
+        self.check_results.append(result_dict)
+        return result_dict
+
+    def _freshness_result(self, table_name: str, max_timestamp, max_age_hours: int,
+                          batch_id: BatchIds = None) -> Dict[str, any]:
         check_name = f"freshness_check_{table_name}"
-        try:
-            engine = self._get_observability_connection()
-            with engine.connect() as conn:
-                result = conn.execute(text(
-                    f"SELECT MAX({timestamp_column}) FROM {table_name}"
-                ))
-                max_timestamp = result.scalar()
-                
-                if max_timestamp is None:
-                    result_dict = {
-                        'check_name': check_name,
-                        'table_name': table_name,
-                        'passed': False,
-                        'message': 'No timestamp found in table'
-                    }
-                    self.check_results.append(result_dict)
-                    return result_dict
-                
-            
-                from datetime import datetime, timezone
-                if isinstance(max_timestamp, str):
-                    max_timestamp = pd.to_datetime(max_timestamp)
-                
-                age_hours = (datetime.now(timezone.utc) - max_timestamp).total_seconds() / 3600
-                passed = age_hours <= max_age_hours
-                
-                result_dict = {
-                    'check_name': check_name,
-                    'table_name': table_name,
-                    'passed': passed,
-                    'max_timestamp': str(max_timestamp),
-                    'age_hours': age_hours,
-                    'max_allowed_hours': max_age_hours,
-                    'message': f"Data freshness: {age_hours:.2f} hours old (max allowed: {max_age_hours} hours)"
-                }
-                if passed:
-                    logger.info(f"✓ {check_name}: PASSED - Data is {age_hours:.2f} hours old")
-                else:
-                    logger.warning(f"✗ {check_name}: FAILED - Data is {age_hours:.2f} hours old (max: {max_age_hours} hours)")
-                
-                self.check_results.append(result_dict)
-                return result_dict
-                
-        except Exception as e:
-            error_msg = f"Error checking data freshness for {table_name}: {str(e)}"
-            logger.error(error_msg)
+        if max_timestamp is None and batch_id is not None:
+            result_dict = {
+                'check_name': check_name,
+                'table_name': table_name,
+                'passed': True,
+                'batch_id': batch_id,
+                'message': f"Batch {batch_id} has no rows in {table_name}"
+            }
+            self.check_results.append(result_dict)
+            return result_dict
+
+        if max_timestamp is None:
             result_dict = {
                 'check_name': check_name,
                 'table_name': table_name,
                 'passed': False,
-                'error': str(e),
-                'message': error_msg
+                'message': 'No timestamp found in table'
             }
             self.check_results.append(result_dict)
             return result_dict
+        
+        if isinstance(max_timestamp, str):
+            max_timestamp = pd.to_datetime(max_timestamp)
+        # extracted_at is written as naive UTC
+        if max_timestamp.tzinfo is None:
+            max_timestamp = max_timestamp.replace(tzinfo=timezone.utc)
+        
+        age_hours = (datetime.now(timezone.utc) - max_timestamp).total_seconds() / 3600
+        passed = age_hours <= max_age_hours
+        
+        result_dict = {
+            'check_name': check_name,
+            'table_name': table_name,
+            'passed': passed,
+            'max_timestamp': str(max_timestamp),
+            'age_hours': age_hours,
+            'max_allowed_hours': max_age_hours,
+            'message': f"Data freshness: {age_hours:.2f} hours old (max allowed: {max_age_hours} hours)"
+        }
+        if passed:
+            logger.info(f"✓ {check_name}: PASSED - Data is {age_hours:.2f} hours old")
+        else:
+            logger.warning(f"✗ {check_name}: FAILED - Data is {age_hours:.2f} hours old (max: {max_age_hours} hours)")
+        
+        self.check_results.append(result_dict)
+        return result_dict
+
+    def _timeout_result(self, check_name: str, table_name: str, timeout_ms: int,
+                        column_name: Optional[str] = None) -> Dict[str, any]:
+        message = f"{check_name} was cancelled after its {timeout_ms} ms statement_timeout"
+        logger.warning(f"⏱ {check_name}: TIMED OUT - {message}")
+        result_dict = {
+            'check_name': check_name,
+            'table_name': table_name,
+            'passed': False,
+            'status': 'timeout',
+            'timeout_ms': timeout_ms,
+            'message': message
+        }
+        if column_name is not None:
+            result_dict['column_name'] = column_name
+        self.check_results.append(result_dict)
+        return result_dict
+
+    def _error_result(self, check_name: str, table_name: str, error_msg: str, error: str,
+                      column_name: Optional[str] = None) -> Dict[str, any]:
+        logger.error(error_msg)
+        result_dict = {
+            'check_name': check_name,
+            'table_name': table_name,
+            'passed': False,
+            'error': error,
+            'message': error_msg
+        }
+        if column_name is not None:
+            result_dict['column_name'] = column_name
+        self.check_results.append(result_dict)
+        return result_dict
+    
+    @staticmethod
+    def _missing_column_error(table_name: str, column_name: str, freshness: bool = False) -> Dict[str, Any]:
+        """_error_result arguments of a check whose column does not exist."""
+        error = f"column {column_name} does not exist in {table_name}"
+        if freshness:
+            return {'check_name': f"freshness_check_{table_name}", 'table_name': table_name,
+                    'error_msg': f"Error checking data freshness for {table_name}: {error}", 'error': error}
+        return {'check_name': f"null_check_{table_name}_{column_name}", 'table_name': table_name,
+                'error_msg': f"Error checking null values for {table_name}.{column_name}: {error}", 'error': error,
+                'column_name': column_name}
+
+    @staticmethod
+    def _batch_filter(batch_id: BatchIds):
+        """WHERE clause and bind parameters restricting a check to one or more load batches."""
+        if batch_id is None:
+            return '', {}
+        if isinstance(batch_id, str):
+            return ' WHERE batch_id = :batch_id', {'batch_id': batch_id}
+        params = {f'batch_id_{index}': value for index, value in enumerate(batch_id)}
+        if not params:
+            return ' WHERE 1 = 0', {}
+        return f" WHERE batch_id IN ({', '.join(f':{name}' for name in params)})", params
+    
+    def check_row_count(self, table_name: str, min_rows: int = 0,
+                        batch_id: BatchIds = None, timeout_ms: Optional[int] = None) -> Dict[str, any]:
+        try:
+            engine = self._get_observability_connection()
+            where, params = self._batch_filter(batch_id)
+            with engine.connect() as conn, statement_timeout(conn, timeout_ms):
+                result = conn.execute(text(f"SELECT COUNT(*) FROM {table_name}{where}"), params)
+                row_count = result.scalar()
+            return self._row_count_result(table_name, row_count, min_rows)
+                
+        except Exception as e:
+            if is_statement_timeout(e):
+                return self._timeout_result(f"row_count_{table_name}", table_name, timeout_ms)
+            return self._error_result(
+                f"row_count_{table_name}", table_name,
+                f"Error checking row count for {table_name}: {str(e)}", str(e)
+            )
+    
+    def check_null_values(self, table_name: str, column_name: str, 
+                         max_null_percentage: float = 0.0,
+                         batch_id: BatchIds = None, timeout_ms: Optional[int] = None) -> Dict[str, any]:
+        try:
+            engine = self._get_observability_connection()
+            where, params = self._batch_filter(batch_id)
+            with engine.connect() as conn, statement_timeout(conn, timeout_ms):
+                result = conn.execute(text(
+                    f"SELECT COUNT(*), COUNT(*) - COUNT({column_name}) FROM {table_name}{where}"
+                ), params)
+                total_count, null_count = result.one()
+            return self._null_values_result(table_name, column_name, null_count, total_count,
+                                            max_null_percentage, batch_id=batch_id)
+                
+        except Exception as e:
+            if is_statement_timeout(e):
+                return self._timeout_result(f"null_check_{table_name}_{column_name}", table_name, timeout_ms,
+                                            column_name=column_name)
+            return self._error_result(
+                f"null_check_{table_name}_{column_name}", table_name,
+                f"Error checking null values for {table_name}.{column_name}: {str(e)}", str(e),
+                column_name=column_name
+            )
     
-    def run_all_checks(self) -> Dict[str, any]:
+    def check_data_freshness(self, table_name: str, timestamp_column: str = 'extracted_at',
+                           max_age_hours: int = 25,
+                           batch_id: BatchIds = None, timeout_ms: Optional[int] = None) -> Dict[str, any]:
+        try:
+            engine = self._get_observability_connection()
+            where, params = self._batch_filter(batch_id)
+            with engine.connect() as conn, statement_timeout(conn, timeout_ms):
+                result = conn.execute(text(
+                    f"SELECT MAX({timestamp_column}) FROM {table_name}{where}"
+                ), params)
+                max_timestamp = result.scalar()
+            return self._freshness_result(table_name, max_timestamp, max_age_hours,
+                                          batch_id=batch_id)
+                
+        except Exception as e:
+            if is_statement_timeout(e):
+                return self._timeout_result(f"freshness_check_{table_name}", table_name, timeout_ms)
+            return self._error_result(
+                f"freshness_check_{table_name}", table_name,
+                f"Error checking data freshness for {table_name}: {str(e)}", str(e)
+            )
+
+    def check_table(self, table_name: str, min_rows: int = 0,
+                    null_columns: Optional[Dict[str, float]] = None,
+                    timestamp_column: Optional[str] = 'extracted_at',
+                    max_age_hours: int = 25,
+                    batch_id: BatchIds = None) -> List[Dict[str, any]]:
+        """
+        Run the row count, null value and freshness checks for a table as one aggregate query.
+
+        Args:
+            table_name: Table to check
+            min_rows: Minimum expected row count
+            null_columns: Mapping of column name to max allowed null fraction
+            timestamp_column: Column used for the freshness check, None to skip it
+            max_age_hours: Maximum allowed age of the newest timestamp
+            batch_id: Restrict all checks to the rows of one load batch (or a list of batches); None checks the whole table
+
+        Returns:
+            List of check result dicts, in the same shape as the single-check methods
+        """
+        null_columns = null_columns or {}
+        results = []
+        try:
+            engine = self._get_observability_connection()
+            existing_columns = {column['name'] for column in inspect(engine).get_columns(table_name)}
+
+            # A missing column fails its own check rather than the whole batch
+            null_aliases = {}
+            select_list = ['COUNT(*) AS row_count']
+            for column_name in null_columns:
+                if column_name in existing_columns:
+                    null_aliases[column_name] = f"null_{len(null_aliases)}"
+                    select_list.append(f"COUNT(*) - COUNT({column_name}) AS {null_aliases[column_name]}")
+            check_freshness = timestamp_column in existing_columns
+            if check_freshness:
+                select_list.append(f"MAX({timestamp_column}) AS max_timestamp")
+
+            where, params = self._batch_filter(batch_id)
+            with engine.connect() as conn:
+                row = conn.execute(text(
+                    f"SELECT {', '.join(select_list)} FROM {table_name}{where}"
+                ), params).mappings().one()
 
-        logger.info("Starting data quality checks")
+        except Exception as e:
+            error_msg = f"Error running batched checks for {table_name}: {str(e)}"
+            results.append(self._error_result(f"row_count_{table_name}", table_name, error_msg, str(e)))
+            for column_name in null_columns:
+                results.append(self._error_result(
+                    f"null_check_{table_name}_{column_name}", table_name, error_msg, str(e),
+                    column_name=column_name
+                ))
+            if timestamp_column is not None:
+                results.append(self._error_result(
+                    f"freshness_check_{table_name}", table_name, error_msg, str(e)
+                ))
+            return results
+
+        row_count = row['row_count']
+        results.append(self._row_count_result(table_name, row_count, min_rows))
+        for column_name, max_null_percentage in null_columns.items():
+            if column_name in null_aliases:
+                results.append(self._null_values_result(
+                    table_name, column_name, row[null_aliases[column_name]], row_count,
+                    max_null_percentage, batch_id=batch_id
+                ))
+            else:
+                results.append(self._error_result(**self._missing_column_error(table_name, column_name)))
+        if check_freshness:
+            results.append(self._freshness_result(table_name, row['max_timestamp'], max_age_hours,
+                                                  batch_id=batch_id))
+        elif timestamp_column is not None:
+            results.append(self._error_result(
+                **self._missing_column_error(table_name, timestamp_column, freshness=True)
+            ))
+        return results
+    
+    def _check_calls(self, batch_id: BatchIds,
+                     timeout_ms: Optional[int]) -> List[Tuple[str, Callable, Dict[str, Any]]]:
+        """Every configured check of TABLE_CHECKS as its own (table_name, check method, kwargs)."""
+        inspector = inspect(self._get_observability_connection())
+        calls = []
+        for table_name, config in TABLE_CHECKS.items():
+            existing_columns = {column['name'] for column in inspector.get_columns(table_name)}
+            common = {'table_name': table_name, 'batch_id': batch_id, 'timeout_ms': timeout_ms}
+            calls.append((table_name, self.check_row_count, {**common, 'min_rows': config['min_rows']}))
+            for column_name, max_null_percentage in config['null_columns'].items():
+                if column_name not in existing_columns:
+                    calls.append((table_name, self._error_result,
+                                  self._missing_column_error(table_name, column_name)))
+                    continue
+                calls.append((table_name, self.check_null_values,
+                              {**common, 'column_name': column_name, 'max_null_percentage': max_null_percentage}))
+            timestamp_column = config['timestamp_column']
+            if timestamp_column is None:
+                continue
+            if timestamp_column not in existing_columns:
+                calls.append((table_name, self._error_result,
+                              self._missing_column_error(table_name, timestamp_column, freshness=True)))
+                continue
+            calls.append((table_name, self.check_data_freshness,
+                          {**common, 'timestamp_column': timestamp_column, 'max_age_hours': config['max_age_hours']}))
+        return calls
+
+    def _timed_check(self, table_name: str, check: Callable, kwargs: Dict[str, Any]) -> Dict[str, any]:
+        started = time.perf_counter()
+        with self.metrics.stage('check', table_name) as checked:
+            result = check(**kwargs)
+            checked['rows'] = result.get('row_count', 0)
+        result['seconds'] = round(time.perf_counter() - started, 4)
+        return result
+
+    def run_checks_parallel(self, batch_id: BatchIds = None, max_workers: Optional[int] = None,
+                            timeout_ms: Optional[int] = DEFAULT_CHECK_TIMEOUT_MS) -> List[Dict[str, any]]:
+        """
+        Run every configured check as its own query on a thread pool, each with a statement_timeout.
+
+        Returns:
+            List of check result dicts in TABLE_CHECKS order, each with its 'seconds'
+        """
+        engine = self._get_observability_connection()
+        calls = self._check_calls(batch_id, timeout_ms)
+        pool_size = getattr(engine.pool, 'size', None)
+        workers = max_workers or (pool_size() if callable(pool_size) else len(calls))
+        workers = max(1, min(workers, len(calls)))
+        logger.info(f"Running {len(calls)} checks on {workers} threads (statement_timeout {timeout_ms} ms)")
+
+        first = len(self.check_results)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='quality-check') as executor:
+            futures = [executor.submit(self._timed_check, table_name, check, kwargs)
+                       for table_name, check, kwargs in calls]
+            results = [future.result() for future in futures]
+        # The checks append in completion order; keep the configured order instead
+        self.check_results[first:] = results
+        return results
+
+    @staticmethod
+    def _check_status(check: Dict[str, any]) -> str:
+        if 'status' in check:
+            return check['status']
+        if 'error' in check:
+            return 'error'
+        return 'passed' if check.get('passed', False) else 'failed'
+
+    def run_all_checks(self, batch_id: BatchIds = None, parallel: bool = False,
+                       max_workers: Optional[int] = None,
+                       check_timeout_ms: Optional[int] = DEFAULT_CHECK_TIMEOUT_MS) -> Dict[str, any]:
+        """
+        Run the configured checks for every table.
+
+        Args:
+            batch_id: Validate only the rows of this load batch (as returned by
+                extract_and_load), or of a list of batches (the shards of a
+                mapped extraction). None runs a deep check over the full tables.
+            parallel: Run each check as its own concurrent query with a
+                statement_timeout (run_checks_parallel) instead of one batched
+                query per table, one table after another
+            max_workers: Check threads of a parallel run, default the engine's pool size
+            check_timeout_ms: statement_timeout of every check of a parallel run, None for no limit
+        """
+        if batch_id is None:
+            scope = "full tables"
+        elif isinstance(batch_id, str):
+            scope = f"batch {batch_id}"
+        else:
+            batch_id = list(batch_id)
+            scope = f"{len(batch_id)} batches"
+        logger.info(f"Starting data quality checks ({scope})")
+        self.metrics = PipelineMetrics('quality', batch_id if isinstance(batch_id, str) else None)
     
         dag_runs_exists = self.check_table_exists('dag_runs')
         task_instances_exists = self.check_table_exists('task_instances')
@@ -215,26 +481,38 @@ class DataQualityChecker:
                 'checks': self.check_results
             }
 
-        self.check_row_count('dag_runs', min_rows=0)
-        self.check_null_values('dag_runs', 'dag_id', max_null_percentage=0.0)
-        self.check_null_values('dag_runs', 'run_id', max_null_percentage=0.0)
-        self.check_data_freshness('dag_runs', timestamp_column='extracted_at', max_age_hours=25)
-        
-        self.check_row_count('task_instances', min_rows=0)
-        self.check_null_values('task_instances', 'task_id', max_null_percentage=0.0)
-        self.check_null_values('task_instances', 'dag_id', max_null_percentage=0.0)
-        self.check_data_freshness('task_instances', timestamp_column='extracted_at', max_age_hours=25)
+        started = time.perf_counter()
+        if parallel:
+            self.run_checks_parallel(batch_id, max_workers=max_workers, timeout_ms=check_timeout_ms)
+        else:
+            for table_name, config in TABLE_CHECKS.items():
+                with self.metrics.stage('check', table_name) as checked:
+                    table_results = self.check_table(table_name, batch_id=batch_id, **config)
+                    checked['rows'] = table_results[0].get('row_count', 0)
+        wall_seconds = time.perf_counter() - started
+        self.metrics.save(self._get_observability_connection())
+
+        for check in self.check_results:
+            check['status'] = self._check_status(check)
         all_passed = all(check.get('passed', False) for check in self.check_results)
         
         passed_count = sum(1 for check in self.check_results if check.get('passed', False))
+        timed_out_count = sum(1 for check in self.check_results if check['status'] == 'timeout')
         total_count = len(self.check_results)
         
-        logger.info(f"Data quality checks completed: {passed_count}/{total_count} passed")
+        logger.info(
+            f"Data quality checks completed in {wall_seconds:.2f}s: {passed_count}/{total_count} passed"
+            + (f", {timed_out_count} timed out" if timed_out_count else "")
+        )
         
         return {
             'all_passed': all_passed,
             'passed_count': passed_count,
+            'timed_out_count': timed_out_count,
             'total_count': total_count,
-            'checks': self.check_results
+            'wall_seconds': round(wall_seconds, 4),
+            'batch_id': batch_id,
+            'checks': self.check_results,
+            'metrics': self.metrics.as_records()
         }
 
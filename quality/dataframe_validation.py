@@ -0,0 +1,193 @@
+"""Vectorized pre-load validation of extracted DataFrames."""
+
+import logging
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+QUARANTINE_COLUMN = 'failed_expectations'
+
+
+def _load_suite_expectations(table_name: str) -> List[Dict]:
+    """Expectation configs from the Great Expectations suite for table_name."""
+    if table_name == 'dag_runs':
+        from quality.expectations.dag_runs_expectations import get_dag_runs_expectation_suite
+        suite = get_dag_runs_expectation_suite()
+    elif table_name == 'task_instances':
+        from quality.expectations.task_instances_expectations import get_task_instances_expectation_suite
+        suite = get_task_instances_expectation_suite()
+    else:
+        raise ValueError(f"No expectation suite defined for {table_name}")
+    return suite.to_json_dict()['expectations']
+
+
+def _as_datetime(series: pd.Series) -> pd.Series:
+    return pd.to_datetime(series, utc=True, errors='coerce')
+
+
+class DataFrameValidator:
+    """Run Great Expectations suite rules directly on in-memory DataFrames as vectorized masks."""
+
+    SUPPORTED_EXPECTATIONS = (
+        'expect_column_values_to_not_be_null',
+        'expect_column_values_to_be_in_set',
+        'expect_column_values_to_be_between',
+        'expect_column_pair_values_a_to_be_greater_than_b',
+    )
+
+    def __init__(self, expectations: List[Dict], name: str = 'dataframe'):
+        self.name = name
+        self.expectations = []
+        for expectation in expectations:
+            if expectation['expectation_type'] in self.SUPPORTED_EXPECTATIONS:
+                self.expectations.append(expectation)
+            else:
+                logger.warning(
+                    f"Skipping unsupported expectation {expectation['expectation_type']} for {name}"
+                )
+
+    @classmethod
+    def for_table(cls, table_name: str) -> 'DataFrameValidator':
+        return cls(_load_suite_expectations(table_name), name=table_name)
+
+    @staticmethod
+    def _describe(expectation: Dict) -> str:
+        kwargs = expectation['kwargs']
+        if 'column' in kwargs:
+            return f"{expectation['expectation_type']}({kwargs['column']})"
+        return f"{expectation['expectation_type']}({kwargs['column_A']}, {kwargs['column_B']})"
+
+    def _unexpected_mask(self, df: pd.DataFrame, expectation: Dict) -> pd.Series:
+        """Boolean Series that is True for rows violating the expectation."""
+        expectation_type = expectation['expectation_type']
+        kwargs = expectation['kwargs']
+
+        if expectation_type == 'expect_column_pair_values_a_to_be_greater_than_b':
+            column_a, column_b = df[kwargs['column_A']], df[kwargs['column_B']]
+            if kwargs.get('parse_strings_as_datetimes'):
+                column_a, column_b = _as_datetime(column_a), _as_datetime(column_b)
+            present = column_a.notna() & column_b.notna()
+            if kwargs.get('or_equal'):
+                ok = column_a >= column_b
+            else:
+                ok = column_a > column_b
+            return present & ~ok.fillna(False).astype(bool)
+
+        column = df[kwargs['column']]
+        if expectation_type == 'expect_column_values_to_not_be_null':
+            return column.isna()
+
+        present = column.notna()
+        if expectation_type == 'expect_column_values_to_be_in_set':
+            return present & ~column.isin(kwargs['value_set'])
+
+        # expect_column_values_to_be_between
+        values = pd.to_numeric(column, errors='coerce')
+        unexpected = present & values.isna()
+        if kwargs.get('min_value') is not None:
+            if kwargs.get('strict_min'):
+                unexpected |= values <= kwargs['min_value']
+            else:
+                unexpected |= values < kwargs['min_value']
+        if kwargs.get('max_value') is not None:
+            if kwargs.get('strict_max'):
+                unexpected |= values >= kwargs['max_value']
+            else:
+                unexpected |= values > kwargs['max_value']
+        return unexpected
+
+    def _evaluate(self, df: pd.DataFrame) -> Tuple[List[Dict], Dict[str, pd.Series]]:
+        results, masks = [], {}
+        element_count = len(df)
+        for expectation in self.expectations:
+            description = self._describe(expectation)
+            mostly = expectation['kwargs'].get('mostly', 1.0)
+            try:
+                mask = self._unexpected_mask(df, expectation)
+            except KeyError as e:
+                results.append({
+                    'expectation': description,
+                    'success': False,
+                    'error': f"column {e} missing from DataFrame",
+                })
+                continue
+
+            unexpected_count = int(mask.sum())
+            success_fraction = 1.0 - unexpected_count / element_count if element_count else 1.0
+            masks[description] = mask
+            results.append({
+                'expectation': description,
+                'success': success_fraction >= mostly,
+                'element_count': element_count,
+                'unexpected_count': unexpected_count,
+                'unexpected_percent': 100.0 * (1.0 - success_fraction),
+            })
+        return results, masks
+
+    def validate(self, df: pd.DataFrame) -> Dict:
+        """
+        Validate a DataFrame against every supported expectation.
+
+        Returns:
+            Dictionary with overall success, per-expectation results and the
+            number of rows violating at least one expectation
+        """
+        results, masks = self._evaluate(df)
+        failed_rows = np.zeros(len(df), dtype=bool)
+        for mask in masks.values():
+            failed_rows |= mask.to_numpy(dtype=bool)
+        return {
+            'success': all(result['success'] for result in results),
+            'element_count': len(df),
+            'failed_row_count': int(failed_rows.sum()),
+            'results': results,
+        }
+
+    def split(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame, Dict]:
+        """
+        Separate rows violating any expectation from the rest.
+
+        Returns:
+            (valid_df, quarantined_df, validation) where quarantined_df carries a
+            failed_expectations column naming the rules each row broke
+        """
+        results, masks = self._evaluate(df)
+        failed_rows = np.zeros(len(df), dtype=bool)
+        for mask in masks.values():
+            failed_rows |= mask.to_numpy(dtype=bool)
+
+        validation = {
+            'success': all(result['success'] for result in results),
+            'element_count': len(df),
+            'failed_row_count': int(failed_rows.sum()),
+            'results': results,
+        }
+        if not failed_rows.any():
+            return df, df.iloc[0:0], validation
+
+        quarantined = df[failed_rows].copy()
+        reasons = pd.Series('', index=quarantined.index)
+        for description, mask in masks.items():
+            row_failed = mask[failed_rows]
+            reasons = reasons.where(~row_failed, reasons + description + ';')
+        quarantined[QUARANTINE_COLUMN] = reasons.str.rstrip(';')
+
+        logger.warning(
+            f"Quarantined {len(quarantined)} of {len(df)} {self.name} rows failing pre-load validation"
+        )
+        return df[~failed_rows], quarantined, validation
+
+
+def merge_validation_summaries(summary: Optional[Dict], validation: Dict) -> Dict:
+    """Accumulate per-chunk validation results into a per-table summary."""
+    if summary is None:
+        summary = {'success': True, 'element_count': 0, 'failed_row_count': 0, 'unexpected_counts': {}}
+    summary['success'] = summary['success'] and validation['success']
+    summary['element_count'] += validation['element_count']
+    summary['failed_row_count'] += validation['failed_row_count']
+    for result in validation['results']:
+        counts = summary['unexpected_counts']
+        counts[result['expectation']] = counts.get(result['expectation'], 0) + result.get('unexpected_count', 0)
+    return summary
@@ -90,7 +90,7 @@ def get_dag_runs_expectation_suite() -> ExpectationSuite:
     
     suite.add_expectation(
         ExpectationConfiguration(
-            expectation_type="expect_column_pair_values_A_to_be_greater_than_B",
+            expectation_type="expect_column_pair_values_a_to_be_greater_than_b",
             kwargs={
                 "column_A": "end_date",
                 "column_B": "start_date",
@@ -1,17 +1,220 @@
 import logging
-from typing import Dict, Optional
+import re
+from datetime import datetime
+from typing import Dict, List, Optional
 from great_expectations import DataContext
+from great_expectations.core import ExpectationSuite
 from great_expectations.core.batch import RuntimeBatchRequest
-from airflow.hooks.base import BaseHook
-from sqlalchemy import create_engine
+from common.engines import get_connection_url, get_engine, get_engine_kwargs
+from common.metrics import PipelineMetrics
 
 logger = logging.getLogger(__name__)
 
+# DataContext and suite objects are expensive to build, so they are created once
+# per process and shared by every table validated in it
+_contexts: Dict[Optional[str], DataContext] = {}
+_suites: Dict[str, ExpectationSuite] = {}
+_datasources = set()
+
+DATASOURCE_NAME = "observability_postgres"
+
+SAMPLE_METHODS = ('random', 'tablesample')
+
+_BATCH_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+
+def get_data_context(ge_context_root_dir: Optional[str] = None) -> DataContext:
+    """Return the process-wide DataContext for ge_context_root_dir, creating it on first use."""
+    if ge_context_root_dir not in _contexts:
+        if ge_context_root_dir:
+            _contexts[ge_context_root_dir] = DataContext(ge_context_root_dir)
+        else:
+            _contexts[ge_context_root_dir] = DataContext()
+    return _contexts[ge_context_root_dir]
+
+
+def _ensure_datasource(context: DataContext, ge_context_root_dir: Optional[str],
+                       observability_conn_id: str) -> None:
+    """Point the observability datasource at the shared engine of observability_conn_id (not saved to the config)."""
+    if (ge_context_root_dir, observability_conn_id) in _datasources:
+        return
+    url = get_connection_url(observability_conn_id)
+    context.add_datasource(
+        name=DATASOURCE_NAME,
+        class_name="Datasource",
+        save_changes=False,
+        execution_engine={
+            "class_name": "SqlAlchemyExecutionEngine",
+            "connection_string": url.render_as_string(hide_password=False),
+            **get_engine_kwargs(observability_conn_id),
+        },
+        data_connectors={
+            "default_runtime_data_connector": {
+                "class_name": "RuntimeDataConnector",
+                "batch_identifiers": ["default_identifier_name"],
+            }
+        },
+    )
+    _datasources.add((ge_context_root_dir, observability_conn_id))
+
+
+def get_expectation_suite(table_name: str) -> ExpectationSuite:
+    """Return the cached expectation suite for dag_runs or task_instances."""
+    if table_name not in _suites:
+        if table_name == 'dag_runs':
+            from quality.expectations.dag_runs_expectations import get_dag_runs_expectation_suite
+            _suites[table_name] = get_dag_runs_expectation_suite()
+        elif table_name == 'task_instances':
+            from quality.expectations.task_instances_expectations import get_task_instances_expectation_suite
+            _suites[table_name] = get_task_instances_expectation_suite()
+        else:
+            raise ValueError(f"No expectation suite defined for {table_name}")
+    return _suites[table_name]
+
+
+def get_suite_columns(suite: ExpectationSuite) -> List[str]:
+    """Columns referenced by any expectation in the suite, in first-use order."""
+    columns = []
+    for expectation in suite.expectations:
+        for key in ('column', 'column_A', 'column_B'):
+            column = expectation.kwargs.get(key)
+            if column and column not in columns:
+                columns.append(column)
+    return columns
+
+
+def build_validation_query(
+    table_name: str,
+    columns: Optional[List[str]] = None,
+    time_column: str = 'extracted_at',
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    batch_id: Optional[str] = None,
+    sample_size: Optional[int] = None,
+    sample_method: str = 'random',
+    sample_percent: float = 1.0
+) -> str:
+    """
+    Build the SQL a validation batch is read from, pushing filters down to the database.
+
+    Args:
+        table_name: Table to validate
+        columns: Columns to select; None selects every column
+        time_column: Column the start_time/end_time range applies to
+        start_time: Only validate rows with time_column >= start_time
+        end_time: Only validate rows with time_column < end_time
+        batch_id: Only validate rows loaded by this batch
+        sample_size: Validate at most this many rows
+        sample_method: 'random' for a uniform random sample of the filtered rows, or
+            'tablesample' to read only sample_percent of the table's pages (TABLESAMPLE SYSTEM)
+        sample_percent: Percentage of pages read when sample_method is 'tablesample'
+
+    Returns:
+        SQL query string for a RuntimeBatchRequest
+    """
+    if sample_method not in SAMPLE_METHODS:
+        raise ValueError(f"Unknown sample_method {sample_method}, expected one of {SAMPLE_METHODS}")
+    if batch_id is not None and not _BATCH_ID_PATTERN.match(batch_id):
+        raise ValueError(f"Invalid batch_id: {batch_id}")
+
+    select_list = ', '.join(columns) if columns else '*'
+    query = f"SELECT {select_list} FROM {table_name}"
+    if sample_size and sample_method == 'tablesample':
+        query += f" TABLESAMPLE SYSTEM ({float(sample_percent)})"
+
+    filters = []
+    if start_time:
+        filters.append(f"{time_column} >= '{start_time.isoformat()}'")
+    if end_time:
+        filters.append(f"{time_column} < '{end_time.isoformat()}'")
+    if batch_id:
+        filters.append(f"batch_id = '{batch_id}'")
+    if filters:
+        query += " WHERE " + " AND ".join(filters)
+
+    if sample_size:
+        if sample_method == 'random':
+            query += " ORDER BY random()"
+        query += f" LIMIT {int(sample_size)}"
+    return query
+
+
+def _run_table_expectations(
+    table_name: str,
+    suite_table: str,
+    observability_conn_id: str,
+    ge_context_root_dir: Optional[str],
+    start_time: Optional[datetime],
+    end_time: Optional[datetime],
+    batch_id: Optional[str],
+    sample_size: Optional[int],
+    sample_method: str,
+    sample_percent: float,
+    time_column: str,
+    select_suite_columns: bool
+) -> Dict:
+    metrics = PipelineMetrics('expectations', batch_id)
+    with metrics.stage('context', table_name):
+        context = get_data_context(ge_context_root_dir)
+        _ensure_datasource(context, ge_context_root_dir, observability_conn_id)
+        suite = get_expectation_suite(suite_table)
+
+    query = build_validation_query(
+        table_name,
+        columns=get_suite_columns(suite) if select_suite_columns else None,
+        time_column=time_column,
+        start_time=start_time,
+        end_time=end_time,
+        batch_id=batch_id,
+        sample_size=sample_size,
+        sample_method=sample_method,
+        sample_percent=sample_percent
+    )
+    logger.info(f"Validating {table_name} with query: {query}")
+
+    batch_request = RuntimeBatchRequest(
+        datasource_name=DATASOURCE_NAME,
+        data_connector_name="default_runtime_data_connector",
+        data_asset_name=table_name,
+        runtime_parameters={"query": query},
+        batch_identifiers={"default_identifier_name": batch_id or "default_identifier"}
+    )
+
+    # get_validator runs the query and loads the batch; validate() evaluates the suite on it
+    with metrics.stage('query', table_name):
+        validator = context.get_validator(
+            batch_request=batch_request,
+            expectation_suite=suite
+        )
+    
+    with metrics.stage('validate', table_name):
+        checkpoint_result = validator.validate()
+    
+    logger.info(f"Great Expectations validation completed for {table_name}")
+    logger.info(f"Success: {checkpoint_result.success}")
+    metrics.save(get_engine(observability_conn_id))
+    
+    return {
+        "success": checkpoint_result.success,
+        "statistics": checkpoint_result.statistics,
+        "results": checkpoint_result.results,
+        "query": query,
+        "metrics": metrics.as_records()
+    }
+
 
 def run_dag_runs_expectations(
     observability_conn_id: str = 'observability_postgres',
     table_name: str = 'dag_runs',
-    ge_context_root_dir: Optional[str] = None
+    ge_context_root_dir: Optional[str] = None,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    batch_id: Optional[str] = None,
+    sample_size: Optional[int] = None,
+    sample_method: str = 'random',
+    sample_percent: float = 1.0,
+    time_column: str = 'extracted_at',
+    select_suite_columns: bool = True
 ) -> Dict:
     """
     Run Great Expectations checks on dag_runs table.
@@ -20,50 +223,25 @@ def run_dag_runs_expectations(
         observability_conn_id: Airflow connection ID for observability database
         table_name: Name of the table to validate
         ge_context_root_dir: Optional path to Great Expectations context root
+        start_time: Only validate rows with time_column >= start_time
+        end_time: Only validate rows with time_column < end_time
+        batch_id: Only validate rows loaded by this batch
+        sample_size: Validate a sample of at most this many rows
+        sample_method: 'random' or 'tablesample' (see build_validation_query)
+        sample_percent: Percentage of pages read when sample_method is 'tablesample'
+        time_column: Column the time range applies to
+        select_suite_columns: Read only the columns the suite references
         
     Returns:
         Dictionary with validation results
     """
     try:
-        
-        conn = BaseHook.get_connection(observability_conn_id)
-        connection_string = (
-            f"postgresql://{conn.login}:{conn.password}@{conn.host}:{conn.port}/{conn.schema}"
-        )
-        
-        
-        if ge_context_root_dir:
-            context = DataContext(ge_context_root_dir)
-        else:
-            context = DataContext()
-        
-        batch_request = RuntimeBatchRequest(
-            datasource_name="observability_postgres",
-            data_connector_name="default_runtime_data_connector",
-            data_asset_name=table_name,
-            runtime_parameters={"query": f"SELECT * FROM {table_name}"},
-            batch_identifiers={"default_identifier_name": "default_identifier"}
+        return _run_table_expectations(
+            table_name, 'dag_runs', observability_conn_id, ge_context_root_dir,
+            start_time, end_time, batch_id, sample_size, sample_method, sample_percent,
+            time_column, select_suite_columns
         )
         
-        from quality.expectations.dag_runs_expectations import get_dag_runs_expectation_suite
-        suite = get_dag_runs_expectation_suite()
-        
-        validator = context.get_validator(
-            batch_request=batch_request,
-            expectation_suite_name=suite.expectation_suite_name
-        )
-        
-        checkpoint_result = validator.validate()
-        
-        logger.info(f"Great Expectations validation completed for {table_name}")
-        logger.info(f"Success: {checkpoint_result.success}")
-        
-        return {
-            "success": checkpoint_result.success,
-            "statistics": checkpoint_result.statistics,
-            "results": checkpoint_result.results
-        }
-        
     except Exception as e:
         logger.error(f"Error running Great Expectations checks: {str(e)}")
         raise
@@ -72,7 +250,15 @@ def run_dag_runs_expectations(
 def run_task_instances_expectations(
     observability_conn_id: str = 'observability_postgres',
     table_name: str = 'task_instances',
-    ge_context_root_dir: Optional[str] = None
+    ge_context_root_dir: Optional[str] = None,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    batch_id: Optional[str] = None,
+    sample_size: Optional[int] = None,
+    sample_method: str = 'random',
+    sample_percent: float = 1.0,
+    time_column: str = 'extracted_at',
+    select_suite_columns: bool = True
 ) -> Dict:
     """
     Run Great Expectations checks on task_instances table.
@@ -81,50 +267,25 @@ def run_task_instances_expectations(
         observability_conn_id: Airflow connection ID for observability database
         table_name: Name of the table to validate
         ge_context_root_dir: Optional path to Great Expectations context root
+        start_time: Only validate rows with time_column >= start_time
+        end_time: Only validate rows with time_column < end_time
+        batch_id: Only validate rows loaded by this batch
+        sample_size: Validate a sample of at most this many rows
+        sample_method: 'random' or 'tablesample' (see build_validation_query)
+        sample_percent: Percentage of pages read when sample_method is 'tablesample'
+        time_column: Column the time range applies to
+        select_suite_columns: Read only the columns the suite references
         
     Returns:
         Dictionary with validation results
     """
     try:
-        
-        conn = BaseHook.get_connection(observability_conn_id)
-        connection_string = (
-            f"postgresql://{conn.login}:{conn.password}@{conn.host}:{conn.port}/{conn.schema}"
+        return _run_table_expectations(
+            table_name, 'task_instances', observability_conn_id, ge_context_root_dir,
+            start_time, end_time, batch_id, sample_size, sample_method, sample_percent,
+            time_column, select_suite_columns
         )
-        if ge_context_root_dir:
-            context = DataContext(ge_context_root_dir)
-        else:
-            context = DataContext()
-        
-        batch_request = RuntimeBatchRequest(
-            datasource_name="observability_postgres",
-            data_connector_name="default_runtime_data_connector",
-            data_asset_name=table_name,
-            runtime_parameters={"query": f"SELECT * FROM {table_name}"},
-            batch_identifiers={"default_identifier_name": "default_identifier"}
-        )
-
-        from quality.expectations.task_instances_expectations import get_task_instances_expectation_suite
-        suite = get_task_instances_expectation_suite()
-
-        # Run validation
-        validator = context.get_validator(
-            batch_request=batch_request,
-            expectation_suite_name=suite.expectation_suite_name
-        )
-        
-        checkpoint_result = validator.validate()
-        
-        logger.info(f"Great Expectations validation completed for {table_name}")
-        logger.info(f"Success: {checkpoint_result.success}")
-        
-        return {
-            "success": checkpoint_result.success,
-            "statistics": checkpoint_result.statistics,
-            "results": checkpoint_result.results
-        }
         
     except Exception as e:
         logger.error(f"Error running Great Expectations checks: {str(e)}")
         raise
-
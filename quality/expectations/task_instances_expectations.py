@@ -106,14 +106,14 @@ def get_task_instances_expectation_suite() -> ExpectationSuite:
             expectation_type="expect_column_values_to_be_between",
             kwargs={
                 "column": "try_number",
-                "min_value": 1,
+                "min_value": 0,
                 "mostly": 1.0,
                 "parse_strings_as_datetimes": False
             },
             meta={
                 "notes": {
                     "format": "markdown",
-                    "content": "try_number must be at least 1 (first attempt)"
+                    "content": "try_number must not be negative (0 until the first attempt starts)"
                 }
             }
         )
@@ -121,7 +121,7 @@ def get_task_instances_expectation_suite() -> ExpectationSuite:
   
     suite.add_expectation(
         ExpectationConfiguration(
-            expectation_type="expect_column_pair_values_A_to_be_greater_than_B",
+            expectation_type="expect_column_pair_values_a_to_be_greater_than_b",
             kwargs={
                 "column_A": "end_date",
                 "column_B": "start_date",
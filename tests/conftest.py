@@ -0,0 +1,113 @@
+"""
+Shared fixtures: a migrated SQLite Airflow metadata database, a SQLite
+stand-in for the observability database, and small dag_runs/task_instances frames.
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+from datetime import datetime, timedelta, timezone
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+
+START = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+# NOT NULL source columns the frames do not carry
+SOURCE_DEFAULTS = {
+    'dag_run': {'run_type': 'scheduled', 'external_trigger': False},
+    'task_instance': {'pool': 'default_pool', 'pool_slots': 1},
+}
+
+
+@pytest.fixture
+def observability_engine(tmp_path):
+    """File-backed SQLite standing in for the observability PostgreSQL database."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'observability.db'}")
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(scope='session')
+def airflow_metadata_db(tmp_path_factory):
+    """SQLite Airflow metadata database migrated once per session with the installed Airflow."""
+    airflow = pytest.importorskip('airflow')
+    path = tmp_path_factory.mktemp('airflow') / 'airflow.db'
+    env = dict(os.environ, AIRFLOW_HOME=str(path.parent), AIRFLOW__CORE__LOAD_EXAMPLES='False',
+               AIRFLOW__DATABASE__SQL_ALCHEMY_CONN=f"sqlite:///{path}")
+    # airflow db upgrade was renamed to migrate in 2.7
+    command = 'migrate' if tuple(int(part) for part in airflow.__version__.split('.')[:2]) >= (2, 7) else 'upgrade'
+    subprocess.run([sys.executable, '-m', 'airflow', 'db', command], env=env, check=True, capture_output=True)
+    return path
+
+
+@pytest.fixture
+def airflow_source(airflow_metadata_db, tmp_path, monkeypatch):
+    """
+    Point airflow.settings.Session at a copy of the migrated metadata database.
+
+    Returns a function that inserts metadata_frames() output into dag_run and
+    task_instance, with end_date as the updated_at change timestamp.
+    """
+    from airflow import settings
+    from airflow.models import DagRun, TaskInstance
+    from sqlalchemy.orm import sessionmaker
+
+    path = tmp_path / 'airflow.db'
+    shutil.copy(airflow_metadata_db, path)
+    engine = create_engine(f"sqlite:///{path}")
+    monkeypatch.setattr(settings, 'Session', sessionmaker(bind=engine))
+
+    def rows(table, df):
+        # task_instance has no execution_date since Airflow 2.2, it references its dag_run by run_id
+        df = df.assign(run_id='scheduled__' + pd.to_datetime(df['execution_date'], utc=True).map(pd.Timestamp.isoformat),
+                       updated_at=df['end_date'], **SOURCE_DEFAULTS[table.name])
+        df = df[[column for column in df.columns if column in table.columns]]
+        return df.astype(object).where(df.notna(), None).to_dict('records')
+
+    def insert(frames):
+        with engine.begin() as conn:
+            conn.execute(DagRun.__table__.insert(), rows(DagRun.__table__, frames['dag_runs']))
+            conn.execute(TaskInstance.__table__.insert(), rows(TaskInstance.__table__, frames['task_instances']))
+
+    yield insert
+    engine.dispose()
+
+
+@pytest.fixture
+def extractor(observability_engine):
+    pytest.importorskip('airflow')
+    from extract.airflow_metadata import AirflowMetadataExtractor
+
+    extractor = AirflowMetadataExtractor(chunk_size=2)
+    extractor.observability_engine = observability_engine
+    return extractor
+
+
+@pytest.fixture
+def metadata_frames():
+    """Build {'dag_runs', 'task_instances'} frames shaped like the extractor's chunks."""
+    def build(dag_ids=('dag_a', 'dag_b'), runs: int = 3, tasks: int = 2, state: str = 'success',
+              duration: float = 60.0, start: datetime = START, map_indexes=(-1,)):
+        dag_runs, task_instances = [], []
+        for dag_id in dag_ids:
+            for run in range(runs):
+                execution_date = start + timedelta(hours=run)
+                start_date = execution_date + timedelta(minutes=1)
+                end_date = start_date + timedelta(seconds=duration)
+                dag_runs.append({
+                    'dag_id': dag_id, 'execution_date': execution_date, 'state': state,
+                    'start_date': start_date, 'end_date': end_date, 'duration': duration,
+                    'extracted_at': datetime.now(timezone.utc),
+                })
+                for task in range(tasks):
+                    for map_index in map_indexes:
+                        task_instances.append({
+                            'dag_id': dag_id, 'task_id': f'task_{task}', 'execution_date': execution_date,
+                            'map_index': map_index, 'state': state, 'start_date': start_date,
+                            'end_date': end_date, 'duration': duration, 'try_number': 1,
+                            'extracted_at': datetime.now(timezone.utc),
+                        })
+        return {'dag_runs': pd.DataFrame(dag_runs), 'task_instances': pd.DataFrame(task_instances)}
+    return build
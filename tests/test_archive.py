@@ -0,0 +1,69 @@
+import glob
+import os
+from datetime import date, datetime, timedelta, timezone
+
+import pandas as pd
+import pytest
+
+from extract.archive import ParquetArchive
+
+START = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def archive(tmp_path, metadata_frames):
+    """Archive holding task instances of 2026-10-01 through 2026-10-03."""
+    archive = ParquetArchive(str(tmp_path / 'archive'))
+    for day in range(3):
+        frames = metadata_frames(start=START + timedelta(days=day))
+        archive.write(frames['task_instances'].assign(cluster_id='default'), 'task_instances', f'batch-{day}')
+    return archive
+
+
+def test_date_range_only_opens_its_partitions(archive):
+    # Unreadable files outside the range would fail the read if they were opened
+    for path in glob.glob(os.path.join(archive.root, 'table=task_instances', 'date=2026-10-0[13]', '*.parquet')):
+        with open(path, 'wb') as f:
+            f.write(b'not parquet')
+
+    df = archive.read('task_instances', start_date=date(2026, 10, 2), end_date=date(2026, 10, 2))
+
+    assert len(df) == 12
+    assert set(df['date']) == {date(2026, 10, 2)}
+
+
+def test_columns_and_dag_ids_are_pushed_down(archive):
+    df = archive.read('task_instances', columns=['dag_id', 'duration'], dag_ids=['dag_b'])
+
+    assert list(df.columns) == ['dag_id', 'duration']
+    assert len(df) == 18
+    assert set(df['dag_id']) == {'dag_b'}
+    batches = list(archive.iter_batches('task_instances', start_date=date(2026, 10, 3), columns=['task_id']))
+    assert sum(len(batch) for batch in batches) == 12
+
+
+def test_deduplicate_keeps_the_latest_version(archive, metadata_frames):
+    rerun = metadata_frames(state='failed')['task_instances']
+    rerun['extracted_at'] = rerun['extracted_at'] + timedelta(hours=1)
+    archive.write(rerun, 'task_instances', 'batch-rerun')
+
+    day = date(2026, 10, 1)
+    assert len(archive.read('task_instances', start_date=day, end_date=day)) == 24
+    df = archive.read('task_instances', start_date=day, end_date=day, columns=['state'], deduplicate=True)
+    assert list(df.columns) == ['state']
+    assert df['state'].astype(str).tolist() == ['failed'] * 12
+
+
+def test_missing_table_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        ParquetArchive(str(tmp_path)).read('dag_runs')
+
+
+def test_rows_of_unclustered_files_read_as_default_cluster(tmp_path, metadata_frames):
+    archive = ParquetArchive(str(tmp_path))
+    archive.write(metadata_frames()['dag_runs'], 'dag_runs', 'legacy')
+
+    df = archive.read('dag_runs', columns=['cluster_id'])
+
+    assert isinstance(df['cluster_id'].dtype, pd.CategoricalDtype)
+    assert set(df['cluster_id']) == {'default'}
@@ -0,0 +1,40 @@
+import pytest
+
+pytest.importorskip('airflow')
+
+from quality.data_quality_checks import TABLE_CHECKS, DataQualityChecker
+
+
+@pytest.fixture
+def checker(observability_engine):
+    checker = DataQualityChecker()
+    checker.observability_engine = observability_engine
+    return checker
+
+
+def test_configured_columns_are_written_by_the_extractor(metadata_frames):
+    frames = metadata_frames()
+    for table_name, config in TABLE_CHECKS.items():
+        written = set(frames[table_name].columns) | {'cluster_id', 'batch_id'}
+        assert set(config['null_columns']) <= written
+        assert config['timestamp_column'] in written
+
+
+@pytest.mark.parametrize('parallel', [False, True])
+def test_clean_load_passes_every_check(extractor, checker, metadata_frames, parallel):
+    loaded = extractor.load_frames(metadata_frames(), load_mode='upsert')
+
+    results = checker.run_all_checks(parallel=parallel)
+
+    assert results['all_passed'], [check for check in results['checks'] if not check['passed']]
+    assert {check['status'] for check in results['checks']} == {'passed'}
+    assert checker.run_all_checks(batch_id=loaded['batch_id'], parallel=parallel)['all_passed']
+
+
+def test_checks_of_a_batch_without_rows_pass(extractor, checker, metadata_frames):
+    extractor.load_frames(metadata_frames(), load_mode='upsert')
+
+    results = checker.run_all_checks(batch_id=['no-such-batch'])
+
+    assert results['all_passed']
+    assert all(check.get('row_count', 0) == 0 for check in results['checks'])
@@ -0,0 +1,75 @@
+from datetime import timedelta
+import pytest
+from sqlalchemy import inspect
+
+pytest.importorskip('great_expectations')
+
+from quality.dataframe_validation import QUARANTINE_COLUMN, DataFrameValidator
+
+PAIR_RULE = 'expect_column_pair_values_a_to_be_greater_than_b'
+
+
+@pytest.mark.parametrize('table_name', ['dag_runs', 'task_instances'])
+def test_for_table_builds_the_suite_rules(table_name):
+    validator = DataFrameValidator.for_table(table_name)
+
+    assert PAIR_RULE in {expectation['expectation_type'] for expectation in validator.expectations}
+
+
+@pytest.mark.parametrize('table_name', ['dag_runs', 'task_instances'])
+def test_end_before_start_breaks_the_pair_rule(table_name, metadata_frames):
+    df = metadata_frames()[table_name]
+    df.loc[0, 'end_date'] = df.loc[0, 'start_date'] - timedelta(seconds=1)
+
+    validation = DataFrameValidator.for_table(table_name).validate(df)
+
+    pair_result = next(result for result in validation['results'] if result['expectation'].startswith(PAIR_RULE))
+    assert not validation['success']
+    assert pair_result['unexpected_count'] == 1
+    assert validation['failed_row_count'] == 1
+
+
+def test_split_quarantines_failing_rows_with_their_rules(metadata_frames):
+    df = metadata_frames()['dag_runs']
+    df.loc[0, 'end_date'] = df.loc[0, 'start_date'] - timedelta(seconds=1)
+    df.loc[1, 'state'] = 'exploded'
+
+    valid, quarantined, validation = DataFrameValidator.for_table('dag_runs').split(df)
+
+    assert len(valid) == len(df) - 2
+    assert list(quarantined.index) == [0, 1]
+    assert PAIR_RULE in quarantined.loc[0, QUARANTINE_COLUMN]
+    assert 'expect_column_values_to_be_in_set(state)' == quarantined.loc[1, QUARANTINE_COLUMN]
+    assert validation['failed_row_count'] == 2
+
+
+def test_quarantine_mode_diverts_rows_before_load(airflow_source, extractor, metadata_frames):
+    frames = metadata_frames(dag_ids=('dag_a',), runs=2, tasks=1)
+    frames['dag_runs'].loc[0, 'end_date'] = frames['dag_runs'].loc[0, 'start_date'] - timedelta(seconds=1)
+    airflow_source(frames)
+    extractor.preload_validation = 'quarantine'
+
+    results = extractor.extract_and_load(load_mode='upsert')
+    # The quarantine table is keyed like dag_runs, so a re-run does not duplicate the row
+    extractor.extract_and_load(load_mode='upsert')
+
+    assert results['dag_runs_count'] == 1
+    assert results['dag_runs_quarantined_count'] == 1
+    with extractor.observability_engine.connect() as conn:
+        quarantined = conn.exec_driver_sql(f"SELECT dag_id, {QUARANTINE_COLUMN} FROM dag_runs_quarantine").fetchall()
+    assert len(quarantined) == 1 and PAIR_RULE in quarantined[0][1]
+    inspector = inspect(extractor.observability_engine)
+    columns = {column['name']: column for column in inspector.get_columns('dag_runs_quarantine')}
+    assert columns['dag_id']['nullable'] and 'loaded_at' in columns
+    assert {'name': 'dag_runs_quarantine_natural_key', 'column_names': ['dag_id', 'execution_date', 'cluster_id'],
+            'unique': 1} in [{key: index[key] for key in ('name', 'column_names', 'unique')}
+                             for index in inspector.get_indexes('dag_runs_quarantine')]
+
+
+def test_task_instances_that_never_ran_pass_with_try_number_zero(metadata_frames):
+    df = metadata_frames(state='scheduled')['task_instances'].assign(try_number=0, start_date=None, end_date=None)
+
+    valid, quarantined, _ = DataFrameValidator.for_table('task_instances').split(df)
+
+    assert quarantined.empty
+    assert len(valid) == len(df)
@@ -0,0 +1,66 @@
+import time
+from datetime import timedelta
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('airflow')
+
+from extract.airflow_metadata import AirflowMetadataExtractor
+
+
+@pytest.mark.parametrize('options, kwargs', [
+    ({}, {'streaming': False}),
+    ({}, {}),
+    ({'compact_frames': True}, {'incremental': True}),
+])
+def test_task_instances_read_their_dag_run_execution_date(airflow_source, observability_engine, metadata_frames,
+                                                          options, kwargs):
+    frames = metadata_frames()
+    airflow_source(frames)
+    extractor = AirflowMetadataExtractor(chunk_size=2, **options)
+    extractor.observability_engine = observability_engine
+
+    results = extractor.extract_and_load(**kwargs)
+
+    assert results['task_instances_count'] == 12
+    with observability_engine.connect() as conn:
+        execution_dates = conn.exec_driver_sql("SELECT DISTINCT execution_date FROM task_instances").scalars()
+        assert len(list(execution_dates)) == 3
+
+
+def test_date_window_filters_task_instances_by_dag_run(airflow_source, extractor, metadata_frames):
+    frames = metadata_frames()
+    airflow_source(frames)
+    first = frames['dag_runs']['execution_date'].min()
+
+    results = extractor.extract_and_load(start_date=first + timedelta(hours=1), end_date=first + timedelta(hours=2))
+
+    assert results['dag_runs_count'] == 4
+    assert results['task_instances_count'] == 8
+
+
+def test_mapped_task_instances_stay_separate_rows(airflow_source, extractor, metadata_frames):
+    airflow_source(metadata_frames(dag_ids=('dag_a',), runs=1, map_indexes=(0, 1, 2)))
+
+    extractor.extract_and_load()
+    extractor.extract_and_load()
+
+    with extractor.observability_engine.connect() as conn:
+        rows = conn.exec_driver_sql("SELECT task_id, map_index FROM task_instances ORDER BY 1, 2").fetchall()
+    assert [tuple(row) for row in rows] == [(f'task_{task}', index) for task in range(2) for index in range(3)]
+
+
+def test_query_stage_times_the_statement_execution(extractor, metadata_frames):
+    class SlowQuery:
+        # Like Query.yield_per(), nothing runs until the first row is fetched
+        def yield_per(self, chunk_size):
+            time.sleep(0.2)
+            yield from metadata_frames()['dag_runs'].to_dict('records')
+
+    chunks = list(extractor._iter_query_chunks(SlowQuery(), pd.DataFrame, 4, 'dag_runs'))
+
+    assert [len(chunk) for chunk in chunks] == [4, 2]
+    stages = {record['stage']: record for record in extractor.metrics.as_records()}
+    assert stages['query']['seconds'] >= 0.2
+    assert stages['fetch']['seconds'] < 0.2
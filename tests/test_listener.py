@@ -0,0 +1,79 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('airflow')
+
+from sqlalchemy import create_engine
+
+from extract.airflow_metadata import AirflowMetadataExtractor
+from extract.listener import ObservabilityEventBuffer
+
+
+def _events(buffer, metadata_frames, dag_ids=('dag_a',)):
+    """Feed running then finished events of every run and task instance, like the hooks would."""
+    frames = metadata_frames(dag_ids=dag_ids, runs=2)
+    for row in frames['dag_runs'].to_dict('records'):
+        dag_run = SimpleNamespace(**{**row, 'end_date': None})
+        buffer.record_dag_run(dag_run, 'running')
+        dag_run.end_date = row['end_date']
+        buffer.record_dag_run(dag_run, row['state'])
+    for row in frames['task_instances'].to_dict('records'):
+        task_instance = SimpleNamespace(**{**row, 'end_date': None, 'duration': None, '_try_number': 1})
+        buffer.record_task_instance(task_instance, 'running')
+        task_instance.end_date = row['end_date']
+        buffer.record_task_instance(task_instance, row['state'])
+    return frames
+
+
+def _rows(engine, query: str):
+    with engine.connect() as conn:
+        return [tuple(row) for row in conn.exec_driver_sql(query)]
+
+
+def test_flush_upserts_the_latest_state(extractor, metadata_frames):
+    buffer = ObservabilityEventBuffer(extractor=extractor)
+    _events(buffer, metadata_frames)
+
+    assert buffer.flush() == 12
+    assert buffer.flush() == 0
+    engine = extractor.observability_engine
+    assert _rows(engine, "SELECT state, COUNT(*), SUM(duration) FROM dag_runs GROUP BY state") == [('success', 2, 120.0)]
+    assert _rows(engine, "SELECT state, COUNT(*) FROM task_instances GROUP BY state") == [('success', 4)]
+    assert _rows(engine, "SELECT SUM(total_count), SUM(running_count) FROM task_instances_rollup_daily") == [(4, 0)]
+
+
+def test_flusher_thread_flushes_full_batches_and_drains_on_stop(extractor, metadata_frames):
+    buffer = ObservabilityEventBuffer(extractor=extractor, batch_size=4, flush_interval=60.0).start()
+    _events(buffer, metadata_frames)
+
+    # flush_interval is far off, so only full batches of 4 rows are flushed before stop()
+    deadline = time.monotonic() + 10
+    while buffer.flushed_rows < 12 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert buffer.flushed_rows == 12
+    started = metadata_frames(dag_ids=('dag_b',), runs=1)['dag_runs'].iloc[0]
+    buffer.record_dag_run(SimpleNamespace(**{**started, 'end_date': None}), 'running')
+    buffer.stop()
+    assert buffer.flushed_rows == 13
+    assert _rows(extractor.observability_engine, "SELECT COUNT(*) FROM dag_runs") == [(3,)]
+
+
+def test_full_queue_drops_events_instead_of_blocking(extractor, metadata_frames):
+    buffer = ObservabilityEventBuffer(extractor=extractor, max_queue_size=3)
+    _events(buffer, metadata_frames)
+
+    assert buffer.dropped == 9
+    assert buffer.flush() == 3
+
+
+def test_failed_flush_is_counted_not_raised(metadata_frames, tmp_path):
+    unreachable = AirflowMetadataExtractor()
+    unreachable.observability_engine = create_engine(f"sqlite:///{tmp_path / 'missing' / 'observability.db'}")
+    buffer = ObservabilityEventBuffer(extractor=unreachable)
+    _events(buffer, metadata_frames)
+
+    assert buffer.flush() == 0
+    assert buffer.failed_batches == 1
+    assert buffer.record_task_instance(object(), 'running') is False
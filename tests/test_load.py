@@ -0,0 +1,81 @@
+from datetime import timedelta
+import pytest
+
+pytest.importorskip('airflow')
+
+from extract.rollups import rollup_table_name
+
+
+def _count(engine, table_name: str) -> int:
+    with engine.connect() as conn:
+        return conn.exec_driver_sql(f"SELECT COUNT(*) FROM {table_name}").scalar()
+
+
+def test_rerunning_a_window_is_idempotent_by_default(airflow_source, extractor, metadata_frames):
+    airflow_source(metadata_frames())
+
+    first = extractor.extract_and_load()
+    second = extractor.extract_and_load()
+
+    assert first['dag_runs_count'] == second['dag_runs_count'] == 6
+    assert _count(extractor.observability_engine, 'dag_runs') == 6
+    assert _count(extractor.observability_engine, 'task_instances') == 12
+
+
+def test_appending_a_loaded_window_raises_a_clear_error(airflow_source, extractor, metadata_frames):
+    airflow_source(metadata_frames())
+    extractor.extract_and_load(load_mode='append')
+
+    with pytest.raises(ValueError, match="load_mode='upsert'"):
+        extractor.extract_and_load(load_mode='append')
+    assert _count(extractor.observability_engine, 'dag_runs') == 6
+
+
+def test_upsert_replaces_changed_rows_and_their_rollups(extractor, metadata_frames):
+    engine = extractor.observability_engine
+    extractor.load_frames(metadata_frames(state='running'))
+    changed = metadata_frames(state='failed', duration=120.0)
+    changed['dag_runs'] = changed['dag_runs'].iloc[:2]
+
+    extractor.load_frames(changed)
+
+    with engine.connect() as conn:
+        states = dict(conn.exec_driver_sql("SELECT state, COUNT(*) FROM dag_runs GROUP BY state").fetchall())
+        rollup = conn.exec_driver_sql(
+            f"SELECT SUM(total_count), SUM(running_count), SUM(failed_count) FROM {rollup_table_name('dag_runs', 'daily')}"
+        ).one()
+    assert states == {'running': 4, 'failed': 2}
+    assert tuple(rollup) == (6, 4, 2)
+
+
+def test_loader_defaults_to_upsert_for_keyed_tables(extractor, metadata_frames):
+    df = metadata_frames()['dag_runs']
+
+    extractor.load_to_observability_db(df, 'dag_runs')
+    extractor.load_to_observability_db(df.assign(end_date=df['end_date'] + timedelta(seconds=5)), 'dag_runs')
+
+    assert _count(extractor.observability_engine, 'dag_runs') == len(df)
+
+
+def test_upserts_restamp_loaded_at(extractor, metadata_frames):
+    engine = extractor.observability_engine
+    with engine.begin() as conn:
+        # A raw table from before loads were stamped with loaded_at
+        conn.exec_driver_sql(
+            "CREATE TABLE dag_runs (dag_id VARCHAR(250) NOT NULL, execution_date TIMESTAMP NOT NULL, "
+            "state VARCHAR(50), start_date TIMESTAMP, end_date TIMESTAMP, duration FLOAT, extracted_at TIMESTAMP, "
+            "cluster_id VARCHAR(64) NOT NULL DEFAULT 'default', batch_id VARCHAR(32), "
+            "PRIMARY KEY (dag_id, execution_date, cluster_id))"
+        )
+    df = metadata_frames()['dag_runs']
+    extractor.load_to_observability_db(df, 'dag_runs')
+    with engine.connect() as conn:
+        first = conn.exec_driver_sql("SELECT MAX(loaded_at) FROM dag_runs").scalar()
+
+    extractor.load_to_observability_db(df.iloc[:2], 'dag_runs')
+
+    with engine.connect() as conn:
+        stamps = conn.exec_driver_sql("SELECT loaded_at, COUNT(*) FROM dag_runs GROUP BY 1 ORDER BY 1").fetchall()
+    assert first is not None
+    assert [count for _, count in stamps] == [4, 2]
+    assert stamps[0][0] == first
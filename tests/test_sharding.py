@@ -0,0 +1,47 @@
+from datetime import timedelta
+
+import pytest
+
+pytest.importorskip('airflow')
+
+from extract.airflow_metadata import AirflowMetadataExtractor
+from extract.sharding import commit_watermarks, extract_shard, merge_shard_results, plan_shards
+
+
+def _shard_extractor(extractor, dag_ids):
+    shard_extractor = AirflowMetadataExtractor(chunk_size=extractor.chunk_size, dag_ids=dag_ids)
+    shard_extractor.observability_engine = extractor.observability_engine
+    return shard_extractor
+
+
+def test_watermarks_move_only_when_the_plan_is_committed(airflow_source, extractor, metadata_frames):
+    airflow_source(metadata_frames(dag_ids=('dag_a', 'dag_b', 'dag_c')))
+
+    plan = plan_shards(extractor, dag_shards=2, time_slices=2)
+    assert plan['changed_windows']['dag_runs'] is not None
+    results = [
+        extract_shard(_shard_extractor(extractor, shard['dag_ids']), shard, concurrent=False)
+        for shard in plan['shards']
+    ]
+    merged = merge_shard_results(results)
+    assert merged['dag_runs_count'] == 9
+    assert merged['task_instances_count'] == 18
+    assert extractor.get_watermark('dag_runs') is None
+
+    watermarks = commit_watermarks(extractor, plan['changed_windows'])
+    assert watermarks['dag_runs_watermark'] == plan['changed_windows']['dag_runs'][1]
+    assert extractor.pin_window('dag_runs') is None
+    assert extractor.pin_window('task_instances') is None
+
+
+def test_only_dags_changed_inside_the_window_are_sharded(airflow_source, extractor, metadata_frames):
+    old = metadata_frames(dag_ids=('dag_a', 'dag_b'))
+    airflow_source(old)
+    watermark = old['dag_runs']['end_date'].max().to_pydatetime() + timedelta(hours=1)
+    for table_name in ('dag_runs', 'task_instances'):
+        extractor.commit_watermark(table_name, watermark)
+    airflow_source(metadata_frames(dag_ids=('dag_c',), start=watermark + timedelta(days=1)))
+
+    plan = plan_shards(extractor, dag_shards=4)
+
+    assert [shard['dag_ids'] for shard in plan['shards']] == [['dag_c']]
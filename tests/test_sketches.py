@@ -0,0 +1,75 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import text
+
+from extract.sketches import (SKETCH_TABLE, DDSketch, DurationSketchBuilder, ensure_sketch_table,
+                              merge_sketches, sketch_quantiles)
+
+DAY = date(2026, 10, 1)
+
+
+def _sketch(engine, df):
+    builder = DurationSketchBuilder(engine, 'task_instances')
+    builder.add(df)
+    return builder.flush()
+
+
+def test_two_clusters_share_one_sketch_table(observability_engine, metadata_frames):
+    ensure_sketch_table(observability_engine)
+    fast = metadata_frames(dag_ids=('dag_a',), duration=60.0)['task_instances']
+    slow = metadata_frames(dag_ids=('dag_a',), duration=600.0)['task_instances']
+
+    assert _sketch(observability_engine, fast.assign(cluster_id='east')) == 2
+    # Same dag, tasks and end dates from another cluster must not be dropped as already sketched
+    assert _sketch(observability_engine, slow.assign(cluster_id='west')) == 2
+
+    with observability_engine.connect() as conn:
+        rows = conn.execute(text(
+            f"SELECT cluster_id, task_id, value_count FROM {SKETCH_TABLE} ORDER BY cluster_id, task_id"
+        )).fetchall()
+    assert [tuple(row) for row in rows] == [('east', 'task_0', 3), ('east', 'task_1', 3),
+                                            ('west', 'task_0', 3), ('west', 'task_1', 3)]
+
+    by_cluster = sketch_quantiles(observability_engine, 'task_instances', DAY, DAY,
+                                  quantiles=(0.5,), group_by=('cluster_id',))
+    medians = dict(zip(by_cluster['cluster_id'], by_cluster['p50_duration_seconds']))
+    assert medians['east'] == pytest.approx(60.0, rel=0.02)
+    assert medians['west'] == pytest.approx(600.0, rel=0.02)
+
+    merged = merge_sketches(observability_engine, 'task_instances', DAY, DAY, group_by=('dag_id',))
+    assert merged[('dag_a',)].count == 12
+    west = merge_sketches(observability_engine, 'task_instances', DAY, DAY, group_by=('dag_id',),
+                          cluster_id='west')
+    assert west[('dag_a',)].count == 6
+
+
+def test_rerun_inside_overlap_is_not_double_counted(observability_engine, metadata_frames):
+    ensure_sketch_table(observability_engine)
+    df = metadata_frames(dag_ids=('dag_a',))['task_instances'].assign(cluster_id='east')
+
+    _sketch(observability_engine, df)
+    assert _sketch(observability_engine, df) == 0
+    merged = merge_sketches(observability_engine, 'task_instances', DAY, DAY, group_by=('cluster_id',))
+    assert merged[('east',)].count == 6
+
+
+def test_unclustered_table_is_rekeyed_to_default_cluster(observability_engine, metadata_frames):
+    with observability_engine.begin() as conn:
+        conn.execute(text(
+            f"CREATE TABLE {SKETCH_TABLE} (source_table VARCHAR(32) NOT NULL, dag_id VARCHAR(250) NOT NULL, "
+            f"task_id VARCHAR(250) NOT NULL, day DATE NOT NULL, relative_accuracy FLOAT NOT NULL, "
+            f"value_count BIGINT NOT NULL, last_end_date TIMESTAMP, sketch BLOB NOT NULL, "
+            f"updated_at TIMESTAMP NOT NULL, PRIMARY KEY (source_table, dag_id, task_id, day))"
+        ))
+        conn.execute(text(
+            f"INSERT INTO {SKETCH_TABLE} VALUES ('task_instances', 'dag_a', 'task_0', :day, 0.01, 4, "
+            f"NULL, :sketch, :day)"
+        ), {'day': DAY, 'sketch': DDSketch().add_many([30.0] * 4).to_bytes()})
+    ensure_sketch_table(observability_engine)
+    df = metadata_frames(dag_ids=('dag_a',))['task_instances']
+    _sketch(observability_engine, df)
+    _sketch(observability_engine, df.assign(cluster_id='east'))
+
+    merged = merge_sketches(observability_engine, 'task_instances', DAY, DAY, group_by=('cluster_id',))
+    assert {key: sketch.count for key, sketch in merged.items()} == {('default',): 10, ('east',): 6}
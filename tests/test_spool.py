@@ -0,0 +1,112 @@
+import os
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+import pytest
+
+from extract.spool import ChunkSpool, collect_garbage
+
+WINDOW = (None, datetime(2026, 10, 2, tzinfo=timezone.utc))
+
+
+def _spool(root, metadata_frames, spool_id='run-1'):
+    frames = metadata_frames()
+    spool = ChunkSpool(str(root), spool_id)
+    spool.begin('batch-1', list(frames))
+    for table_name, df in frames.items():
+        spool.write(table_name, df.iloc[:3])
+        spool.write(table_name, df.iloc[3:])
+        spool.set_changed_window(table_name, WINDOW)
+    return spool, frames
+
+
+def test_committed_spool_replays_its_chunks(tmp_path, metadata_frames):
+    spool, frames = _spool(tmp_path, metadata_frames)
+    assert not ChunkSpool(str(tmp_path), 'run-1').is_complete()
+    spool.commit()
+
+    replay = ChunkSpool(str(tmp_path), 'run-1')
+    assert replay.is_complete()
+    assert replay.open()['batch_id'] == 'batch-1'
+    assert replay.stats()['files'] == 4
+    assert replay.stats()['rows'] == 18
+    assert replay.changed_window('dag_runs') == WINDOW
+    replayed = pd.concat(replay.iter_chunks('task_instances'), ignore_index=True)
+    pd.testing.assert_frame_equal(replayed, frames['task_instances'], check_dtype=False)
+
+
+@pytest.mark.skipif(not os.path.isdir('/proc/self/fd'), reason='maps file descriptors to paths through /proc')
+def test_data_files_and_directories_are_synced_before_the_manifest(tmp_path, metadata_frames, monkeypatch):
+    synced = []
+    fsync = os.fsync
+
+    def record(fd):
+        synced.append(os.readlink(f'/proc/self/fd/{fd}'))
+        fsync(fd)
+
+    monkeypatch.setattr(os, 'fsync', record)
+    spool, _ = _spool(tmp_path, metadata_frames)
+    spool.commit()
+
+    data_files = [os.path.join(spool.path, entry['name'])
+                  for table in spool.manifest['tables'].values() for entry in table['files']]
+    directories = [os.path.join(spool.path, table_name) for table_name in spool.manifest['tables']]
+    manifest = synced.index(f'{spool.manifest_path}.tmp')
+    assert set(synced[:manifest]) == set(data_files + directories + [spool.path, str(tmp_path)])
+    assert synced[manifest + 1:] == [spool.path]
+
+
+def test_checksum_mismatch_discards_the_spool(tmp_path, metadata_frames):
+    spool, _ = _spool(tmp_path, metadata_frames)
+    spool.commit()
+    path = os.path.join(spool.path, spool.manifest['tables']['dag_runs']['files'][1]['name'])
+    with open(path, 'r+b') as f:
+        f.seek(-16, os.SEEK_END)
+        f.write(b'\0' * 16)
+
+    replay = ChunkSpool(str(tmp_path), 'run-1')
+    replay.open()
+    with pytest.raises(ValueError, match='checksum'):
+        list(replay.iter_chunks('dag_runs'))
+    assert not os.path.exists(replay.path)
+
+
+def test_garbage_collection_keeps_recent_and_current_spools(tmp_path, metadata_frames):
+    stale, _ = _spool(tmp_path, metadata_frames, 'stale')
+    current, _ = _spool(tmp_path, metadata_frames, 'current')
+    recent, _ = _spool(tmp_path, metadata_frames, 'recent')
+    stale_mtime = time.time() - 3 * 24 * 3600
+    for spool in (stale, current):
+        os.utime(spool.path, (stale_mtime, stale_mtime))
+
+    assert collect_garbage(str(tmp_path), keep=current.path) == [stale.path]
+    assert os.path.isdir(current.path) and os.path.isdir(recent.path)
+
+
+def test_failed_load_is_retried_from_the_spool(airflow_source, extractor, metadata_frames, tmp_path, monkeypatch):
+    from airflow import settings
+
+    airflow_source(metadata_frames())
+    extractor.spool_dir = str(tmp_path / 'spool')
+    load = extractor.load_chunks_to_observability_db
+
+    def fail_task_instances(chunks, table_name, if_exists=None):
+        if table_name == 'task_instances':
+            raise RuntimeError('observability database went away')
+        return load(chunks, table_name, if_exists=if_exists)
+
+    monkeypatch.setattr(extractor, 'load_chunks_to_observability_db', fail_task_instances)
+    with pytest.raises(RuntimeError):
+        extractor.extract_and_load(streaming=True, spool_id='nightly')
+    assert ChunkSpool(extractor.spool_dir, 'nightly').is_complete()
+
+    # The retry must not query the Airflow database
+    monkeypatch.setattr(extractor, 'load_chunks_to_observability_db', load)
+    monkeypatch.setattr(settings, 'Session', None)
+    results = extractor.extract_and_load(streaming=True, spool_id='nightly')
+
+    assert results['spool']['replayed'] is True
+    assert results['dag_runs_count'] == 6
+    assert results['task_instances_count'] == 12
+    assert not os.path.exists(results['spool']['path'])